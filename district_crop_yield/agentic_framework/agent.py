@@ -2,6 +2,7 @@ from langchain_google_genai import ChatGoogleGenerativeAI
 from langchain.memory import ConversationBufferMemory
 from dotenv import load_dotenv
 from langchain.schema import StrOutputParser
+from langchain.schema.runnable import RunnableLambda
 import json
 import sys
 
@@ -11,6 +12,7 @@ sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__),  '..')))
 
 from agentic_framework.tools import google_search_tool, rag_tool, crop_pred_tool, price_pred_tool, get_financial_tool
 from agentic_framework.prompts import Prompts
+from utils.replay import service_mode, call, ReplayMiss
 
 env_path = os.path.abspath(os.path.join(os.path.dirname(__file__), "../../.env"))
 
@@ -18,6 +20,17 @@ load_dotenv(env_path)
 
 prompts = Prompts()
 
+def recorded_llm(llm):
+    """
+    The LLM step of a chain under the gemini service mode: the rendered prompt is the fixture
+    key and the reply text is the recorded response.
+    """
+    if service_mode("gemini") == "live":
+        return llm
+    return RunnableLambda(
+        lambda prompt: call("gemini", {"prompt": prompt.to_string()}, lambda: llm.invoke(prompt).content)
+    )
+
 def build_planner_chain(llm, planner_prompt):
     return planner_prompt | llm | StrOutputParser()
 
@@ -28,7 +41,7 @@ class Agent():
     def __init__(self):
         self.llm = ChatGoogleGenerativeAI(
             model="gemini-1.5-flash",  # or gemini-1.5-pro
-            google_api_key=os.getenv("GOOGLE_API_KEY")
+            google_api_key=os.getenv("GOOGLE_API_KEY", "replay" if service_mode("gemini") == "replay" else None)
         )
         self.tools = {
             "GoogleSearch": google_search_tool,
@@ -38,8 +51,8 @@ class Agent():
             "GetFinancialAdvice": get_financial_tool
         }
         self.memory = ConversationBufferMemory(memory_key="chat_history", return_messages=True, k=1)
-        self.planner_chain = build_planner_chain(self.llm, prompts.planner_prompt)
-        self.answer_chain = build_answer_chain(self.llm, prompts.answer_prompt)
+        self.planner_chain = build_planner_chain(recorded_llm(self.llm), prompts.planner_prompt)
+        self.answer_chain = build_answer_chain(recorded_llm(self.llm), prompts.answer_prompt)
 
     def plan_once(self, query, tool_results):
         history = self.memory.load_memory_variables({})["chat_history"]
@@ -89,6 +102,9 @@ class Agent():
                         result = self.tools[tool_name](action)
                         print(f"Tool {tool_name} executed with action '{action}', result: {result}")
                         print("\n")
+                    except ReplayMiss:
+                        # A missing fixture is a test setup error, not a tool result for the planner
+                        raise
                     except Exception as e:
                         result = f"Error running {tool_name} on action '{action}': {e}"
                         print(f"Error occurred: {result} on tool {tool_name}")
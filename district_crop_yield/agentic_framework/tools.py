@@ -12,6 +12,10 @@ from langchain.tools import StructuredTool
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__),  '..')))
 
 from utils.utils import calculateYieldPred_Tool_structured, calculatePricePredTool
+from utils.replay import service_mode, replayable
+from rag.vector_store import VectorStore, is_vector_store
+from rag.query_cache import CachedRetriever
+from rag.bm25 import load_or_build
 
 env_path = os.path.abspath(os.path.join(os.path.dirname(__file__), "../../.env"))
 
@@ -21,19 +25,32 @@ OUTPUT_VDB_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), "../ra
 
 embeddings = HuggingFaceEmbeddings(model_name="sentence-transformers/all-MiniLM-L6-v2")
 
-vectorstore = FAISS.load_local(OUTPUT_VDB_PATH, embeddings, allow_dangerous_deserialization=True)
-
-serper = GoogleSerperAPIWrapper(serper_api_key = os.getenv("SERPER_API_KEY"))
+# rag/create_vdb.py writes an incrementally updatable store; older LangChain dumps still load
+if is_vector_store(OUTPUT_VDB_PATH):
+    vectorstore = VectorStore(OUTPUT_VDB_PATH, embeddings)
+    # BM25 next to the dense index: exact crop / district / scheme names, and no embedding when it is sure
+    lexical_index = load_or_build(vectorstore)
+else:
+    vectorstore = FAISS.load_local(OUTPUT_VDB_PATH, embeddings, allow_dangerous_deserialization=True)
+    lexical_index = None
+
+# Repeated planner questions skip both the query embedding and the search
+rag_retriever = CachedRetriever(vectorstore, embeddings, lexical_index)
+
+# Replayed searches never reach Serper, so no real key is needed offline
+serper = GoogleSerperAPIWrapper(
+    serper_api_key = os.getenv("SERPER_API_KEY", "replay" if service_mode("serper") == "replay" else None)
+)
 
 # wrap it as a Tool for your planner
 google_search_tool = Tool(
     name="GoogleSearch",
-    func=serper.run,
+    func=replayable("serper", lambda query: {"query": query})(serper.run),
     description="Useful for answering questions about current events or factual knowledge"
 )
 
 def get_doc_using_rag(query):
-  ans = "\n".join([doc.page_content for doc in vectorstore.similarity_search(query, k=1)])
+  ans = "\n".join([doc.page_content for doc in rag_retriever.search(query, k=3)])
   return ans
 
 rag_tool = Tool(
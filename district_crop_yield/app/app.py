@@ -17,12 +17,15 @@ sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__),  '..')))
 
 from utils.calcWeather import calculate_weather_data
 from utils.calIndx import calculate_indices_data
+from utils.season_state import is_in_progress, to_date_features
+from utils.replay import ReplayMiss
 from utils.utils import  calulateArea, calculateYieldPred, huggingFaceAuth, translate_hi_to_en, translate_en_to_hi, debug_json, serialize_recommendations
 from utils.repaymentLogic import preSeasonCalc
 from FT_model.model import FineTunedLlama
 from models.stt import load_asr_model
 from models.repayment import FarmInputs, FarmDebtManager
 from agentic_framework.agent import Agent
+from agentic_framework.tools import rag_retriever
 
 app = Flask(__name__)
 
@@ -30,6 +33,11 @@ CORS(app, resources={r"/api/*": {"origins": "*"}})
 
 agent = Agent()
 
+@app.errorhandler(ReplayMiss)
+def replay_miss(e):
+    # Replay mode without a recorded fixture: name the missing request instead of a bare 500
+    return jsonify({"error": str(e), "service": e.service}), 503
+
 UPLOAD_FOLDER = "uploads"
 os.makedirs(UPLOAD_FOLDER, exist_ok=True)
 
@@ -136,8 +144,14 @@ def submit_initial_inputs():
         )
         predicted_price = np.mean(predicted_price)
     else:
-        weather_df = calculate_weather_data(year, district)
-        indices_df = calculate_indices_data(year, district)
+        if is_in_progress(year):
+            # Season still running: fold only the days since the last refresh
+            weather_df, indices_df = to_date_features(year, district)
+        else:
+            weather_df = calculate_weather_data(year, district)
+            indices_df = calculate_indices_data(year, district)
+        if weather_df is None or indices_df is None:
+            return jsonify({"error": f"No weather or index data available for {district} in {year}"}), 503
         area_district = calulateArea(district, crop, year) or area
 
         predicted_yield, predicted_price = calculateYieldPred(
@@ -187,6 +201,10 @@ def submit_initial_inputs():
         "message": f"Predicted Yield {predicted_yield} for {crop} in {district} for year {year}"
     })
 
+@app.route('/api/rag_cache_stats', methods=['GET'])
+def rag_cache_stats():
+    return jsonify(rag_retriever.stats())
+
 @app.route('/api/get_financial_details', methods=['GET'])
 def get_financial_details():
     return jsonify({
@@ -0,0 +1,7 @@
+# Run from this folder with:  gunicorn -c gunicorn.conf.py
+import os
+
+wsgi_app = "app:app"
+bind = os.getenv("BIND", "127.0.0.1:5000")
+workers = int(os.getenv("WEB_CONCURRENCY", "4"))
+timeout = 120
@@ -0,0 +1,171 @@
+"""
+Recall / latency / memory benchmark of the RAG vector store index types.
+
+Builds every index type of rag/vector_store.py (flat, IVF-Flat, HNSW, IVF-PQ) over
+the same vectors at each size, with the store's own factory strings and search
+parameters, and reports per type (IVF types both at the store's default nlist, which
+create_vdb builds, and at the ~4·sqrt(n) rule of thumb for that size):
+- recall@k of the approximate search against the exact flat index
+- single-query latency (p50 / p95) and batched throughput
+- build time and serialised index size
+
+--check-compaction instead builds a small VectorStore of every type, tombstones part
+of it, compacts it and asserts that the live chunks still retrieve themselves.
+
+Vectors are synthetic clustered 384-d embeddings (MiniLM's width) by default, or the
+real chunk embeddings of a flat rag/faiss store via --store, resampled with noise to
+reach the larger sizes.
+
+Usage:
+    python bench_ann_index.py [--sizes 10000 100000 1000000] [--k 3]
+    python bench_ann_index.py --store ../rag/faiss --sizes 10000 100000
+    python bench_ann_index.py --sizes 100000 --nprobe 8 32 --ef-search 32 128
+    python bench_ann_index.py --check-compaction
+"""
+
+import os
+import sys
+import time
+import argparse
+import tempfile
+
+import numpy as np
+import faiss
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__),  '..')))
+
+from rag.vector_store import (INDEX_TYPES, VectorStore, index_factory, apply_search_params,
+                               DEFAULT_SEARCH_PARAMS, DEFAULT_INDEX_PARAMS)
+
+DIM = 384
+
+
+def synthetic_vectors(n: int, dim: int = DIM, n_clusters: int = 1000, seed: int = 0) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(n_clusters, dim)).astype(np.float32)
+    out = np.empty((n, dim), dtype=np.float32)
+    for start in range(0, n, 100_000):
+        stop = min(n, start + 100_000)
+        out[start:stop] = centers[rng.integers(0, n_clusters, stop - start)]
+        out[start:stop] += 0.5 * rng.normal(size=(stop - start, dim)).astype(np.float32)
+    return out
+
+
+def store_vectors(store_dir: str) -> np.ndarray:
+    store = VectorStore(store_dir)
+    inner = faiss.downcast_index(store.index.index)
+    return inner.reconstruct_n(0, inner.ntotal)
+
+
+def resample(base: np.ndarray, n: int, seed: int = 0) -> np.ndarray:
+    """`n` vectors from `base`, jittered so copies are not exact duplicates."""
+    if n <= len(base):
+        return base[:n]
+    rng = np.random.default_rng(seed)
+    scale = 0.05 * base.std()
+    return (base[rng.integers(0, len(base), n)] + scale * rng.normal(size=(n, base.shape[1]))).astype(np.float32)
+
+
+def build(index_type: str, vectors: np.ndarray, nlist: int):
+    index = faiss.index_factory(vectors.shape[1], f"IDMap2,{index_factory(index_type, nlist=nlist)}")
+    start = time.perf_counter()
+    if not index.is_trained:
+        train = vectors[np.random.default_rng(0).permutation(len(vectors))[:max(39 * nlist, 10_000)]]
+        index.train(train)
+    index.add_with_ids(vectors, np.arange(len(vectors), dtype=np.int64))
+    return index, time.perf_counter() - start
+
+
+def recall_at_k(found: np.ndarray, truth: np.ndarray) -> float:
+    k = truth.shape[1]
+    return float(np.mean([len(set(f) & set(t)) / k for f, t in zip(found, truth)]))
+
+
+def measure(index, queries: np.ndarray, k: int, n_single: int = 200) -> dict:
+    latencies = []
+    for q in queries[:n_single]:
+        t = time.perf_counter()
+        index.search(q[None, :], k)
+        latencies.append((time.perf_counter() - t) * 1000)
+    t = time.perf_counter()
+    _, found = index.search(queries, k)
+    batch_s = time.perf_counter() - t
+    return {"found": found, "p50_ms": np.percentile(latencies, 50), "p95_ms": np.percentile(latencies, 95),
+            "qps": len(queries) / batch_s}
+
+
+def check_compaction(index_type: str, n: int = 2000, removed: int = 600, k: int = 3, n_queries: int = 200) -> float:
+    """
+    Share of live chunks found in their own top-k after tombstoning `removed` of `n`
+    chunks and compacting. Asserts no tombstoned chunk comes back and the share is 1.0
+    for flat and IVF-Flat, which search exhaustively at this size.
+    """
+    vectors = synthetic_vectors(n, n_clusters=50)
+    with tempfile.TemporaryDirectory() as index_dir:
+        store = VectorStore(index_dir, index_type=index_type, index_params={"nlist": 8})
+        keys = [f"chunk-{i}" for i in range(n)]
+        store.add(keys, keys, [{}] * n, vectors)
+        store.save()
+        store.tombstone(keys[:removed])
+        store.compact(force=True)
+
+        live = np.random.default_rng(0).choice(np.arange(removed, n), n_queries, replace=False)
+        hits = store.search_vectors(vectors[live], k)
+    assert all(i >= removed for row in hits for i, _ in row), f"{index_type}: tombstoned chunk returned"
+    self_hits = float(np.mean([doc_id in [i for i, _ in row] for doc_id, row in zip(live, hits)]))
+    if index_type in ("flat", "ivf"):
+        assert self_hits == 1.0, f"{index_type}: self-hit {self_hits:.3f} after compaction"
+    return self_hits
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--types", nargs="+", choices=list(INDEX_TYPES), default=list(INDEX_TYPES))
+    parser.add_argument("--store", help="Flat vector store whose embeddings to use")
+    parser.add_argument("--queries", type=int, default=1000)
+    parser.add_argument("--k", type=int, default=3)
+    parser.add_argument("--nprobe", type=int, nargs="+", default=[DEFAULT_SEARCH_PARAMS["nprobe"]])
+    parser.add_argument("--ef-search", type=int, nargs="+", default=[DEFAULT_SEARCH_PARAMS["efSearch"]])
+    parser.add_argument("--check-compaction", action="store_true")
+    args = parser.parse_args()
+
+    if args.check_compaction:
+        for index_type in args.types:
+            print(f"{index_type:<7} self-hit@{args.k} after compaction: {check_compaction(index_type, k=args.k):.3f}")
+        raise SystemExit(0)
+
+    base = store_vectors(args.store) if args.store else None
+    print(f"{'size':>9} {'index':<7} {'params':<12} {'recall@' + str(args.k):>9} {'p50 ms':>8} {'p95 ms':>8} "
+          f"{'batch qps':>10} {'build s':>8} {'MB':>8}")
+    for size in args.sizes:
+        pool = resample(base, size + args.queries) if base is not None else synthetic_vectors(size + args.queries)
+        vectors, queries = pool[:size], pool[size:]
+        # The shipped default, and ~4·sqrt(n) clusters, the usual IVF rule of thumb
+        nlists = sorted({min(DEFAULT_INDEX_PARAMS["nlist"], size // 39), int(min(4 * np.sqrt(size), size // 39))})
+
+        exact = None
+        runs = [(t, n) for t in ["flat"] + [t for t in args.types if t != "flat"]
+                for n in (nlists if t.startswith("ivf") else [nlists[0]])]
+        for index_type, nlist in runs:
+            index, build_s = build(index_type, vectors, nlist)
+            size_mb = faiss.serialize_index(index).nbytes / 1e6
+            if index_type.startswith("ivf"):
+                settings = [{"nprobe": n} for n in args.nprobe]
+            elif index_type == "hnsw":
+                settings = [{"efSearch": e} for e in args.ef_search]
+            else:
+                settings = [{}]
+            for params in settings:
+                apply_search_params(faiss, index, params)
+                result = measure(index, queries, args.k)
+                if exact is None:
+                    exact = result["found"]
+                label = ",".join(f"{k}={v}" for k, v in params.items()) or "-"
+                if index_type.startswith("ivf"):
+                    label = f"{nlist}/{label}"
+                if index_type in args.types:
+                    print(f"{size:>9} {index_type:<7} {label:<12} {recall_at_k(result['found'], exact):>9.3f} "
+                          f"{result['p50_ms']:>8.3f} {result['p95_ms']:>8.3f} {result['qps']:>10.0f} "
+                          f"{build_s:>8.1f} {size_mb:>8.1f}")
+            del index
@@ -0,0 +1,97 @@
+"""
+Memory and fit-time benchmark for the April pre-season price model.
+
+Compares the original dense pd.get_dummies + single-threaded forest against the
+ordinal and sparse one-hot encodings trained with n_jobs=-1, on synthetic April
+mandi prices with a configurable number of markets.
+
+Usage:
+    python bench_april_price_model.py [--markets 300] [--trees 300]
+"""
+
+import os
+import sys
+import time
+import argparse
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from sklearn.ensemble import RandomForestRegressor
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__),  '..')))
+
+from models.April_Pre_Season_Prediction import (
+    prepare_features, fit_feature_schema, encode_features, compute_metrics
+)
+
+
+def make_synthetic_april(n_markets: int, years=range(2020, 2026), seed: int = 42) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    market_level = rng.normal(2200, 200, n_markets)
+    rows = []
+    for year in years:
+        for day in range(1, 31):
+            keep = rng.random(n_markets) < 0.6
+            idx = np.flatnonzero(keep)
+            rows.append(pd.DataFrame({
+                'Market': [f"Mandi_{i:04d}" for i in idx],
+                'Year': year,
+                'Day': day,
+                'Price': market_level[idx] + 40 * (year - 2020) + rng.normal(0, 60, len(idx)),
+            }))
+    return pd.concat(rows, ignore_index=True)
+
+
+def matrix_nbytes(X) -> int:
+    if sparse.issparse(X):
+        X = X.tocsr()
+        return X.data.nbytes + X.indices.nbytes + X.indptr.nbytes
+    if isinstance(X, pd.DataFrame):
+        return int(X.memory_usage(index=False, deep=True).sum())
+    return X.nbytes
+
+
+def run(name, prepare, n_jobs, trees):
+    tracemalloc.start()
+    start = time.perf_counter()
+    X_train, y_train, X_test, y_test = prepare()
+    prep_s = time.perf_counter() - start
+    _, prep_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    model = RandomForestRegressor(n_estimators=trees, random_state=42, n_jobs=n_jobs)
+    start = time.perf_counter()
+    model.fit(X_train, y_train)
+    fit_s = time.perf_counter() - start
+    metrics = compute_metrics(y_test, model.predict(X_test))
+
+    print(f"{name:<28} features {matrix_nbytes(X_train) / 1e6:8.2f} MB  "
+          f"prep peak {prep_peak / 1e6:8.2f} MB  prep {prep_s:6.2f} s  "
+          f"fit {fit_s:7.2f} s  RMSE {metrics['rmse']:7.2f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--markets", type=int, default=300)
+    parser.add_argument("--trees", type=int, default=300)
+    args = parser.parse_args()
+
+    df = make_synthetic_april(args.markets)
+    train_years, test_year = [2020, 2021, 2022, 2023, 2024], 2025
+    print(f"{len(df):,} rows, {args.markets} markets, {args.trees} trees, {os.cpu_count()} cores\n")
+
+    run("dense get_dummies, 1 job", lambda: prepare_features(df, train_years, test_year), None, args.trees)
+
+    def fast(encoding):
+        def prepare():
+            train_df = df[df['Year'].isin(train_years)]
+            test_df = df[df['Year'] == test_year]
+            schema = fit_feature_schema(train_df, encoding)
+            return (encode_features(train_df, schema), train_df['Price'],
+                    encode_features(test_df, schema), test_df['Price'])
+        return prepare
+
+    run("sparse one-hot, all cores", fast("sparse"), -1, args.trees)
+    run("ordinal, all cores", fast("ordinal"), -1, args.trees)
@@ -0,0 +1,80 @@
+"""
+Timing and parity check for the incremental full_data_crop_yield.csv build.
+
+Copies the three input CSVs to a temp directory, then times:
+  - a full build (every district merged and partitioned),
+  - a no-op rebuild (inputs untouched),
+  - a one-district update (one district's Rabi weather edited).
+After each build the CSV is compared byte for byte with what final_data.py's merge
+writes for the same inputs.
+
+Usage:
+    python bench_dataset_build.py [--district Sehore]
+"""
+
+import os
+import sys
+import time
+import shutil
+import argparse
+import tempfile
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__),  '..')))
+
+from utils.data_cache import read_table
+from createData.final_data import RABI_PATH, INDICES_PATH, CROPS_PATH, merge_inputs
+from createData.build_dataset import build
+
+
+def reference_csv(paths: dict) -> str:
+    merged = merge_inputs(read_table(paths["rabi"]), read_table(paths["indices"]), read_table(paths["crops"]))
+    return merged.to_csv(index=False)
+
+
+def timed_build(label: str, **kwargs) -> dict:
+    start = time.perf_counter()
+    stats = build(**kwargs)
+    print(f"{label:<22} {time.perf_counter() - start:7.3f} s  ({len(stats['rebuilt'])} districts merged)")
+    return stats
+
+
+def check(paths: dict, output_path: str):
+    with open(output_path, "r", encoding="utf-8") as f:
+        assert f.read() == reference_csv(paths), "CSV differs from final_data.py output"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--district", default="Sehore", help="District whose weather is edited")
+    args = parser.parse_args()
+
+    tmp = tempfile.mkdtemp()
+    paths = {name: shutil.copy(src, tmp) for name, src in
+             {"rabi": RABI_PATH, "indices": INDICES_PATH, "crops": CROPS_PATH}.items()}
+    kwargs = dict(rabi_path=paths["rabi"], indices_path=paths["indices"], crops_path=paths["crops"],
+                  parts_dir=os.path.join(tmp, "parts"), output_path=os.path.join(tmp, "full_data_crop_yield.csv"))
+
+    timed_build("full build", full=True, **kwargs)
+    check(paths, kwargs["output_path"])
+    timed_build("no-op rebuild", **kwargs)
+
+    # Edit the district's lines in place so no other row is re-serialised
+    with open(paths["rabi"], "r", encoding="utf-8") as f:
+        lines = f.read().splitlines()
+    col = lines[0].split(",").index("PRECTOTCORR")
+    edited = 0
+    for i, line in enumerate(lines[1:], start=1):
+        fields = line.split(",")
+        if fields[0] == args.district:
+            fields[col] = repr(float(fields[col]) + 1.0)
+            lines[i] = ",".join(fields)
+            edited += 1
+    if not edited:
+        raise SystemExit(f"❌ '{args.district}' not found in the Rabi weather table")
+    with open(paths["rabi"], "w", encoding="utf-8") as f:
+        f.write("\n".join(lines) + "\n")
+
+    stats = timed_build("one-district update", **kwargs)
+    assert stats["rebuilt"] == [args.district], stats["rebuilt"]
+    check(paths, kwargs["output_path"])
+    print("✅ Built CSV matches final_data.py after every step")
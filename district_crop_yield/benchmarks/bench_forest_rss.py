@@ -0,0 +1,101 @@
+"""
+Resident-memory benchmark of a 300-tree price forest loaded by several workers at once.
+
+The forecast service (utils/price_forecast.py) loads a forest only to recompute its
+forecasts after a model change, and every gunicorn worker that sees the change does
+so at about the same time. For 1, 4 and 8 workers, every worker either joblib-loads
+its own copy of the forest or maps the .forest bundle with mmap_mode='r', predicts
+once, and reports RSS and PSS while all workers are alive. PSS splits shared pages
+(the bundle's page cache) between the processes mapping them, so the summed PSS is
+the real physical footprint of that recompute. RSS and PSS come from /proc, so this
+runs on Linux only.
+
+Usage:
+    python bench_forest_rss.py [--model ../models/midseason_predictor.pkl]
+"""
+
+import os
+import sys
+import argparse
+import tempfile
+import multiprocessing as mp
+
+import numpy as np
+import joblib
+from sklearn.ensemble import RandomForestRegressor
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__),  '..')))
+
+from models.forest_store import save_forest, load_forest, bundle_path_for
+
+
+def memory_kb() -> dict:
+    """RSS and PSS of the current process from /proc (Linux only)."""
+    stats = {}
+    with open("/proc/self/smaps_rollup", "r") as f:
+        for line in f:
+            key, _, rest = line.partition(":")
+            if key in ("Rss", "Pss"):
+                stats[key] = int(rest.split()[0])
+    return stats
+
+
+def worker(mode, model_path, X, barrier, results):
+    if mode == "joblib":
+        model = joblib.load(model_path)
+    else:
+        model = load_forest(bundle_path_for(model_path))
+    model.predict(X)
+    barrier.wait()            # measure while every worker holds its model
+    results.put(memory_kb())
+    barrier.wait()
+
+
+def measure(mode, model_path, X, n_workers) -> dict:
+    # Spawned, so no worker inherits the parent's copy of the forest or its threads
+    ctx = mp.get_context("spawn")
+    barrier = ctx.Barrier(n_workers + 1)
+    results = ctx.Queue()
+    procs = [ctx.Process(target=worker, args=(mode, model_path, X, barrier, results))
+             for _ in range(n_workers)]
+    for p in procs:
+        p.start()
+    barrier.wait()
+    stats = [results.get() for _ in procs]
+    barrier.wait()
+    for p in procs:
+        p.join()
+    return {"rss_mb": sum(s["Rss"] for s in stats) / 1024,
+            "pss_mb": sum(s["Pss"] for s in stats) / 1024}
+
+
+def synthetic_forest(path: str, n_features: int = 120):
+    rng = np.random.default_rng(42)
+    X = rng.normal(2000, 200, size=(5000, n_features))
+    y = X[:, -10:].mean(axis=1) + rng.normal(0, 50, len(X))
+    model = RandomForestRegressor(n_estimators=300, random_state=42, n_jobs=-1).fit(X, y)
+    joblib.dump(model, path)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--model", help="Pickled forest to benchmark (default: synthetic 300 trees)")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 4, 8])
+    args = parser.parse_args()
+
+    tmp_dir = tempfile.mkdtemp()
+    model_path = args.model or os.path.join(tmp_dir, "forest.pkl")
+    if not args.model:
+        synthetic_forest(model_path)
+
+    model = joblib.load(model_path)
+    save_forest(model, bundle_path_for(model_path))
+    X = np.random.default_rng(0).normal(2000, 200, size=(64, model.n_features_in_))
+    assert np.allclose(model.predict(X), load_forest(bundle_path_for(model_path)).predict(X))
+    del model
+
+    print(f"{'workers':>7} {'mode':>7} {'total RSS MB':>13} {'total PSS MB':>13}")
+    for n in args.workers:
+        for mode in ("joblib", "mmap"):
+            m = measure(mode, model_path, X, n)
+            print(f"{n:>7} {mode:>7} {m['rss_mb']:>13.1f} {m['pss_mb']:>13.1f}")
@@ -0,0 +1,98 @@
+"""
+Quality / latency benchmark of dense, BM25 and hybrid RAG retrieval.
+
+Every Q&A chunk of the store ("Q: ...\nA: ...") is its own labelled query: the
+question part is searched, and the chunk it came from is the relevant answer.
+Per retriever the benchmark reports:
+- hit@1 / hit@3 and MRR@3 of the source chunk
+- per-query latency (p50 / p95), including the query embedding where one is made
+- for hybrid, the share of queries answered by BM25 alone, without an embedding
+
+Result caching is off (every query is distinct anyway) so the timings are the
+uncached path the planner hits on a new question.
+
+Usage:
+    python bench_hybrid_retrieval.py [--store ../rag/faiss] [--queries 1000] [--k 3]
+"""
+
+import os
+import sys
+import time
+import random
+import argparse
+
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__),  '..')))
+
+from rag.vector_store import VectorStore, INDEX_DIR, EMBEDDING_MODEL
+from rag.bm25 import load_or_build
+from rag.query_cache import CachedRetriever
+
+
+def qa_queries(store: VectorStore, n: int, seed: int = 0) -> list:
+    """(question, store id) for a sample of the Q&A chunks."""
+    pairs = []
+    for doc_id, doc in store.docstore.items():
+        text = doc["text"]
+        if text.startswith("Q: ") and "\nA: " in text:
+            pairs.append((text[3:text.index("\nA: ")].strip(), doc_id))
+    random.Random(seed).shuffle(pairs)
+    return pairs[:n]
+
+
+def evaluate(name: str, search, queries: list, k: int) -> dict:
+    hits1 = hitsk = rr = 0.0
+    latencies = []
+    for question, doc_id in queries:
+        t = time.perf_counter()
+        found = search(question)
+        latencies.append((time.perf_counter() - t) * 1000)
+        if doc_id in found[:k]:
+            rank = found.index(doc_id)
+            hits1 += rank == 0
+            hitsk += 1
+            rr += 1 / (rank + 1)
+    n = len(queries)
+    return {"name": name, "hit@1": hits1 / n, f"hit@{k}": hitsk / n, "mrr": rr / n,
+            "p50_ms": np.percentile(latencies, 50), "p95_ms": np.percentile(latencies, 95)}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--store", default=INDEX_DIR)
+    parser.add_argument("--queries", type=int, default=1000)
+    parser.add_argument("--k", type=int, default=3)
+    args = parser.parse_args()
+
+    from langchain_community.embeddings import HuggingFaceEmbeddings
+
+    embeddings = HuggingFaceEmbeddings(model_name=EMBEDDING_MODEL)
+    store = VectorStore(args.store, embeddings)
+    t = time.perf_counter()
+    lexical = load_or_build(store)
+    print(f"BM25 over {len(lexical.doc_ids)} chunks, {len(lexical.postings)} terms ({time.perf_counter() - t:.1f} s)")
+
+    queries = qa_queries(store, args.queries)
+    print(f"{len(queries)} Q&A queries, k={args.k}")
+    # Warm up the model so the first dense query does not pay for loading it
+    embeddings.embed_query("warm up")
+
+    def dense(question):
+        vector = np.array([embeddings.embed_query(question)], dtype=np.float32)
+        return [i for i, _ in store.search_vectors(vector, args.k)[0]]
+
+    def bm25(question):
+        return [i for i, _, _ in lexical.search(question, args.k)]
+
+    hybrid_retriever = CachedRetriever(store, embeddings, lexical, embed_cache_size=1, result_cache_size=1)
+
+    def hybrid(question):
+        return hybrid_retriever.hybrid_ids(question, args.k)
+
+    print(f"{'retriever':<9} {'hit@1':>7} {'hit@' + str(args.k):>7} {'MRR':>7} {'p50 ms':>8} {'p95 ms':>8}")
+    for name, search in [("dense", dense), ("bm25", bm25), ("hybrid", hybrid)]:
+        r = evaluate(name, search, queries, args.k)
+        print(f"{r['name']:<9} {r['hit@1']:>7.3f} {r['hit@' + str(args.k)]:>7.3f} {r['mrr']:>7.3f} "
+              f"{r['p50_ms']:>8.2f} {r['p95_ms']:>8.2f}")
+    print(f"hybrid skipped the embedding for {hybrid_retriever.lexical_only / len(queries):.1%} of queries")
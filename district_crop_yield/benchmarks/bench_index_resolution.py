@@ -0,0 +1,112 @@
+"""
+Accuracy/latency report for the vegetation index resolution pyramid.
+
+For a sample of districts, recomputes the Rabi-season NDVI/EVI/NDWI means at each
+pyramid scale (and with the automatic per-district choice), times every request, and
+compares the values against the 10 m reference outputs in data/mp_indicies_data.
+Needs Earth Engine credentials.
+
+Usage:
+    python bench_index_resolution.py [--districts 8] [--report index_resolution_report.md]
+"""
+
+import os
+import sys
+import time
+import argparse
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__),  '..')))
+
+from utils.data_cache import read_table
+from utils.index_resolution import RESOLUTION_PYRAMID, choose_scale
+from createData.indices_batch import (
+    EE_PROJECT, DISTRICTS_ASSET, INDEX_BANDS, indices_collection, district_areas
+)
+
+current_dir = os.path.dirname(__file__)
+REFERENCE_DIR = os.path.join(current_dir, "../data/mp_indicies_data")
+
+
+def load_reference(reference_dir: str = REFERENCE_DIR) -> pd.DataFrame:
+    files = [os.path.join(reference_dir, f) for f in sorted(os.listdir(reference_dir))
+             if f.endswith("_indicies_2018_2023.csv")]
+    return pd.concat([read_table(f) for f in files], ignore_index=True)
+
+
+def run_scale(ee, districts_fc, names, years, scale_for) -> tuple:
+    """Index means and per-district request times with scale_for(name) metres."""
+    rows, timings = [], []
+    for name in names:
+        start = time.perf_counter()
+        info = indices_collection(ee, districts_fc, [name], years, scale_for(name)).getInfo()
+        timings.append(time.perf_counter() - start)
+        rows.extend(f['properties'] for f in info['features'])
+    df = pd.DataFrame(rows).rename(columns={'NAME_2': 'district'})
+    return df, np.array(timings)
+
+
+def summarise(label: str, df: pd.DataFrame, reference: pd.DataFrame, timings) -> dict:
+    merged = reference.merge(df, on=['district', 'year'], suffixes=('_ref', ''))
+    row = {"scale": label, "pairs": len(merged)}
+    for band in INDEX_BANDS:
+        err = (merged[band] - merged[f"{band}_ref"]).abs()
+        row[f"{band}_mae"] = err.mean()
+        row[f"{band}_p95"] = err.quantile(0.95)
+    row["median_s"] = float(np.median(timings))
+    row["total_s"] = float(timings.sum())
+    return row
+
+
+def to_markdown(results: pd.DataFrame, tiers: dict) -> str:
+    cols = list(results.columns)
+    lines = ["# Vegetation index resolution report", "",
+             "Errors are absolute differences from the 10 m reference in data/mp_indicies_data; "
+             "times are per district (all seasons in one request).", "",
+             "| " + " | ".join(cols) + " |", "|" + "---|" * len(cols)]
+    for _, r in results.iterrows():
+        lines.append("| " + " | ".join(f"{v:.4f}" if isinstance(v, float) else str(v) for v in r) + " |")
+    lines += ["", "Automatic choice: " + ", ".join(f"{s} m × {n}" for s, n in sorted(tiers.items()))]
+    return "\n".join(lines) + "\n"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--districts", type=int, default=8, help="Sample size (0 = all reference districts)")
+    parser.add_argument("--start-year", type=int, default=2018)
+    parser.add_argument("--end-year", type=int, default=2022)
+    parser.add_argument("--report", help="Optional markdown output path")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    import ee
+    ee.Initialize(project=EE_PROJECT)
+    districts_fc = ee.FeatureCollection(DISTRICTS_ASSET)
+
+    reference = load_reference()
+    names = sorted(reference['district'].unique())
+    if args.districts:
+        rng = np.random.default_rng(args.seed)
+        names = sorted(rng.choice(names, size=min(args.districts, len(names)), replace=False))
+    years = list(range(args.start_year, args.end_year + 1))
+
+    areas = district_areas(ee, districts_fc, names)
+    auto = {name: choose_scale(areas.get(name, 0)) for name in names}
+    tiers = pd.Series(auto).value_counts().to_dict()
+
+    results = []
+    for scale in sorted(RESOLUTION_PYRAMID, reverse=True):
+        df, timings = run_scale(ee, districts_fc, names, years, lambda name, s=scale: s)
+        results.append(summarise(f"{scale} m", df, reference, timings))
+        print(f"✅ {scale} m: median {np.median(timings):.1f} s per district")
+    df, timings = run_scale(ee, districts_fc, names, years, auto.get)
+    results.append(summarise("auto", df, reference, timings))
+
+    report = to_markdown(pd.DataFrame(results), tiers)
+    print(report)
+    if args.report:
+        with open(args.report, "w", encoding="utf-8") as f:
+            f.write(report)
+        print(f"✅ Report saved to '{args.report}'")
@@ -0,0 +1,81 @@
+"""
+Benchmark and parity check for the Mid-season price dataset builder.
+
+Compares the grouped builder in models/Mid_season_price_prediction.py against the
+original years × markets loop (check_dataset_parity there) on synthetic mandi price
+data, at the current data size and at 10× (ten times as many markets).
+
+Usage:
+    python bench_price_dataset.py [--scale 10] [--markets 40]
+"""
+
+import os
+import sys
+import time
+import argparse
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__),  '..')))
+
+from models.Mid_season_price_prediction import build_padded_dataset, build_dataset_loop, check_dataset_parity
+
+
+def make_synthetic_prices(n_markets: int, years=range(2019, 2025), seed: int = 42) -> tuple:
+    """
+    Daily Nov–Feb and April prices per market with the irregularities of real mandi
+    data: missing trading days, shuffled rows, NaT dates and markets without April sales.
+    """
+    rng = np.random.default_rng(seed)
+    markets = [f"Market_{i:04d}" for i in range(n_markets)]
+
+    nov_feb_dates = pd.DatetimeIndex(np.concatenate([
+        pd.date_range(f"{y-1}-11-01", f"{y}-02-28").values for y in years
+    ]))
+    april_dates = pd.DatetimeIndex(np.concatenate([
+        pd.date_range(f"{y}-04-01", f"{y}-04-30").values for y in years
+    ]))
+
+    def frame(dates, drop_frac):
+        df = pd.DataFrame({
+            'Market': np.repeat(markets, len(dates)),
+            'Date': np.tile(dates.values, n_markets),
+        })
+        df['Price'] = 2000 + rng.normal(0, 150, len(df)).round(0)
+        df = df.sample(frac=1 - drop_frac, random_state=seed)
+        df.loc[df.sample(frac=0.001, random_state=seed + 1).index, 'Date'] = pd.NaT
+        return df
+
+    nov_feb_df = frame(nov_feb_dates, drop_frac=0.3)
+    april_df = frame(april_dates, drop_frac=0.3)
+    april_df = april_df[~april_df['Market'].isin(markets[::7])]
+    return nov_feb_df.reset_index(drop=True), april_df.reset_index(drop=True)
+
+
+def check_parity(nov_feb_df, april_df):
+    n = check_dataset_parity(nov_feb_df, april_df)
+    print(f"✅ Parity OK: {n} market-years")
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    fn(*args)
+    return time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--markets", type=int, default=40, help="Markets at 1× (current data size)")
+    parser.add_argument("--scale", type=int, default=10)
+    args = parser.parse_args()
+
+    for scale in (1, args.scale):
+        nov_feb_df, april_df = make_synthetic_prices(args.markets * scale)
+        print(f"\n{scale}× data: {len(nov_feb_df):,} Nov–Feb rows, {len(april_df):,} April rows")
+        check_parity(nov_feb_df, april_df)
+
+        loop_s = timed(build_dataset_loop, nov_feb_df, april_df)
+        grouped_s = timed(build_padded_dataset, nov_feb_df, april_df)
+        print(f"loop builder:    {loop_s:8.3f} s")
+        print(f"grouped builder: {grouped_s:8.3f} s  ({loop_s / grouped_s:.0f}× faster)")
@@ -0,0 +1,120 @@
+"""
+Benchmark and parity check for the Rabi weather aggregation.
+
+Runs the original per-file preprocess_data loop from createData/weather_data.py and
+the single-pass createData/rabi_aggregate.py over the same wide weather CSVs, checks
+that both produce the same table, and times them.
+
+With --input-dir it uses real downloaded files (and, with --reference, also compares
+against an existing all_districts_rabi_aggregated.csv). Otherwise it writes synthetic
+files in the downloader's layout for --districts districts.
+
+Usage:
+    python bench_rabi_aggregate.py [--districts 600]
+    python bench_rabi_aggregate.py --input-dir ../data/mp_weather_data --reference ../data/all_districts_rabi_aggregated.csv
+"""
+
+import os
+import sys
+import time
+import argparse
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__),  '..')))
+
+from createData.rabi_aggregate import aggregate_rabi, list_weather_files, AGGREGATIONS
+
+
+def preprocess_data_loop(df):
+    """Original per-file preprocessing from createData/weather_data.py, kept as reference."""
+    df = df.transpose()
+    df.columns = df.iloc[0]
+    df = df.drop(index=0)
+
+    df = df.reset_index(drop=True)
+    df['district'] = df['T2M'].iloc[-1]
+    df = df.iloc[:-1]
+
+    df['date'] = df['date'].astype(float).astype(int).astype(str)
+    df['date'] = pd.to_datetime(df['date'], format="%Y%m%d")
+
+    df['month'] = df['date'].dt.month
+    df['year'] = df['date'].dt.year
+
+    df['rabi_year'] = df['year']
+    df.loc[df['month'] >= 11, 'rabi_year'] += 1
+
+    df_rabi = df[df['month'].isin([11, 12, 1, 2])].copy()
+    # Newer pandas refuses to average object columns; the values are already floats
+    df_rabi[list(AGGREGATIONS)] = df_rabi[list(AGGREGATIONS)].astype(float)
+
+    return df_rabi.groupby(['district', 'rabi_year']).agg(AGGREGATIONS).reset_index()
+
+
+def run_loop(files) -> pd.DataFrame:
+    return pd.concat([preprocess_data_loop(pd.read_csv(f, header=None)) for f in files], ignore_index=True)
+
+
+def write_synthetic_files(out_dir: str, n_districts: int, seed: int = 42) -> list:
+    """Wide CSVs laid out like the NASA POWER download script writes them."""
+    rng = np.random.default_rng(seed)
+    dates = pd.date_range("2018-01-01", "2023-12-31").strftime("%Y%m%d")
+    for i in range(n_districts):
+        daily = pd.DataFrame({
+            "T2M_MAX": rng.normal(28, 4, len(dates)).round(2),
+            "T2M_MIN": rng.normal(12, 4, len(dates)).round(2),
+            "T2M": rng.normal(20, 4, len(dates)).round(2),
+            "PRECTOTCORR": np.maximum(0, rng.normal(0, 3, len(dates))).round(2),
+            "ALLSKY_SFC_SW_DWN": rng.normal(16, 2, len(dates)).round(2),
+        }, index=dates)
+        df = daily.transpose().reset_index().rename(columns={'index': 'date'})
+        df['district'] = f"District {i:03d}"
+        df.to_csv(os.path.join(out_dir, f"district_{i:03d}_weather_2018_2023.csv"), index=False)
+    return list_weather_files(out_dir)
+
+
+def compare(name: str, expected: pd.DataFrame, actual: pd.DataFrame):
+    expected = expected.reset_index(drop=True)
+    actual = actual.reset_index(drop=True)
+    assert list(expected['district']) == list(actual['district']), f"{name}: district order differs"
+    assert np.array_equal(expected['rabi_year'].to_numpy(), actual['rabi_year'].to_numpy()), f"{name}: years differ"
+    cols = list(AGGREGATIONS)
+    exact = (expected[cols].to_numpy() == actual[cols].to_numpy()).mean()
+    max_diff = np.nanmax(np.abs(expected[cols].to_numpy() - actual[cols].to_numpy()))
+    # The tolerance createData/rabi_aggregate.py documents
+    assert np.allclose(expected[cols].to_numpy(), actual[cols].to_numpy(), rtol=1e-12, atol=0, equal_nan=True), \
+        f"{name}: max abs diff {max_diff}"
+    print(f"✅ {name}: {len(actual)} rows, {exact:.1%} of values bit-identical, max abs diff {max_diff:.2e}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--input-dir")
+    parser.add_argument("--reference", help="Existing aggregated CSV to compare against")
+    parser.add_argument("--districts", type=int, default=600)
+    parser.add_argument("--workers", type=int)
+    args = parser.parse_args()
+
+    if args.input_dir:
+        files = list_weather_files(args.input_dir)
+    else:
+        files = write_synthetic_files(tempfile.mkdtemp(), args.districts)
+    print(f"{len(files)} district files")
+
+    start = time.perf_counter()
+    loop_df = run_loop(files)
+    loop_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    fast_df = aggregate_rabi(files, args.workers)
+    fast_s = time.perf_counter() - start
+
+    compare("loop vs single-pass", loop_df, fast_df)
+    if args.reference:
+        compare("reference CSV vs single-pass", pd.read_csv(args.reference), fast_df)
+
+    print(f"per-file loop: {loop_s:7.2f} s")
+    print(f"single pass:   {fast_s:7.2f} s  ({loop_s / fast_s:.1f}× faster)")
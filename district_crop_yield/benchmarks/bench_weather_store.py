@@ -0,0 +1,125 @@
+"""
+Benchmark and parity check for the memory-mapped daily weather store.
+
+Builds utils/weather_store.py from wide weather CSVs and checks that
+- Rabi-season aggregates match createData/rabi_aggregate.py for every district and year
+- random (district set, window, variable, reducer) queries match a pandas groupby over
+  the same daily data in long format
+then times store queries against that pandas reference.
+
+Usage:
+    python bench_weather_store.py [--districts 200] [--queries 2000]
+    python bench_weather_store.py --input-dir ../data/mp_weather_data
+"""
+
+import os
+import sys
+import time
+import argparse
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__),  '..')))
+
+from createData.rabi_aggregate import aggregate_rabi, list_weather_files, read_wide_file, AGGREGATIONS
+from utils.weather_store import build_store, WeatherStore, season_window, REDUCERS
+from benchmarks.bench_rabi_aggregate import write_synthetic_files
+
+
+def long_frame(files) -> pd.DataFrame:
+    """The daily data as (district, date) rows, the layout a pandas query would use."""
+    frames = []
+    for path in files:
+        district, header, variables, values = read_wide_file(path)
+        dates = pd.to_datetime(pd.Index(header).astype(float).astype(int).astype(str), format="%Y%m%d")
+        df = pd.DataFrame(values.T, columns=variables)
+        df['district'] = district
+        df['date'] = dates
+        frames.append(df)
+    return pd.concat(frames, ignore_index=True)
+
+
+def pandas_query(daily: pd.DataFrame, districts, start, end, variable, reducer) -> np.ndarray:
+    window = daily[daily['district'].isin(districts) & daily['date'].between(start, end)]
+    grouped = window.groupby('district')[variable]
+    out = grouped.count() if reducer == "count" else grouped.agg(reducer)
+    return out.reindex(districts).to_numpy(dtype=np.float64)
+
+
+def random_queries(store: WeatherStore, n: int, seed: int = 0) -> list:
+    rng = np.random.default_rng(seed)
+    queries = []
+    for _ in range(n):
+        districts = list(rng.choice(store.districts, size=rng.integers(1, min(20, len(store.districts)) + 1),
+                                    replace=False))
+        t0 = int(rng.integers(0, store.days - 1))
+        t1 = int(rng.integers(t0, min(store.days, t0 + 240)))
+        start, end = store.start + t0, store.start + t1
+        queries.append((districts, pd.Timestamp(start), pd.Timestamp(end),
+                        str(rng.choice(store.variables)), str(rng.choice(REDUCERS))))
+    return queries
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--input-dir")
+    parser.add_argument("--districts", type=int, default=200)
+    parser.add_argument("--queries", type=int, default=2000)
+    parser.add_argument("--pandas-queries", type=int, default=200)
+    args = parser.parse_args()
+
+    files = list_weather_files(args.input_dir) if args.input_dir else \
+        write_synthetic_files(tempfile.mkdtemp(), args.districts)
+    store_dir = os.path.join(tempfile.mkdtemp(), "weather_store")
+
+    start = time.perf_counter()
+    meta = build_store(files, store_dir)
+    build_s = time.perf_counter() - start
+    store = WeatherStore(store_dir)
+    print(f"{len(files)} district files -> {meta['shape']} store in {build_s:.2f} s")
+
+    # Rabi parity
+    rabi = aggregate_rabi(files)
+    first_year, last_year = pd.Timestamp(store.start).year, pd.Timestamp(store.start + store.days - 1).year
+    max_rel = 0.0
+    for rabi_year, group in rabi.groupby('rabi_year'):
+        if not first_year < rabi_year <= last_year:
+            continue
+        got = store.season("rabi", int(rabi_year) - 1, AGGREGATIONS, list(group['district']))
+        expected = group[list(AGGREGATIONS)].to_numpy()
+        rel = np.abs(got.to_numpy() - expected) / np.maximum(np.abs(expected), 1e-6)
+        max_rel = max(max_rel, float(np.nanmax(rel)))
+    assert max_rel < 1e-5, f"Rabi aggregates differ: max relative diff {max_rel:.2e}"
+    print(f"✅ Rabi aggregates match rabi_aggregate.py (max relative diff {max_rel:.2e}, float32 storage)")
+
+    # Random query parity against pandas
+    daily = long_frame(files)
+    queries = random_queries(store, args.queries)
+    for districts, q_start, q_end, variable, reducer in queries[:args.pandas_queries]:
+        expected = pandas_query(daily, districts, q_start, q_end, variable, reducer)
+        got = store.aggregate(q_start, q_end, reducer, districts, [variable])[:, 0]
+        assert np.allclose(got, expected, rtol=1e-5, atol=1e-4, equal_nan=True), \
+            f"{reducer} of {variable} over {q_start.date()}..{q_end.date()} differs"
+    print(f"✅ {min(args.pandas_queries, len(queries))} random queries match pandas")
+
+    start = time.perf_counter()
+    for districts, q_start, q_end, variable, reducer in queries[:args.pandas_queries]:
+        pandas_query(daily, districts, q_start, q_end, variable, reducer)
+    pandas_us = (time.perf_counter() - start) / min(args.pandas_queries, len(queries)) * 1e6
+
+    latencies = {r: [] for r in REDUCERS}
+    for districts, q_start, q_end, variable, reducer in queries:
+        t = time.perf_counter()
+        store.aggregate(q_start, q_end, reducer, districts, [variable])
+        latencies[reducer].append((time.perf_counter() - t) * 1e6)
+
+    print(f"pandas groupby:  {pandas_us:10.1f} µs/query")
+    for reducer, lat in latencies.items():
+        print(f"store {reducer:<6}    p50={np.percentile(lat, 50):7.1f} µs  p95={np.percentile(lat, 95):7.1f} µs")
+    start_d, end_d = season_window("rabi", first_year)
+    t = time.perf_counter()
+    store.aggregate(start_d, end_d, "mean")
+    print(f"all {len(store.districts)} districts × {len(store.variables)} variables, one Rabi season mean: "
+          f"{(time.perf_counter() - t) * 1e6:.1f} µs")
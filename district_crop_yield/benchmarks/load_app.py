@@ -0,0 +1,119 @@
+"""
+Concurrent load driver for the Flask app running against recorded services.
+
+Record fixtures once on a machine with credentials, then replay them anywhere:
+
+    # 1. record: run the app with SERVICE_MODE=record against the real services
+    (cd ../app && SERVICE_MODE=record gunicorn -c gunicorn.conf.py) &
+    python load_app.py --requests 50 --concurrency 1
+
+    # 2. replay on an isolated machine; with POWER_BASE_URL set, POWER stays live
+    #    (see SERVICE_MODES in utils/replay.py) and goes over HTTP to the stand-in
+    python ../utils/standin_server.py --port 8765 &
+    (cd ../app && SERVICE_MODE=replay REPLAY_MISS=any POWER_BASE_URL=http://127.0.0.1:8765 \\
+        gunicorn -c gunicorn.conf.py) &
+    python load_app.py --url http://127.0.0.1:5000 --requests 2000 --concurrency 32
+
+SERVICE_MODE applies to the app process; this script only sends requests and reports
+throughput, latency percentiles and errors per endpoint.
+
+Usage:
+    python load_app.py [--url http://127.0.0.1:5000] [--requests 500] [--concurrency 16] [--mix yield=4,query=1]
+"""
+
+import time
+import random
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import requests
+
+DISTRICTS = ["Bhopal", "Indore", "Sehore", "Vidisha", "Ujjain", "Dewas", "Raisen", "Khandwa", "Agar malwa"]
+CROPS = ["Wheat", "Gram", "Mustard", "Barley"]
+QUERIES = [
+    "What will be the rate of Wheat in Indore for the year 2026?",
+    "How much yield can I expect for gram in Sehore this rabi season?",
+    "Should I take crop insurance for my wheat farm?",
+]
+
+_local = threading.local()
+
+
+def _session() -> requests.Session:
+    if not hasattr(_local, "session"):
+        _local.session = requests.Session()
+    return _local.session
+
+
+def yield_request(rng: random.Random) -> tuple:
+    return "POST", "/api/submit_initial_inputs", {
+        "district": rng.choice(DISTRICTS),
+        "crop": rng.choice(CROPS),
+        "year": rng.choice([2022, 2023, 2024]),
+        "farmArea": rng.choice([1.0, 2.5, 5.0]),
+        "loanAmount": 100000,
+        "interestRate": 7.0,
+        "month": rng.choice(["November", "January"]),
+        "nonFarmIncome": 5000,
+        "inputCost": 30000,
+        "monthlyExpenses": 8000,
+        "tenure": 12,
+        "insurancePremium": 1500,
+    }
+
+
+def query_request(rng: random.Random) -> tuple:
+    return "POST", "/api/submit_query", {"query": rng.choice(QUERIES), "lang": rng.choice(["en", "hi"])}
+
+
+REQUEST_KINDS = {"yield": yield_request, "query": query_request}
+
+
+def _parse_mix(mix: str) -> list:
+    kinds = []
+    for item in mix.split(","):
+        name, weight = item.split("=")
+        kinds += [name.strip()] * int(weight)
+    return kinds
+
+
+def _send(base_url: str, kind: str, seed: int, timeout_s: float) -> dict:
+    method, path, body = REQUEST_KINDS[kind](random.Random(seed))
+    start = time.perf_counter()
+    try:
+        resp = _session().request(method, base_url + path, json=body, timeout=timeout_s)
+        ok = resp.status_code < 400
+    except requests.RequestException:
+        ok = False
+    return {"kind": kind, "ok": ok, "latency_s": time.perf_counter() - start}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--url", default="http://127.0.0.1:5000")
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--mix", default="yield=4,query=1")
+    parser.add_argument("--timeout", type=float, default=120)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    kinds = _parse_mix(args.mix)
+    rng = random.Random(args.seed)
+    plan = [(rng.choice(kinds), rng.randrange(2 ** 31)) for _ in range(args.requests)]
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        results = list(pool.map(lambda p: _send(args.url, p[0], p[1], args.timeout), plan))
+    wall_s = time.perf_counter() - start
+
+    print(f"{len(results)} requests at concurrency {args.concurrency} in {wall_s:.1f} s "
+          f"({len(results) / wall_s:.1f} req/s)")
+    for kind in sorted(set(r["kind"] for r in results)):
+        rows = [r for r in results if r["kind"] == kind]
+        lat = np.array([r["latency_s"] for r in rows]) * 1000
+        errors = sum(not r["ok"] for r in rows)
+        print(f"  {kind:<6} n={len(rows):<5} p50={np.percentile(lat, 50):7.0f} ms  "
+              f"p95={np.percentile(lat, 95):7.0f} ms  p99={np.percentile(lat, 99):7.0f} ms  errors={errors}")
@@ -0,0 +1,175 @@
+"""
+build_dataset.py
+
+Incremental build of full_data_crop_yield.csv.
+
+The merged training table is kept as one Parquet partition per district under
+data/full_data_parts/, next to a manifest holding a content hash of each district's
+rows in the three inputs (Rabi weather, indices, crop yields). A rebuild only
+re-merges districts whose hash changed, drops partitions of districts that are gone,
+and then derives the CSV from the partitions in the row order final_data.py produces.
+If none of the input files changed size or mtime, nothing is read at all.
+
+Usage:
+    python build_dataset.py [--full]
+"""
+
+import os
+import sys
+import json
+import time
+import hashlib
+import argparse
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__),  '..')))
+from utils.data_cache import read_table
+from createData.final_data import RABI_PATH, INDICES_PATH, CROPS_PATH, OUTPUT_PATH, merge_inputs
+
+current_dir = os.path.dirname(__file__)
+PARTS_DIR = os.path.join(current_dir, "../data/full_data_parts")
+MANIFEST_NAME = "manifest.json"
+
+# Position of each row within its district's rows of the crop table; ties partition
+# rows back to the crop table's global order when the CSV is assembled
+ROW_KEY = "_crop_row"
+
+
+def _slug(name: str) -> str:
+    return name.lower().replace(" ", "_")
+
+
+def _file_stamp(path: str) -> dict:
+    stat = os.stat(path)
+    return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+
+def _load_manifest(parts_dir: str) -> dict:
+    path = os.path.join(parts_dir, MANIFEST_NAME)
+    if not os.path.exists(path):
+        return {"inputs": {}, "districts": {}}
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _save_manifest(parts_dir: str, manifest: dict):
+    path = os.path.join(parts_dir, MANIFEST_NAME)
+    with open(f"{path}.tmp", "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=1)
+    os.replace(f"{path}.tmp", path)
+
+
+def district_hashes(tables: dict, districts) -> dict:
+    """
+    sha1 per district over its rows in every input table.
+
+    Rows are hashed once per table with pandas' vectorised row hash; a district's digest
+    covers each table's column layout and the hashes of its rows, in order.
+    """
+    digests = {d: hashlib.sha1() for d in districts}
+    for name, df in tables.items():
+        header = f"{name}|{list(df.columns)}|{list(df.dtypes.astype(str))}".encode()
+        row_hashes = pd.util.hash_pandas_object(df, index=False).to_numpy()
+        groups = df.groupby('district', sort=False).indices
+        for district, digest in digests.items():
+            digest.update(header)
+            digest.update(row_hashes[groups.get(district, np.array([], dtype=np.intp))].tobytes())
+    return {d: digest.hexdigest() for d, digest in digests.items()}
+
+
+def _write_partition(path: str, df: pd.DataFrame):
+    df.to_parquet(f"{path}.tmp", index=False)
+    os.replace(f"{path}.tmp", path)
+
+
+def assemble_csv(parts_dir: str, manifest: dict, all_crops: pd.DataFrame, output_path: str) -> int:
+    """Concatenate the partitions in crop-table order and write the CSV; returns its row count."""
+    parts = [pd.read_parquet(os.path.join(parts_dir, info["file"])) for info in manifest["districts"].values()]
+    combined = pd.concat(parts, ignore_index=True)
+
+    positions = pd.DataFrame({
+        'district': all_crops['district'],
+        ROW_KEY: all_crops.groupby('district', sort=False).cumcount(),
+        '_pos': np.arange(len(all_crops)),
+    })
+    combined = combined.merge(positions, on=['district', ROW_KEY], how='left')
+    combined = combined.sort_values('_pos', kind='stable').drop(columns=[ROW_KEY, '_pos'])
+
+    combined.to_csv(f"{output_path}.tmp", index=False)
+    os.replace(f"{output_path}.tmp", output_path)
+    return len(combined)
+
+
+def build(full: bool = False, rabi_path: str = RABI_PATH, indices_path: str = INDICES_PATH,
+          crops_path: str = CROPS_PATH, parts_dir: str = PARTS_DIR, output_path: str = OUTPUT_PATH) -> dict:
+    """
+    Bring the partitions and the CSV up to date with the inputs.
+
+    Args:
+        full (bool): Re-merge every district regardless of the manifest.
+
+    Returns:
+        dict: Districts rebuilt, removed and unchanged, and the CSV row count.
+    """
+    os.makedirs(parts_dir, exist_ok=True)
+    manifest = {"inputs": {}, "districts": {}} if full else _load_manifest(parts_dir)
+    paths = {"rabi": rabi_path, "indices": indices_path, "crops": crops_path}
+    stamps = {name: _file_stamp(p) for name, p in paths.items()}
+
+    if not full and manifest["inputs"] == stamps and os.path.exists(output_path):
+        print("✅ Inputs unchanged, dataset is up to date")
+        return {"rebuilt": [], "removed": [], "unchanged": len(manifest["districts"]), "rows": None}
+
+    tables = {name: read_table(p) for name, p in paths.items()}
+    all_crops = tables["crops"].copy()
+    all_crops[ROW_KEY] = all_crops.groupby('district', sort=False).cumcount()
+    districts = list(all_crops['district'].dropna().unique())
+    hashes = district_hashes(tables, districts)
+
+    groups = {name: df.groupby('district', sort=False).indices for name, df in tables.items()}
+    groups["crops"] = all_crops.groupby('district', sort=False).indices
+    rebuilt = []
+    for district in districts:
+        previous = manifest["districts"].get(district)
+        file_name = f"{_slug(district)}.parquet"
+        if previous and previous["hash"] == hashes[district] and os.path.exists(os.path.join(parts_dir, file_name)):
+            continue
+
+        empty = np.array([], dtype=np.intp)
+        merged = merge_inputs(
+            tables["rabi"].iloc[groups["rabi"].get(district, empty)],
+            tables["indices"].iloc[groups["indices"].get(district, empty)],
+            all_crops.iloc[groups["crops"][district]],
+        )
+        _write_partition(os.path.join(parts_dir, file_name), merged)
+        manifest["districts"][district] = {"hash": hashes[district], "file": file_name, "rows": len(merged)}
+        rebuilt.append(district)
+
+    removed = [d for d in manifest["districts"] if d not in hashes]
+    for district in removed:
+        path = os.path.join(parts_dir, manifest["districts"].pop(district)["file"])
+        if os.path.exists(path):
+            os.remove(path)
+
+    rows = assemble_csv(parts_dir, manifest, tables["crops"], output_path)
+    manifest["inputs"] = stamps
+    _save_manifest(parts_dir, manifest)
+
+    print(f"✅ Rebuilt {len(rebuilt)} of {len(districts)} districts, removed {len(removed)}; "
+          f"{rows} rows in '{output_path}'")
+    return {"rebuilt": rebuilt, "removed": removed,
+            "unchanged": len(districts) - len(rebuilt), "rows": rows}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Incrementally rebuild full_data_crop_yield.csv.")
+    parser.add_argument("--full", action="store_true", help="Re-merge every district")
+    parser.add_argument("--parts-dir", default=PARTS_DIR)
+    parser.add_argument("--output", default=OUTPUT_PATH)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    build(args.full, parts_dir=args.parts_dir, output_path=args.output)
+    print(f"Done in {time.perf_counter() - start:.2f} s")
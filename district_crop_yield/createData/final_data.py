@@ -1,13 +1,36 @@
 import pandas as pd
+import os
+import sys
 
-df_rabi = pd.read_csv("/content/all_districts_rabi_aggregated.csv")
-ind_df = pd.read_csv("/content/mp_all_district_indicies.csv")
-all_crops = pd.read_csv("/content/all_crops_all_districts.csv")
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__),  '..')))
+from utils.data_cache import read_table
 
-all_crops['Year'] = all_crops['Year'].astype(str).str.split(' - ').str[0].astype(int)
-df_rabi.rename(columns={'rabi_year': 'year'}, inplace=True)
-merged_df = pd.merge(df_rabi, ind_df, on=['district', 'year'], how='inner')
-merged_df = all_crops.merge(merged_df, right_on=['district', 'year'], left_on=['district', 'Year'], how='left')
-merged_df = merged_df.dropna()
+current_dir = os.path.dirname(__file__)
+RABI_PATH = os.path.join(current_dir, "../data/all_districts_rabi_aggregated.csv")
+INDICES_PATH = os.path.join(current_dir, "../data/mp_all_district_indicies.csv")
+CROPS_PATH = os.path.join(current_dir, "../data/all_crops_all_districts.csv")
+OUTPUT_PATH = os.path.join(current_dir, "../data/full_data_crop_yield.csv")
 
-merged_df.to_csv("./../data/full_data_crop_yield.csv", index=False)
\ No newline at end of file
+
+def merge_inputs(df_rabi, ind_df, all_crops):
+    """
+    Join yields with Rabi weather and indices on (district, year).
+
+    Works the same on the full tables or on one district's rows of each, which is how
+    createData/build_dataset.py rebuilds only the districts that changed.
+    """
+    all_crops = all_crops.copy()
+    all_crops['Year'] = all_crops['Year'].astype(str).str.split(' - ').str[0].astype(int)
+    df_rabi = df_rabi.rename(columns={'rabi_year': 'year'})
+    merged_df = pd.merge(df_rabi, ind_df, on=['district', 'year'], how='inner')
+    merged_df = all_crops.merge(merged_df, right_on=['district', 'year'], left_on=['district', 'Year'], how='left')
+    return merged_df.dropna()
+
+
+if __name__ == "__main__":
+    df_rabi = read_table(RABI_PATH)
+    ind_df = read_table(INDICES_PATH)
+    all_crops = read_table(CROPS_PATH)
+
+    merged_df = merge_inputs(df_rabi, ind_df, all_crops)
+    merged_df.to_csv(OUTPUT_PATH, index=False)
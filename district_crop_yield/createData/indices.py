@@ -1,6 +1,11 @@
 import ee
 import pandas as pd
 import os
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__),  '..')))
+from utils.data_cache import read_table
+from utils.index_resolution import resolve_scale, auto_scale
 
 # Initialize Earth Engine
 
@@ -9,7 +14,7 @@ ee.Initialize(project='concise-complex-428704-s9')
 
 # ---- Step 1: Load shapefile ----
 districts = ee.FeatureCollection("projects/concise-complex-428704-s9/assets/india_districts")
-coord_df = pd.read_csv("./../data/district wise centroids.csv")
+coord_df = read_table("./../data/district_wise_centroids.csv")
 coord_df_mp = coord_df[coord_df['State'] == "Madhya Pradesh"]
 new_district = coord_df['District'].tolist()
 district_names = new_district
@@ -19,7 +24,7 @@ if not os.path.exists(OUTPUT_dir):
     os.makedirs(OUTPUT_dir)
 
 # ---- Step 2: Define Rabi season range and processing logic ----
-def get_rabi_indices_for_year(year, district_name):
+def get_rabi_indices_for_year(year, district_name, scale=None):
     start_date = ee.Date.fromYMD(year, 11, 1)   # Nov 1
     end_date = ee.Date.fromYMD(year + 1, 2, 28) # Feb 28
 
@@ -55,13 +60,16 @@ def get_rabi_indices_for_year(year, district_name):
 
     s2_indices = s2_clean.map(add_indices)
 
-    # Mean over season
+    # Mean over season, at INDEX_SCALE (10 m unless set) or a pinned scale
+    scale = resolve_scale(scale)
+    if scale == "auto":
+        scale = auto_scale(ee, district_name.geometry())
     mean_indices = s2_indices.select(['NDVI', 'EVI', 'NDWI']) \
                               .mean() \
                               .reduceRegion(
                                   reducer=ee.Reducer.mean(),
                                   geometry=district_name.geometry(),
-                                  scale=10,
+                                  scale=scale,
                                   maxPixels=1e13
                               )
     return ee.Dictionary(mean_indices).set('year', year)
@@ -97,7 +105,7 @@ csv_files = [f for f in os.listdir(input_folder) if f.endswith('.csv')]
 for filename in csv_files:
         file_path = os.path.join(input_folder, filename)
         try:
-            df = pd.read_csv(file_path)
+            df = read_table(file_path)
             all_dataframes.append(df)
             print(f"  - Successfully read '{filename}'")
         except Exception as e:
@@ -0,0 +1,253 @@
+"""
+indices_batch.py
+
+Batched replacement for the per-district loop in indices.py.
+
+indices.py filters the district FeatureCollection by name and calls getInfo() once per
+district. Here each Rabi season composite is reduced over a whole chunk of district
+geometries with reduceRegions, the seasons are merged into one collection, and each
+chunk is fetched with a single getInfo(), so ~50 round trips become one per chunk.
+
+- a chunk that hits an EE limit (too many elements, timeout, memory) is split in half
+  and retried
+- --export drive starts a single Export.table.toDrive task for every district instead
+- --backend fake runs the same orchestration against createData/fake_ee.py offline
+
+Usage:
+    python indices_batch.py [--state "Madhya Pradesh"] [--chunk-size 25]
+    python indices_batch.py --export drive --drive-folder indices
+    python indices_batch.py --backend fake
+"""
+
+import os
+import sys
+import time
+import argparse
+
+import pandas as pd
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__),  '..')))
+from utils.data_cache import read_table
+from utils.index_resolution import choose_scale, resolve_scale
+
+current_dir = os.path.dirname(__file__)
+CENTROIDS_PATH = os.path.join(current_dir, "../data/district_wise_centroids.csv")
+OUTPUT_PATH = os.path.join(current_dir, "../data/mp_all_district_indicies.csv")
+
+EE_PROJECT = 'concise-complex-428704-s9'
+DISTRICTS_ASSET = f"projects/{EE_PROJECT}/assets/india_districts"
+INDEX_BANDS = ['NDVI', 'EVI', 'NDWI']
+OUTPUT_COLUMNS = ['year'] + INDEX_BANDS + ['district']
+
+
+# ---------------------------
+# Earth Engine graph
+# ---------------------------
+def season_indices_image(ee, year: int, region):
+    """Mean NDVI/EVI/NDWI composite for the Rabi season starting in `year` (as indices.py)."""
+    start_date = ee.Date.fromYMD(year, 11, 1)   # Nov 1
+    end_date = ee.Date.fromYMD(year + 1, 2, 28) # Feb 28
+
+    s2 = ee.ImageCollection("COPERNICUS/S2_SR") \
+        .filterBounds(region) \
+        .filterDate(start_date, end_date) \
+        .filter(ee.Filter.lt('CLOUDY_PIXEL_PERCENTAGE', 20))
+
+    def mask_clouds(image):
+        return image.updateMask(image.select('MSK_CLDPRB').lt(20))
+
+    def add_indices(image):
+        nir = image.select('B8')
+        red = image.select('B4')
+        swir = image.select('B11')
+        blue = image.select('B2')
+
+        ndvi = nir.subtract(red).divide(nir.add(red)).rename('NDVI')
+        evi = nir.subtract(red).multiply(2.5) \
+              .divide(nir.add(red.multiply(6)).subtract(blue.multiply(7.5)).add(1)) \
+              .rename('EVI')
+        ndwi = nir.subtract(swir).divide(nir.add(swir)).rename('NDWI')
+        return image.addBands([ndvi, evi, ndwi])
+
+    return s2.map(mask_clouds).map(add_indices).select(INDEX_BANDS).mean()
+
+
+def district_features(ee, districts_fc, names):
+    """
+    One feature per requested name, with the union of every asset feature carrying that
+    NAME_2, which is the geometry indices.py reduced over after filtering by name.
+    """
+    return ee.FeatureCollection(ee.List(names).map(
+        lambda name: ee.Feature(districts_fc.filter(ee.Filter.eq("NAME_2", name)).geometry(), {"NAME_2": name})
+    ))
+
+
+def district_areas(ee, districts_fc, names) -> dict:
+    """NAME_2 -> area in km² for `names`, in one request."""
+    info = district_features(ee, districts_fc, names) \
+        .map(lambda feature: feature.set('area_m2', feature.geometry().area(1000))) \
+        .select(['NAME_2', 'area_m2'], None, False) \
+        .getInfo()
+    return {f['properties']['NAME_2']: f['properties'].get('area_m2', 0) / 1e6 for f in info['features']}
+
+
+def plan_scales(ee, districts_fc, names, scale) -> dict:
+    """Scale (m) -> districts reduced at it; one group unless scale is "auto"."""
+    if scale != "auto":
+        return {scale: list(names)}
+    areas = district_areas(ee, districts_fc, names)
+    groups = {}
+    for name in names:
+        groups.setdefault(choose_scale(areas.get(name, 0)), []).append(name)
+    return dict(sorted(groups.items()))
+
+
+def _tag_year(year):
+    return lambda feature: feature.set('year', year)
+
+
+def indices_collection(ee, districts_fc, names, years, scale: int = 10, tile_scale: int = 4):
+    """All (district, season) index means for `names` as one lazy FeatureCollection."""
+    regions = district_features(ee, districts_fc, names)
+    merged = None
+    for year in years:
+        stats = season_indices_image(ee, year, regions).reduceRegions(
+            collection=regions,
+            reducer=ee.Reducer.mean(),
+            scale=scale,
+            tileScale=tile_scale,
+        )
+        stats = stats.map(_tag_year(year))
+        merged = stats if merged is None else merged.merge(stats)
+    return merged.select(['NAME_2', 'year'] + INDEX_BANDS, None, False)
+
+
+# ---------------------------
+# Extraction
+# ---------------------------
+def _fetch_chunk(ee, districts_fc, names, years, scale, tile_scale, stats: dict) -> list:
+    stats["requests"] += 1
+    try:
+        info = indices_collection(ee, districts_fc, names, years, scale, tile_scale).getInfo()
+    except ee.EEException as e:
+        if len(names) == 1:
+            raise
+        half = len(names) // 2
+        print(f"Splitting chunk of {len(names)} districts ({e})")
+        return (_fetch_chunk(ee, districts_fc, names[:half], years, scale, tile_scale, stats)
+                + _fetch_chunk(ee, districts_fc, names[half:], years, scale, tile_scale, stats))
+    return [f['properties'] for f in info['features']]
+
+
+def _to_frame(rows) -> pd.DataFrame:
+    df = pd.DataFrame(rows).rename(columns={'NAME_2': 'district'})
+    return df.reindex(columns=OUTPUT_COLUMNS)
+
+
+def extract_indices(ee, districts_fc, district_names, years, chunk_size: int = 25,
+                    scale=None, tile_scale: int = 4) -> pd.DataFrame:
+    """
+    Rabi-season NDVI/EVI/NDWI means for every district and year.
+
+    Args:
+        ee: The earthengine module (or a fake_ee.FakeEarthEngine).
+        districts_fc: District boundaries FeatureCollection with a NAME_2 property.
+        district_names (list): Districts to extract.
+        years (list): Season start years.
+        chunk_size (int): Districts per request.
+        scale: Pixel scale in metres for reduceRegions, or "auto" to group districts by
+               the scale their area calls for (default: INDEX_SCALE).
+        tile_scale (int): EE tileScale; higher values trade speed for memory.
+
+    Returns:
+        pd.DataFrame: year, NDVI, EVI, NDWI, district, in district order then year.
+    """
+    names = list(dict.fromkeys(district_names))
+    scale = resolve_scale(scale)
+    stats = {"requests": 1 if scale == "auto" else 0}
+    rows = []
+    start = time.perf_counter()
+    groups = plan_scales(ee, districts_fc, names, scale)
+    print("Scales: " + ", ".join(f"{s} m × {len(g)}" for s, g in groups.items()))
+
+    done = 0
+    for group_scale, group in groups.items():
+        for i in range(0, len(group), chunk_size):
+            chunk = group[i:i + chunk_size]
+            rows.extend(_fetch_chunk(ee, districts_fc, chunk, years, group_scale, tile_scale, stats))
+            done += len(chunk)
+            print(f"✅ {done}/{len(names)} districts")
+
+    df = _to_frame(rows)
+    order = {name: i for i, name in enumerate(names)}
+    df = df.sort_values(['district', 'year'], key=lambda s: s.map(order) if s.name == 'district' else s,
+                        kind='stable').reset_index(drop=True)
+
+    missing = df.loc[df[INDEX_BANDS].isna().all(axis=1), 'district'].unique()
+    if len(missing):
+        print(f"❌ No imagery or boundary for: {', '.join(missing)}")
+    print(f"{len(names)} districts × {len(years)} seasons in {stats['requests']} requests "
+          f"({time.perf_counter() - start:.1f} s)")
+    return df
+
+
+def export_indices(ee, districts_fc, district_names, years, description: str = "rabi_indices",
+                   folder: str = None, scale=None, tile_scale: int = 4):
+    """Start one Drive export task covering every district and season; returns the task."""
+    groups = plan_scales(ee, districts_fc, list(dict.fromkeys(district_names)), resolve_scale(scale))
+    collection = None
+    for group_scale, group in groups.items():
+        part = indices_collection(ee, districts_fc, group, years, group_scale, tile_scale)
+        collection = part if collection is None else collection.merge(part)
+    task = ee.batch.Export.table.toDrive(
+        collection=collection,
+        description=description,
+        folder=folder,
+        fileFormat='CSV',
+        selectors=['year'] + INDEX_BANDS + ['NAME_2'],
+    )
+    task.start()
+    return task
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Batched Rabi-season index extraction from Earth Engine.")
+    parser.add_argument("--state", default="Madhya Pradesh")
+    parser.add_argument("--start-year", type=int, default=2018)
+    parser.add_argument("--end-year", type=int, default=2022)
+    parser.add_argument("--chunk-size", type=int, default=25)
+    parser.add_argument("--scale", help='Metres, or "auto" to choose by district area (default: INDEX_SCALE)')
+    parser.add_argument("--tile-scale", type=int, default=4)
+    parser.add_argument("--backend", choices=["ee", "fake"], default="ee")
+    parser.add_argument("--fake-limit", type=int, help="Elements per request before the fake backend fails")
+    parser.add_argument("--export", choices=["drive"], help="Start a batch export instead of fetching")
+    parser.add_argument("--drive-folder")
+    parser.add_argument("--output", default=OUTPUT_PATH)
+    args = parser.parse_args()
+
+    coord_df = read_table(CENTROIDS_PATH)
+    if args.state:
+        coord_df = coord_df[coord_df['State'] == args.state]
+    district_names = coord_df['District'].tolist()
+    years = list(range(args.start_year, args.end_year + 1))
+
+    if args.backend == "fake":
+        from createData.fake_ee import FakeEarthEngine
+        ee = FakeEarthEngine(district_names, max_features_per_request=args.fake_limit)
+    else:
+        import ee
+        ee.Initialize(project=EE_PROJECT)
+    districts_fc = ee.FeatureCollection(DISTRICTS_ASSET)
+
+    if args.export:
+        task = export_indices(ee, districts_fc, district_names, years, folder=args.drive_folder,
+                              scale=args.scale, tile_scale=args.tile_scale)
+        print(f"✅ Started export task '{task.id}'")
+    else:
+        df = extract_indices(ee, districts_fc, district_names, years, args.chunk_size,
+                             args.scale, args.tile_scale)
+        if args.backend == "fake":
+            print(f"Per-district loop would have made {len(district_names)} requests")
+        else:
+            df.to_csv(args.output, index=False)
+            print(f"✅ Saved {len(df)} rows to '{args.output}'")
@@ -0,0 +1,269 @@
+"""
+power_downloader.py
+
+Async bulk downloader for NASA POWER daily point data.
+
+- token-bucket rate limiter shared by all requests (replaces the fixed time.sleep(2))
+- bounded concurrency via a semaphore
+- retry with exponential backoff and jitter on timeouts, 429 and 5xx responses
+- one request per POWER grid cell pair (meteorology and solar), made at the first
+  district's centroid and shared by every district in the same cells (see
+  utils/power_grid.py)
+- a manifest of completed (cell, start, end) units and the district files written
+  for each, so a rerun only fetches what is missing; a district added to a fetched
+  cell (e.g. --all-states after --state) gets a copy of that cell's cached series
+- each unit is written as long-format Parquet under
+  data/power_store/<state>/<district>/<start>_<end>.parquet
+
+Usage:
+    python power_downloader.py --state "Madhya Pradesh" --start-year 2018 --end-year 2023
+    python power_downloader.py --all-states --concurrency 8 --rate 4
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import asyncio
+import argparse
+
+import aiohttp
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__),  '..')))
+from utils.data_cache import read_table
+from utils.calcWeather import POWER_DAILY_URL, WEATHER_PARAMS
+from utils.power_grid import PowerGrid
+
+current_dir = os.path.dirname(__file__)
+CENTROIDS_PATH = os.path.join(current_dir, "../data/district_wise_centroids.csv")
+STORE_DIR = os.path.join(current_dir, "../data/power_store")
+MANIFEST_NAME = "manifest.json"
+
+POWER_FILL_VALUE = -999.0
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class TokenBucket:
+    """Allows `rate` requests per second on average, with bursts up to `capacity`."""
+
+    def __init__(self, rate: float, capacity: int = 1):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+class Manifest:
+    """JSON record of finished units, rewritten atomically after every unit."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = asyncio.Lock()
+        self.completed = {}
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                self.completed = json.load(f).get("completed", {})
+
+    @staticmethod
+    def key(unit: dict) -> str:
+        return f"{unit['lat']},{unit['lon']}|{unit['start']}|{unit['end']}"
+
+    def is_done(self, unit: dict) -> bool:
+        return self.key(unit) in self.completed
+
+    def missing_districts(self, unit: dict, store_dir: str) -> list:
+        """(state, district) pairs of a done unit that have no file for it yet."""
+        files = set(self.completed[self.key(unit)].get("files", []))
+        return [(state, district) for state, district in unit["districts"]
+                if os.path.relpath(unit_path(store_dir, state, district, unit), store_dir) not in files]
+
+    async def mark_done(self, unit: dict, info: dict):
+        async with self._lock:
+            previous = self.completed.get(self.key(unit), {}).get("files", [])
+            info = dict(info, files=sorted(set(previous) | set(info["files"])))
+            self.completed[self.key(unit)] = info
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"completed": self.completed}, f, indent=1)
+            os.replace(tmp_path, self.path)
+
+
+def _slug(name: str) -> str:
+    return name.lower().replace(" ", "_")
+
+
+def plan_units(grid: PowerGrid, start_year: int, end_year: int) -> list:
+    """One unit per grid cell and calendar year, so progress is saved year by year."""
+    units = []
+    for cell, districts in grid.cell_districts.items():
+        lat, lon = grid.cell_point[cell]
+        for year in range(start_year, end_year + 1):
+            units.append({
+                "lat": lat, "lon": lon, "districts": districts,
+                "start": f"{year}0101", "end": f"{year}1231",
+            })
+    return units
+
+
+def to_long_frame(payload: dict, state: str, district: str) -> pd.DataFrame:
+    df = pd.DataFrame(payload['properties']['parameter'])
+    df.index = pd.to_datetime(df.index, format="%Y%m%d")
+    df = df.replace(POWER_FILL_VALUE, np.nan).astype("float32")
+    df.index.name = "date"
+    df = df.reset_index()
+    df['district'] = district
+    df['state'] = state
+    return df
+
+
+def write_unit_files(df: pd.DataFrame, store_dir: str, unit: dict, districts) -> list:
+    """Write a cell's long frame once per district; returns the paths relative to the store."""
+    files = []
+    for state, district in districts:
+        df = df.assign(district=district, state=state)
+        path = unit_path(store_dir, state, district, unit)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        df.to_parquet(f"{path}.tmp", index=False)
+        os.replace(f"{path}.tmp", path)
+        files.append(os.path.relpath(path, store_dir))
+    return files
+
+
+def unit_path(store_dir: str, state: str, district: str, unit: dict) -> str:
+    return os.path.join(store_dir, _slug(state), _slug(district),
+                        f"{unit['start']}_{unit['end']}.parquet")
+
+
+def _label(unit: dict) -> str:
+    return f"{'/'.join(d for _, d in unit['districts'])} {unit['start']}-{unit['end']}"
+
+
+async def fetch_unit(session, unit, bucket, semaphore, max_retries: int = 5, timeout_s: int = 60):
+    params = {
+        "parameters": ",".join(WEATHER_PARAMS),
+        "community": "AG",
+        "longitude": unit["lon"],
+        "latitude": unit["lat"],
+        "start": unit["start"],
+        "end": unit["end"],
+        "format": "JSON",
+    }
+    async with semaphore:
+        for attempt in range(max_retries + 1):
+            await bucket.acquire()
+            try:
+                async with session.get(POWER_DAILY_URL, params=params,
+                                       timeout=aiohttp.ClientTimeout(total=timeout_s)) as resp:
+                    if resp.status in RETRY_STATUSES:
+                        raise aiohttp.ClientResponseError(resp.request_info, resp.history, status=resp.status)
+                    resp.raise_for_status()
+                    return await resp.json()
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                status = getattr(e, "status", None)
+                if attempt == max_retries or (status is not None and status not in RETRY_STATUSES):
+                    raise
+                delay = min(60, 2 ** attempt) + random.uniform(0, 1)
+                print(f"Retrying {_label(unit)} in {delay:.1f}s ({e})")
+                await asyncio.sleep(delay)
+
+
+async def download_all(units, store_dir: str = STORE_DIR, concurrency: int = 4, rate: float = 2.0) -> dict:
+    """
+    Fetch every unit not already in the manifest.
+
+    Returns:
+        dict: Counts of fetched, skipped and failed units.
+    """
+    os.makedirs(store_dir, exist_ok=True)
+    manifest = Manifest(os.path.join(store_dir, MANIFEST_NAME))
+    pending = []
+    refanned = 0
+    for unit in units:
+        if not manifest.is_done(unit):
+            pending.append(unit)
+            continue
+        missing = manifest.missing_districts(unit, store_dir)
+        if not missing:
+            continue
+        # The cell was fetched for other districts: copy its series instead of fetching again
+        cached = [os.path.join(store_dir, f) for f in manifest.completed[manifest.key(unit)]["files"]]
+        cached = [f for f in cached if os.path.exists(f)]
+        if not cached:
+            pending.append(unit)
+            continue
+        files = write_unit_files(pd.read_parquet(cached[0]), store_dir, unit, missing)
+        await manifest.mark_done(unit, {"rows": manifest.completed[manifest.key(unit)]["rows"], "files": files})
+        refanned += 1
+    print(f"{len(units) - len(pending)} of {len(units)} units already downloaded "
+          f"({refanned} copied to newly covered districts)")
+
+    bucket = TokenBucket(rate, capacity=max(1, concurrency))
+    semaphore = asyncio.Semaphore(concurrency)
+    stats = {"fetched": 0, "skipped": len(units) - len(pending), "copied": refanned, "failed": 0}
+
+    async def run(session, unit):
+        try:
+            payload = await fetch_unit(session, unit, bucket, semaphore)
+            # Fan the cell's series out to every district it covers
+            state, district = unit["districts"][0]
+            df = to_long_frame(payload, state, district)
+            files = write_unit_files(df, store_dir, unit, unit["districts"])
+            await manifest.mark_done(unit, {"rows": len(df), "files": files})
+            stats["fetched"] += 1
+            print(f"✅ {_label(unit)}")
+        except Exception as e:
+            stats["failed"] += 1
+            print(f"❌ {_label(unit)}: {e}")
+
+    async with aiohttp.ClientSession() as session:
+        await asyncio.gather(*(run(session, u) for u in pending))
+    return stats
+
+
+def load_store(store_dir: str = STORE_DIR, state: str = None) -> pd.DataFrame:
+    """Read the downloaded Parquet partitions back as one long frame."""
+    root = os.path.join(store_dir, _slug(state)) if state else store_dir
+    files = [os.path.join(d, f) for d, _, names in os.walk(root) for f in names if f.endswith(".parquet")]
+    return pd.concat([pd.read_parquet(f) for f in sorted(files)], ignore_index=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Bulk download NASA POWER daily weather per district.")
+    group = parser.add_mutually_exclusive_group()
+    group.add_argument("--state", default="Madhya Pradesh")
+    group.add_argument("--all-states", action="store_true")
+    parser.add_argument("--start-year", type=int, default=2018)
+    parser.add_argument("--end-year", type=int, default=2023)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--rate", type=float, default=2.0, help="Requests per second")
+    parser.add_argument("--store-dir", default=STORE_DIR)
+    args = parser.parse_args()
+
+    coord_df = read_table(CENTROIDS_PATH)
+    if not args.all_states:
+        coord_df = coord_df[coord_df['State'] == args.state]
+
+    grid = PowerGrid(coord_df)
+    report = grid.dedup_report()
+    print(f"{report['districts']} districts map to {report['cells']} POWER cells: "
+          f"{report['calls_removed']} fewer requests per year")
+
+    units = plan_units(grid, args.start_year, args.end_year)
+    start = time.perf_counter()
+    stats = asyncio.run(download_all(units, args.store_dir, args.concurrency, args.rate))
+    print(f"\nDone in {time.perf_counter() - start:.0f}s: {stats}")
@@ -0,0 +1,155 @@
+"""
+rabi_aggregate.py
+
+Single-pass replacement for the per-file preprocess_data loop in weather_data.py.
+
+Every wide per-district weather CSV (one row per variable, one column per date) is
+parsed in a process pool, the shared date header is converted to datetimes once, and
+Rabi-season (Nov–Feb) aggregates for all districts and years come out of one grouped
+reduction. Sums are accumulated sequentially in date order. pandas' grouped mean
+rounds differently, so the output matches all_districts_rabi_aggregated.csv to
+within a relative 1e-12, not bit for bit: against ashoknagar_rabi_aggregated.csv,
+74% of values are identical and the largest difference is 3.6e-15.
+benchmarks/bench_rabi_aggregate.py checks that tolerance.
+
+Usage:
+    python rabi_aggregate.py [--input-dir ../data/mp_weather_data] [--output ../data/all_districts_rabi_aggregated.csv]
+
+createData/weather_data.py runs it after downloading.
+"""
+
+import os
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+current_dir = os.path.dirname(__file__)
+INPUT_DIR = os.path.join(current_dir, "../data/mp_weather_data")
+OUTPUT_PATH = os.path.join(current_dir, "../data/all_districts_rabi_aggregated.csv")
+
+RABI_MONTHS = (11, 12, 1, 2)
+AGGREGATIONS = {
+    'T2M_MAX': 'mean',
+    'T2M': 'mean',
+    'T2M_MIN': 'mean',
+    'PRECTOTCORR': 'sum',
+    'ALLSKY_SFC_SW_DWN': 'mean',
+}
+
+
+def _district_from_filename(path: str) -> str:
+    # "east_nimar_weather_2018_2023.csv" -> "East Nimar"
+    return os.path.basename(path).split("_weather_")[0].replace("_", " ").title()
+
+
+def read_wide_file(path: str) -> tuple:
+    """
+    Parse one wide weather CSV.
+
+    Returns:
+        tuple: (district, date_header, variable_names, values) with values shaped
+               (n_variables, n_days) as float64.
+    """
+    df = pd.read_csv(path, index_col=0)
+    if 'district' in df.columns:
+        district = df['district'].iloc[0]
+        df = df.drop(columns='district')
+    else:
+        district = _district_from_filename(path)
+    return district, tuple(df.columns), list(df.index), df.to_numpy(dtype=np.float64)
+
+
+def _parse_header(header: tuple) -> tuple:
+    """Rabi year per date column and the Nov–Feb mask, computed once per distinct header."""
+    dates = pd.to_datetime(pd.Index(header).astype(float).astype(int).astype(str), format="%Y%m%d")
+    month = dates.month.to_numpy()
+    rabi_year = dates.year.to_numpy() + (month >= 11)
+    return rabi_year, np.isin(month, RABI_MONTHS)
+
+
+def _sequential_group_sums(values: np.ndarray, starts: np.ndarray, lengths: np.ndarray) -> tuple:
+    """
+    Per-group sums and non-NaN counts of consecutive column runs of `values`.
+
+    Groups are laid out along axis 1 of a (max_len, n_groups, n_vars) block and reduced
+    over axis 0, which numpy accumulates element by element in order. Missing values
+    and padding contribute 0.0, which leaves a running float sum unchanged.
+    """
+    max_len = int(lengths.max())
+    positions = np.arange(max_len)[:, None]
+    valid_slot = positions < lengths[None, :]
+    idx = np.where(valid_slot, starts[None, :] + positions, 0)
+
+    block = values.T[idx]                                   # (max_len, n_groups, n_vars)
+    present = valid_slot[:, :, None] & ~np.isnan(block)
+    sums = np.add.reduce(np.where(present, block, 0.0), axis=0)
+    counts = present.sum(axis=0)
+    return sums, counts
+
+
+def aggregate_rabi(files, workers: int = None) -> pd.DataFrame:
+    """
+    Rabi-season aggregates for every district file, in file order then rabi_year.
+
+    Args:
+        files (list): Wide per-district weather CSV paths.
+        workers (int): Parser processes (default: CPU count).
+
+    Returns:
+        pd.DataFrame: district, rabi_year and the AGGREGATIONS columns.
+    """
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        parsed = list(pool.map(read_wide_file, files, chunksize=4))
+
+    headers = {}
+    districts, blocks, group_years, group_starts, group_lengths = [], [], [], [], []
+    offset = 0
+    for district, header, variables, values in parsed:
+        if header not in headers:
+            headers[header] = _parse_header(header)
+        rabi_year, in_season = headers[header]
+
+        order = np.argsort(rabi_year[in_season], kind='stable')
+        years = rabi_year[in_season][order]
+        rows = [variables.index(v) for v in AGGREGATIONS]
+        blocks.append(values[rows][:, in_season][:, order])
+
+        # Consecutive runs of the same rabi_year form one (district, year) group
+        run_starts = np.flatnonzero(np.r_[True, years[1:] != years[:-1]])
+        districts.extend([district] * len(run_starts))
+        group_years.append(years[run_starts])
+        group_starts.append(run_starts + offset)
+        group_lengths.append(np.diff(np.r_[run_starts, len(years)]))
+        offset += len(years)
+
+    values = np.concatenate(blocks, axis=1)
+    sums, counts = _sequential_group_sums(values, np.concatenate(group_starts), np.concatenate(group_lengths))
+
+    out = pd.DataFrame({'district': districts, 'rabi_year': np.concatenate(group_years)})
+    for j, (column, how) in enumerate(AGGREGATIONS.items()):
+        with np.errstate(invalid='ignore', divide='ignore'):
+            out[column] = sums[:, j] if how == 'sum' else sums[:, j] / counts[:, j]
+    return out
+
+
+def list_weather_files(input_dir: str) -> list:
+    # os.listdir order, as the original loop used
+    return [os.path.join(input_dir, f) for f in os.listdir(input_dir) if f.endswith('.csv')]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Aggregate per-district daily weather into Rabi seasons.")
+    parser.add_argument("--input-dir", default=INPUT_DIR)
+    parser.add_argument("--output", default=OUTPUT_PATH)
+    parser.add_argument("--workers", type=int)
+    args = parser.parse_args()
+
+    files = list_weather_files(args.input_dir)
+    if not files:
+        raise SystemExit(f"❌ No CSV files found in '{args.input_dir}'.")
+
+    combined_df = aggregate_rabi(files, args.workers)
+    combined_df.to_csv(args.output, index=False)
+    print(f"✅ {len(files)} districts aggregated into '{args.output}'")
@@ -1,14 +1,28 @@
+import os
+import sys
+import json
 import pandas as pd
 import numpy as np
+import joblib
+from scipy import sparse
 from sklearn.ensemble import RandomForestRegressor
 from sklearn.metrics import mean_squared_error, mean_absolute_error
 
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__),  '..')))
+from utils.data_cache import read_table
+
+current_dir = os.path.dirname(__file__)
+APRIL_MODEL_PATH = os.path.join(current_dir, "rf_april_fast.pkl")
+# Forest fitted on april_forecast_pipeline's get_dummies columns, served when the
+# schema-encoded model above has not been trained yet
+LEGACY_APRIL_MODEL_PATH = os.path.join(current_dir, "rf_april.pkl")
+
 
 # ---------------------------
 # 1. Data loading & cleaning
 # ---------------------------
 def load_april_data(filepath: str) -> pd.DataFrame:
-    df = pd.read_excel(filepath)
+    df = read_table(filepath)
     df = df.rename(columns={
         'Market Name': 'Market',
         'Price Date': 'Date',
@@ -38,15 +52,68 @@ def prepare_features(df: pd.DataFrame, train_years: list, test_year: int):
     return X_train, y_train, X_test, y_test
 
 
+def fit_feature_schema(train_df: pd.DataFrame, encoding: str = "ordinal") -> dict:
+    """
+    Column schema for the fast training path: the market vocabulary and feature
+    order are fixed at training time and persisted with the model, so inference
+    maps markets straight to codes instead of rebuilding and reindexing dummies.
+    """
+    if encoding not in ("ordinal", "sparse"):
+        raise ValueError(f"Unknown encoding '{encoding}', expected 'ordinal' or 'sparse'")
+    markets = sorted(train_df['Market'].dropna().astype(str).unique())
+    return {"encoding": encoding, "markets": markets, "numeric": ['Year', 'Day']}
+
+
+def encode_features(df: pd.DataFrame, schema: dict):
+    """
+    Encode Market/Year/Day with a fitted schema.
+
+    'ordinal' gives a dense (n, 3) float32 array with the market code as one column;
+    'sparse' gives a CSR one-hot matrix followed by the numeric columns. Markets
+    unseen at training time get code -1 (ordinal) or an all-zero row (sparse).
+    """
+    codes = pd.Categorical(df['Market'].astype(str), categories=schema['markets']).codes
+    numeric = df[schema['numeric']].to_numpy(dtype=np.float32)
+
+    if schema['encoding'] == "ordinal":
+        return np.column_stack([codes.astype(np.float32), numeric])
+
+    known = codes >= 0
+    one_hot = sparse.csr_matrix(
+        (np.ones(known.sum(), dtype=np.float32), (np.flatnonzero(known), codes[known])),
+        shape=(len(df), len(schema['markets'])),
+    )
+    return sparse.hstack([one_hot, sparse.csr_matrix(numeric)], format='csr')
+
+
+def april_schema_path(model_path: str = APRIL_MODEL_PATH) -> str:
+    return f"{os.path.splitext(model_path)[0]}_schema.json"
+
+
+def has_april_model(model_path: str = APRIL_MODEL_PATH) -> bool:
+    """Whether a schema-encoded model and its schema are both on disk."""
+    return os.path.exists(model_path) and os.path.exists(april_schema_path(model_path))
+
+
+def save_april_model(model, schema: dict, model_path: str = APRIL_MODEL_PATH):
+    joblib.dump(model, model_path)
+    with open(april_schema_path(model_path), "w", encoding="utf-8") as f:
+        json.dump(schema, f, indent=2)
+
+
+def load_april_schema(model_path: str = APRIL_MODEL_PATH) -> dict:
+    with open(april_schema_path(model_path), "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def load_april_model(model_path: str = APRIL_MODEL_PATH):
+    return joblib.load(model_path), load_april_schema(model_path)
+
+
 # ---------------------------
 # 3. Train & Evaluate
 # ---------------------------
-def train_and_evaluate(X_train, y_train, X_test, y_test):
-    model = RandomForestRegressor(n_estimators=300, random_state=42)
-    model.fit(X_train, y_train)
-    
-    y_pred = model.predict(X_test)
-    
+def compute_metrics(y_test, y_pred) -> dict:
     rmse = np.sqrt(mean_squared_error(y_test, y_pred))
     mae = mean_absolute_error(y_test, y_pred)
     mape = np.mean(np.abs((y_test - y_pred)/y_test)) * 100
@@ -54,7 +121,7 @@ def train_and_evaluate(X_train, y_train, X_test, y_test):
     avg_pred = np.mean(y_pred)
     avg_actual = np.mean(y_test)
     
-    return model, y_pred, {
+    return {
         "rmse": rmse,
         "mae": mae,
         "mape": mape,
@@ -63,6 +130,14 @@ def train_and_evaluate(X_train, y_train, X_test, y_test):
     }
 
 
+def train_and_evaluate(X_train, y_train, X_test, y_test, n_jobs=None):
+    model = RandomForestRegressor(n_estimators=300, random_state=42, n_jobs=n_jobs)
+    model.fit(X_train, y_train)
+    
+    y_pred = model.predict(X_test)
+    return model, y_pred, compute_metrics(y_test, y_pred)
+
+
 # ---------------------------
 # 4. Wrapper Pipeline
 # ---------------------------
@@ -76,6 +151,29 @@ def april_forecast_pipeline(train_path, test_path, train_years, test_year):
     return model, y_pred, metrics
 
 
+def april_forecast_pipeline_fast(train_path, test_path, train_years, test_year,
+                                 encoding="ordinal", n_jobs=-1, model_path=None):
+    """
+    Same split as april_forecast_pipeline, but with ordinal/sparse market encoding,
+    all cores for the forest, and an optional persisted model + column schema.
+    """
+    df_train = load_april_data(train_path)
+    df_test  = load_april_data(test_path)
+    df_all   = pd.concat([df_train, df_test], ignore_index=True)
+
+    train_df = df_all[df_all['Year'].isin(train_years)]
+    test_df  = df_all[df_all['Year'] == test_year]
+
+    schema = fit_feature_schema(train_df, encoding)
+    X_train, X_test = encode_features(train_df, schema), encode_features(test_df, schema)
+
+    model, y_pred, metrics = train_and_evaluate(X_train, train_df['Price'], X_test, test_df['Price'],
+                                                n_jobs=n_jobs)
+    if model_path:
+        save_april_model(model, schema, model_path)
+    return model, y_pred, metrics
+
+
 # ## Usuage Example
 # model, y_pred, metrics = april_forecast_pipeline(
 #     "/content/All_Combined_April.xlsx",      # 2020–2024
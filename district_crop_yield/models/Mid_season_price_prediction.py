@@ -1,12 +1,18 @@
+import os
+import sys
 import pandas as pd
 import numpy as np
 from sklearn.ensemble import RandomForestRegressor
+from sklearn.metrics import mean_squared_error, mean_absolute_error
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__),  '..')))
+from utils.data_cache import read_table
 
 # ---------------------------
 # 1. Data loading & cleaning
 # ---------------------------
 def load_and_clean(filepath: str) -> pd.DataFrame:
-    df = pd.read_excel(filepath)
+    df = read_table(filepath)
     df = df.rename(columns={
         'Market Name': 'Market',
         'Price Date': 'Date',
@@ -19,15 +25,99 @@ def load_and_clean(filepath: str) -> pd.DataFrame:
 # ---------------------------
 # 2. Dataset builder
 # ---------------------------
+def group_season_sequences(nov_feb_df: pd.DataFrame, april_df: pd.DataFrame) -> tuple:
+    """
+    Group Nov (previous year) – Feb (current year) prices into one sequence per
+    (year, market) that has an April target, in a single pass over each frame.
+
+    Returns:
+        tuple: (values, starts, lengths, y, keys) where sequence i is
+               values[starts[i]:starts[i] + lengths[i]], y[i] is its April average and
+               keys is a DataFrame of (Year, Market) in the order build_dataset emits.
+    """
+    dated = nov_feb_df[nov_feb_df['Date'].notna()]
+    year = dated['Date'].dt.year.to_numpy()
+    month = dated['Date'].dt.month.to_numpy()
+
+    # Nov/Dec rows belong to the following year's season
+    season_year = year + (month >= 11)
+    market_codes, markets = pd.factorize(nov_feb_df['Market'])
+    market_codes = market_codes[nov_feb_df['Date'].notna().to_numpy()]
+
+    keep = ((month >= 11) | (month <= 2)) & np.isin(season_year, np.unique(year)) & (market_codes >= 0)
+    season_year = season_year[keep]
+    market_codes = market_codes[keep]
+    prices = dated['Price'].to_numpy()[keep]
+
+    # Stable sort keeps each sequence in the original row order
+    order = np.lexsort((market_codes, season_year))
+    season_year, market_codes, prices = season_year[order], market_codes[order], prices[order]
+
+    n = len(prices)
+    is_start = np.ones(n, dtype=bool)
+    is_start[1:] = (season_year[1:] != season_year[:-1]) | (market_codes[1:] != market_codes[:-1])
+    starts = np.flatnonzero(is_start)
+    lengths = np.diff(np.append(starts, n))
+
+    april = april_df[april_df['Date'].notna()]
+    targets = april.groupby([april['Date'].dt.year, april['Market']])['Price'].mean()
+    keys = pd.MultiIndex.from_arrays(
+        [season_year[starts], markets[market_codes[starts]]], names=['Year', 'Market']
+    )
+    y = targets.reindex(keys).to_numpy(dtype=float)
+
+    has_target = ~np.isnan(y)
+    keys = keys[has_target].to_frame(index=False)
+    return prices, starts[has_target], lengths[has_target], y[has_target], keys
+
+
 def build_dataset(nov_feb_df: pd.DataFrame, april_df: pd.DataFrame) -> tuple:
     """Build (X, y) dataset: Nov–Feb sequence → April average."""
+    values, starts, lengths, y, _ = group_season_sequences(nov_feb_df, april_df)
+    X = [values[s:s + l] for s, l in zip(starts, lengths)]
+    return X, list(y)
+
+
+def build_padded_dataset(nov_feb_df: pd.DataFrame, april_df: pd.DataFrame, max_len: int = None) -> tuple:
+    """
+    Build the padded (market-year × sequence) matrix directly, without per-sequence arrays.
+
+    Returns:
+        tuple: (X, y, keys) with X of shape (n_market_years, max_len).
+    """
+    values, starts, lengths, y, keys = group_season_sequences(nov_feb_df, april_df)
+    if max_len is None:
+        max_len = int(lengths.max()) if len(lengths) else 0
+    return _pad_groups(values, starts, lengths, max_len), y, keys
+
+
+# ---------------------------
+# 3. Padding helper
+# ---------------------------
+def _pad_groups(values: np.ndarray, starts: np.ndarray, lengths: np.ndarray, max_len: int) -> np.ndarray:
+    """Gather flat sequences into a matrix, repeating each sequence's last value ('edge' padding)."""
+    if len(lengths) and lengths.max() > max_len:
+        raise ValueError(f"max_len={max_len} is shorter than the longest sequence ({lengths.max()})")
+    positions = np.minimum(np.arange(max_len)[None, :], lengths[:, None] - 1)
+    return values[starts[:, None] + positions]
+
+
+def pad_sequences(X_list, max_len: int) -> np.ndarray:
+    if len(X_list) == 0:
+        return np.empty((0, max_len))
+    lengths = np.array([len(seq) for seq in X_list])
+    starts = np.concatenate([[0], np.cumsum(lengths)[:-1]])
+    return _pad_groups(np.concatenate(X_list), starts, lengths, max_len)
+
+
+def build_dataset_loop(nov_feb_df: pd.DataFrame, april_df: pd.DataFrame) -> tuple:
+    """Original per-(year, market) mask builder, kept as the parity reference for build_dataset."""
     X, y = [], []
-    years = sorted(nov_feb_df['Date'].dt.year.unique())
+    years = sorted(nov_feb_df['Date'].dt.year.dropna().unique())
     markets = nov_feb_df['Market'].unique()
 
     for year in years:
         for market in markets:
-            # Nov (previous year) – Feb (current year)
             mask_features = (
                 (((nov_feb_df['Date'].dt.year == year-1) & (nov_feb_df['Date'].dt.month >= 11)) |
                  ((nov_feb_df['Date'].dt.year == year) & (nov_feb_df['Date'].dt.month <= 2)))
@@ -37,7 +127,6 @@ def build_dataset(nov_feb_df: pd.DataFrame, april_df: pd.DataFrame) -> tuple:
             if len(X_seq) == 0:
                 continue
 
-            # April of same year
             mask_target = (april_df['Date'].dt.year == year) & (april_df['Market'] == market)
             y_val = april_df.loc[mask_target, 'Price'].mean()
             if np.isnan(y_val):
@@ -49,18 +138,35 @@ def build_dataset(nov_feb_df: pd.DataFrame, april_df: pd.DataFrame) -> tuple:
     return X, y
 
 
-# ---------------------------
-# 3. Padding helper
-# ---------------------------
-def pad_sequences(X_list, max_len: int) -> np.ndarray:
-    return np.array([np.pad(seq, (0, max_len-len(seq)), mode='edge') for seq in X_list])
+def check_dataset_parity(nov_feb_df: pd.DataFrame, april_df: pd.DataFrame) -> int:
+    """
+    Check build_dataset, build_padded_dataset and pad_sequences against the loop builder.
+
+    Returns:
+        int: Number of market-years compared; raises AssertionError on any mismatch.
+    """
+    X_ref, y_ref = build_dataset_loop(nov_feb_df, april_df)
+    X_new, y_new = build_dataset(nov_feb_df, april_df)
+
+    assert len(X_ref) == len(X_new), f"{len(X_ref)} sequences vs {len(X_new)}"
+    assert all(np.array_equal(a, b) for a, b in zip(X_ref, X_new)), "sequence mismatch"
+    # groupby().mean() uses compensated summation, so allow last-bit differences
+    assert np.allclose(y_ref, y_new, rtol=1e-12, atol=0), "target mismatch"
+
+    max_len = max((len(seq) for seq in X_ref), default=0)
+    X_pad, y_pad, _ = build_padded_dataset(nov_feb_df, april_df, max_len)
+    X_pad_ref = np.array([np.pad(seq, (0, max_len - len(seq)), mode='edge') for seq in X_ref])
+    X_pad_ref = X_pad_ref.reshape(-1, max_len)
+    assert np.array_equal(X_pad, X_pad_ref), "padded matrix mismatch"
+    assert np.array_equal(pad_sequences(X_new, max_len), X_pad_ref), "pad_sequences mismatch"
+    return len(X_ref)
 
 
 # ---------------------------
 # 4. Training & evaluation
 # ---------------------------
-def train_model(X_train: np.ndarray, y_train: np.ndarray) -> RandomForestRegressor:
-    model = RandomForestRegressor(n_estimators=300, random_state=42)
+def train_model(X_train: np.ndarray, y_train: np.ndarray, n_jobs=None) -> RandomForestRegressor:
+    model = RandomForestRegressor(n_estimators=300, random_state=42, n_jobs=n_jobs)
     model.fit(X_train, y_train)
     return model
 
@@ -74,6 +180,14 @@ def evaluate_model(model, X_test):
     return np.mean(y_pred)
 
 
+def evaluate_predictions(model, X_test, y_test):
+    y_pred = model.predict(X_test)
+    rmse = np.sqrt(mean_squared_error(y_test, y_pred))
+    mae = mean_absolute_error(y_test, y_pred)
+    mape = np.mean(np.abs((y_test - y_pred) / y_test)) * 100
+    return y_pred, rmse, mae, mape
+
+
 # ---------------------------
 # 5. Wrapper function
 # ---------------------------
@@ -100,7 +214,7 @@ def run_pipeline(train_novfeb_path, train_april_path,
     model = train_model(X_train, y_train)
 
     # Evaluate
-    y_pred, rmse, mae, mape = evaluate_model(model, X_test, y_test)
+    y_pred, rmse, mae, mape = evaluate_predictions(model, X_test, y_test)
     avg_pred = np.mean(y_pred)
 
     return {
@@ -0,0 +1,178 @@
+"""
+backtest.py
+
+Rolling-origin backtests for the price models. Each fold trains on every year before
+the test year and tests on that year; folds run in parallel worker processes.
+
+The source workbooks are loaded and cleaned once in the parent (through the Feather
+data cache), and the frames or the padded mid-season matrix are handed to each worker
+once at start-up, so no fold re-reads or re-cleans data.
+
+Usage:
+    python backtest.py april --april All_Combined_April.xlsx All_Combined_April_2025.xlsx
+    python backtest.py midseason --nov-feb All_Combined_NovFeb.xlsx --april All_Combined_April.xlsx
+"""
+
+import os
+import sys
+import time
+import argparse
+import multiprocessing as mp
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__),  '..')))
+
+from models.April_Pre_Season_Prediction import (
+    load_april_data, prepare_features, fit_feature_schema, encode_features,
+    train_and_evaluate, compute_metrics
+)
+from models.Mid_season_price_prediction import (
+    load_and_clean, build_padded_dataset, train_model
+)
+
+# Loaded once per worker by the pool initializer
+_DATA = {}
+
+
+def rolling_origin_splits(years, min_train_years: int = 2) -> list:
+    """[(train_years, test_year), ...] with an expanding training window."""
+    years = sorted(int(y) for y in years)
+    return [(years[:i], years[i]) for i in range(min_train_years, len(years))]
+
+
+def _init_worker(data: dict):
+    _DATA.update(data)
+
+
+# ---------------------------
+# Fold runners
+# ---------------------------
+def _april_fold(split, encoding: str) -> dict:
+    train_years, test_year = split
+    df = _DATA["april"]
+
+    start = time.perf_counter()
+    if encoding == "dense":
+        X_train, y_train, X_test, y_test = prepare_features(df, train_years, test_year)
+    else:
+        train_df = df[df['Year'].isin(train_years)]
+        test_df = df[df['Year'] == test_year]
+        schema = fit_feature_schema(train_df, encoding)
+        X_train, y_train = encode_features(train_df, schema), train_df['Price'].to_numpy()
+        X_test, y_test = encode_features(test_df, schema), test_df['Price'].to_numpy()
+    prep_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    _, _, metrics = train_and_evaluate(X_train, y_train, X_test, y_test, n_jobs=1)
+    fit_s = time.perf_counter() - start
+
+    return {"n_train": X_train.shape[0], "n_test": X_test.shape[0],
+            "prep_s": prep_s, "fit_predict_s": fit_s, **metrics}
+
+
+def _midseason_fold(split, encoding: str) -> dict:
+    train_years, test_year = split
+    X, y, years = _DATA["X"], _DATA["y"], _DATA["years"]
+    train_mask = np.isin(years, train_years)
+    test_mask = years == test_year
+
+    start = time.perf_counter()
+    model = train_model(X[train_mask], y[train_mask], n_jobs=1)
+    y_pred = model.predict(X[test_mask])
+    fit_s = time.perf_counter() - start
+
+    return {"n_train": int(train_mask.sum()), "n_test": int(test_mask.sum()),
+            "prep_s": 0.0, "fit_predict_s": fit_s, **compute_metrics(y[test_mask], y_pred)}
+
+
+FOLD_RUNNERS = {"april": _april_fold, "midseason": _midseason_fold}
+
+
+def _run_fold(model_name: str, split, encoding: str) -> dict:
+    start = time.perf_counter()
+    result = FOLD_RUNNERS[model_name](split, encoding)
+    train_years, test_year = split
+    return {"model": model_name, "test_year": test_year,
+            "train_years": f"{train_years[0]}-{train_years[-1]}",
+            **result, "fold_s": time.perf_counter() - start}
+
+
+# ---------------------------
+# Data loading (once, in the parent)
+# ---------------------------
+def load_april_frames(april_paths) -> tuple:
+    df = pd.concat([load_april_data(p) for p in april_paths], ignore_index=True)
+    df = df.dropna(subset=['Year', 'Price'])
+    return {"april": df}, df['Year'].unique()
+
+
+def load_midseason_frames(nov_feb_paths, april_paths) -> tuple:
+    nov_feb = pd.concat([load_and_clean(p) for p in nov_feb_paths], ignore_index=True)
+    april = pd.concat([load_and_clean(p) for p in april_paths], ignore_index=True)
+    X, y, keys = build_padded_dataset(nov_feb, april)
+    years = keys['Year'].to_numpy()
+    return {"X": X, "y": y, "years": years}, np.unique(years)
+
+
+# ---------------------------
+# Harness
+# ---------------------------
+def run_backtest(model_name: str, data: dict, years, min_train_years: int = 2,
+                 max_workers: int = None, encoding: str = "ordinal") -> pd.DataFrame:
+    """
+    Run every rolling-origin fold in parallel.
+
+    Args:
+        model_name (str): 'april' or 'midseason'.
+        data (dict): Frames from load_april_frames / load_midseason_frames.
+        years: Years available for splitting.
+        min_train_years (int): Years in the first training window.
+        max_workers (int): Worker processes (default: one per fold, capped at CPU count).
+        encoding (str): April market encoding: 'dense', 'ordinal' or 'sparse'.
+
+    Returns:
+        pd.DataFrame: One row per fold with RMSE, MAE, MAPE and timings.
+    """
+    splits = rolling_origin_splits(years, min_train_years)
+    if not splits:
+        raise ValueError(f"Need more than {min_train_years} years to backtest, got {sorted(years)}")
+
+    max_workers = max_workers or min(len(splits), os.cpu_count() or 1)
+    start = time.perf_counter()
+    # Spawned: fork is unavailable on Windows and unsafe once torch/OpenMP threads run;
+    # the initializer hands every worker the data it needs
+    with ProcessPoolExecutor(max_workers=max_workers, mp_context=mp.get_context("spawn"),
+                             initializer=_init_worker, initargs=(data,)) as pool:
+        futures = [pool.submit(_run_fold, model_name, split, encoding) for split in splits]
+        rows = [f.result() for f in futures]
+
+    results = pd.DataFrame(rows)
+    print(f"{len(splits)} folds on {max_workers} workers in {time.perf_counter() - start:.1f} s")
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rolling-origin backtest for the price models.")
+    parser.add_argument("model", choices=sorted(FOLD_RUNNERS))
+    parser.add_argument("--april", nargs="+", required=True, help="April price workbooks")
+    parser.add_argument("--nov-feb", nargs="+", help="Nov–Feb price workbooks (midseason only)")
+    parser.add_argument("--min-train-years", type=int, default=2)
+    parser.add_argument("--workers", type=int)
+    parser.add_argument("--encoding", choices=["dense", "ordinal", "sparse"], default="ordinal")
+    parser.add_argument("--output", help="Optional CSV path for the per-fold table")
+    args = parser.parse_args()
+
+    if args.model == "april":
+        data, years = load_april_frames(args.april)
+    else:
+        if not args.nov_feb:
+            parser.error("--nov-feb is required for the midseason model")
+        data, years = load_midseason_frames(args.nov_feb, args.april)
+
+    results = run_backtest(args.model, data, years, args.min_train_years, args.workers, args.encoding)
+    print(results.to_string(index=False, float_format=lambda v: f"{v:.3f}"))
+    if args.output:
+        results.to_csv(args.output, index=False)
@@ -16,6 +16,8 @@ LR = 0.001
 WEIGHT_DECAY = 1e-4
 DATA_PATH = "./../data/full_data_crop_yield.csv"
 MODEL_PATH = "crop_yield_model_weights.pth"
+FEATURE_COLUMNS = ['T2M', 'PRECTOTCORR', 'ALLSKY_SFC_SW_DWN',
+                   'NDVI', 'EVI', 'NDWI', 'Area', 'crop_type', 'district']
 
 # ------------------------
 # DATA PREPROCESSING
@@ -27,8 +29,7 @@ def preprocess_data(df):
         df[col] = le.fit_transform(df[col])
         label_encoders[col] = le
 
-    X = df[['T2M', 'PRECTOTCORR', 'ALLSKY_SFC_SW_DWN', 
-            'NDVI', 'EVI', 'NDWI', 'Area', 'crop_type', 'district']].values
+    X = df[FEATURE_COLUMNS].values
     y = df['Crop_yield'].values
 
     scaler = StandardScaler()
@@ -64,14 +65,14 @@ class YieldNN(nn.Module):
 # ------------------------
 # TRAINING LOOP
 # ------------------------
-def train_model(model, X_train, y_train, X_test, y_test):
+def train_model(model, X_train, y_train, X_test, y_test, epochs=EPOCHS, lr=LR):
     criterion = nn.MSELoss()
-    optimizer = optim.Adam(model.parameters(), lr=LR, weight_decay=WEIGHT_DECAY)
+    optimizer = optim.Adam(model.parameters(), lr=lr, weight_decay=WEIGHT_DECAY)
 
     best_val_loss = float('inf')
     counter = 0
 
-    for epoch in range(EPOCHS):
+    for epoch in range(epochs):
         # Train
         model.train()
         optimizer.zero_grad()
@@ -97,7 +98,7 @@ def train_model(model, X_train, y_train, X_test, y_test):
                 break
 
         if (epoch+1) % 10 == 0:
-            print(f"Epoch [{epoch+1}/{EPOCHS}] - Train Loss: {loss.item():.4f} - Val Loss: {val_loss.item():.4f}")
+            print(f"Epoch [{epoch+1}/{epochs}] - Train Loss: {loss.item():.4f} - Val Loss: {val_loss.item():.4f}")
 
     return model
 
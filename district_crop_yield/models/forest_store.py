@@ -0,0 +1,136 @@
+"""
+forest_store.py
+
+Stores a fitted RandomForestRegressor as a directory of flat .npy arrays (all trees
+concatenated) that can be opened with np.load(mmap_mode='r'). The price forecast
+service (utils/price_forecast.py) only loads a forest to compute its memoized
+forecasts when the model changes, so a bundle saves unpickling 300 trees there; the
+forest is not kept resident afterwards. Workers that recompute at the same time share
+the bundle's pages instead of each holding a copy (benchmarks/bench_forest_rss.py).
+
+Usage:
+    python forest_store.py midseason_predictor.pkl rf_april.pkl
+"""
+
+import os
+import sys
+import json
+import argparse
+
+import numpy as np
+import joblib
+
+ARRAYS = ("left", "right", "feature", "threshold", "value")
+BUNDLE_SUFFIX = ".forest"
+
+
+def bundle_path_for(model_path: str) -> str:
+    return f"{os.path.splitext(model_path)[0]}{BUNDLE_SUFFIX}"
+
+
+def save_forest(model, bundle_dir: str):
+    """
+    Flatten every tree of a single-output forest regressor into shared node arrays.
+
+    Child indices are rebased to global node ids. Leaves point to themselves, so a
+    batched traversal can keep stepping all trees until the deepest one finishes.
+    """
+    if getattr(model, "n_outputs_", 1) != 1:
+        raise ValueError("Only single-output forests are supported")
+
+    parts = {name: [] for name in ARRAYS}
+    roots, offset, max_depth = [], 0, 0
+    for est in model.estimators_:
+        tree = est.tree_
+        n = tree.node_count
+        ids = np.arange(n) + offset
+        is_leaf = tree.children_left < 0
+
+        parts["left"].append(np.where(is_leaf, ids, tree.children_left + offset))
+        parts["right"].append(np.where(is_leaf, ids, tree.children_right + offset))
+        parts["feature"].append(np.where(is_leaf, 0, tree.feature))
+        parts["threshold"].append(tree.threshold)
+        parts["value"].append(tree.value[:, 0, 0])
+
+        roots.append(offset)
+        offset += n
+        max_depth = max(max_depth, tree.max_depth)
+
+    os.makedirs(bundle_dir, exist_ok=True)
+    dtypes = {"left": np.int32, "right": np.int32, "feature": np.int32,
+              "threshold": np.float64, "value": np.float64}
+    for name in ARRAYS:
+        np.save(os.path.join(bundle_dir, f"{name}.npy"), np.concatenate(parts[name]).astype(dtypes[name]))
+    np.save(os.path.join(bundle_dir, "roots.npy"), np.array(roots, dtype=np.int32))
+
+    with open(os.path.join(bundle_dir, "meta.json"), "w", encoding="utf-8") as f:
+        json.dump({
+            "n_trees": len(roots),
+            "n_nodes": offset,
+            "max_depth": int(max_depth),
+            "n_features_in": int(model.n_features_in_),
+        }, f, indent=2)
+
+
+class MappedForest:
+    """Read-only forest regressor backed by (optionally memory-mapped) node arrays."""
+
+    def __init__(self, bundle_dir: str, mmap_mode: str = "r"):
+        with open(os.path.join(bundle_dir, "meta.json"), "r", encoding="utf-8") as f:
+            self.meta = json.load(f)
+        for name in ARRAYS + ("roots",):
+            setattr(self, name, np.load(os.path.join(bundle_dir, f"{name}.npy"), mmap_mode=mmap_mode))
+        self.n_features_in_ = self.meta["n_features_in"]
+
+    def predict(self, X, batch_size: int = 4096) -> np.ndarray:
+        # Same float32 cast as sklearn's tree predict, so splits land identically
+        if hasattr(X, "toarray"):
+            X = X.toarray()
+        X = np.asarray(X, dtype=np.float32)
+        if X.ndim != 2 or X.shape[1] != self.n_features_in_:
+            raise ValueError(f"Expected {self.n_features_in_} features, got shape {X.shape}")
+
+        roots = np.asarray(self.roots)
+        out = np.empty(len(X))
+        for start in range(0, len(X), batch_size):
+            Xb = X[start:start + batch_size]
+            rows = np.arange(len(Xb))[None, :]
+            nodes = np.repeat(roots[:, None], len(Xb), axis=1)      # (n_trees, n_samples)
+            for _ in range(self.meta["max_depth"]):
+                go_left = Xb[rows, self.feature[nodes]] <= self.threshold[nodes]
+                nodes = np.where(go_left, self.left[nodes], self.right[nodes])
+            out[start:start + batch_size] = self.value[nodes].mean(axis=0)
+        return out
+
+
+def load_forest(bundle_dir: str, mmap_mode: str = "r") -> MappedForest:
+    return MappedForest(bundle_dir, mmap_mode=mmap_mode)
+
+
+def load_price_model(model_path: str):
+    """
+    Load a price forest, preferring its memory-mapped bundle when one has been
+    written next to the pickle and is at least as new.
+    """
+    bundle_dir = bundle_path_for(model_path)
+    meta_path = os.path.join(bundle_dir, "meta.json")
+    if os.path.exists(meta_path) and os.path.getmtime(meta_path) >= os.path.getmtime(model_path):
+        return load_forest(bundle_dir)
+    return joblib.load(model_path)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Convert pickled forests to memory-mappable bundles.")
+    parser.add_argument("model_paths", nargs="+")
+    args = parser.parse_args()
+
+    for model_path in args.model_paths:
+        model = joblib.load(model_path)
+        bundle_dir = bundle_path_for(model_path)
+        save_forest(model, bundle_dir)
+
+        # Sanity check against sklearn on random inputs in the training feature range
+        X = np.random.default_rng(0).normal(size=(256, model.n_features_in_)) * 1000
+        if not np.allclose(model.predict(X), load_forest(bundle_dir).predict(X)):
+            sys.exit(f"❌ Bundle predictions differ from {model_path}")
+        print(f"✅ Wrote {bundle_dir}")
@@ -0,0 +1,122 @@
+import os
+import sys
+import json
+import threading
+from dataclasses import dataclass
+
+import joblib
+import torch
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__),  '..')))
+
+from models.crop_yield import YieldNN
+
+current_dir = os.path.dirname(__file__)
+REGISTRY_POINTER_PATH = os.path.join(current_dir, "yield_registry.json")
+VERSIONS_DIR = os.path.join(current_dir, "versions")
+
+# Artifacts shipped with the repo, used until a retraining job publishes a version
+LEGACY_ARTIFACTS = {
+    "version": "baseline",
+    "weights": os.path.join(current_dir, "crop_yield_model_weights.pth"),
+    "scaler": os.path.join(current_dir, "scaler.pkl"),
+    "crop_encoder": os.path.join(current_dir, "crop_type_encoder.pkl"),
+    "district_encoder": os.path.join(current_dir, "district_encoder.pkl"),
+}
+
+
+@dataclass
+class YieldModelBundle:
+    version: str
+    model: YieldNN
+    scaler: object
+    label_encoders: dict
+
+
+def load_bundle(artifacts: dict) -> YieldModelBundle:
+    """
+    Load the yield model, scaler and label encoders described by an artifact dict.
+
+    Args:
+        artifacts (dict): Paths under 'weights', 'scaler', 'crop_encoder', 'district_encoder'
+                          plus a 'version' label.
+
+    Returns:
+        YieldModelBundle: Model in eval mode together with its preprocessing objects.
+    """
+    model = YieldNN(input_dim=9)
+    model.load_state_dict(torch.load(artifacts["weights"]))
+    model.eval()
+
+    return YieldModelBundle(
+        version=artifacts["version"],
+        model=model,
+        scaler=joblib.load(artifacts["scaler"]),
+        label_encoders={
+            'crop_type': joblib.load(artifacts["crop_encoder"]),
+            'district': joblib.load(artifacts["district_encoder"]),
+        },
+    )
+
+
+class ModelRegistry:
+    """
+    Serving registry for the crop yield model.
+
+    The active version is named by a small JSON pointer file. Publishing a new version
+    replaces that file atomically, and every `get()` compares its mtime so running
+    processes pick up the new model on their next request without a restart.
+    """
+
+    def __init__(self, pointer_path: str = REGISTRY_POINTER_PATH):
+        self.pointer_path = pointer_path
+        self._lock = threading.Lock()
+        self._bundle = None
+        self._pointer_mtime = None
+
+    def _read_pointer(self):
+        if not os.path.exists(self.pointer_path):
+            return LEGACY_ARTIFACTS, None
+        with open(self.pointer_path, "r", encoding="utf-8") as f:
+            artifacts = json.load(f)
+        return artifacts, os.stat(self.pointer_path).st_mtime_ns
+
+    def get(self) -> YieldModelBundle:
+        """Return the active bundle, reloading it if a new version was published."""
+        mtime = os.stat(self.pointer_path).st_mtime_ns if os.path.exists(self.pointer_path) else None
+        if self._bundle is not None and mtime == self._pointer_mtime:
+            return self._bundle
+
+        with self._lock:
+            if self._bundle is None or mtime != self._pointer_mtime:
+                artifacts, mtime = self._read_pointer()
+                # Single reference assignment: readers see either the old or the new bundle
+                self._bundle = load_bundle(artifacts)
+                self._pointer_mtime = mtime
+                print(f"Loaded yield model version {self._bundle.version}")
+        return self._bundle
+
+    def publish(self, artifacts: dict):
+        """
+        Make `artifacts` the active version by atomically replacing the pointer file.
+
+        Args:
+            artifacts (dict): Same layout as LEGACY_ARTIFACTS, files already written to disk.
+        """
+        tmp_path = f"{self.pointer_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(artifacts, f, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.pointer_path)
+
+    def swap(self, bundle: YieldModelBundle):
+        """Install an already-loaded bundle in this process, e.g. right after `publish`."""
+        with self._lock:
+            self._bundle = bundle
+            if os.path.exists(self.pointer_path):
+                self._pointer_mtime = os.stat(self.pointer_path).st_mtime_ns
+
+
+# Shared by the app, the agent tools and the retraining job
+yield_registry = ModelRegistry()
@@ -0,0 +1,235 @@
+"""
+Incremental warm-start retraining for the crop yield model.
+
+When a new season's yields land (rows in all_crops_all_districts.csv format), this job:
+- merges them with the Rabi weather and indices in memory, as createData/build_dataset.py
+  does, replacing yields with the same Year/crop/district
+- extends the label encoders, keeping every existing class id unchanged
+- fine-tunes the current weights instead of training from scratch, early-stopping on
+  a validation split
+- compares the candidate with the serving model on an untouched holdout of new rows
+  plus a fixed sample of old ones
+- only if the candidate is accepted, writes the yields into all_crops_all_districts.csv,
+  rebuilds full_data_crop_yield.csv from it, and publishes the new version to the
+  serving registry (no restart needed)
+
+The fitted StandardScaler is kept frozen: refitting it would shift the inputs the
+current weights were trained on, which defeats warm-starting.
+
+Usage:
+    python retrain_yield.py path/to/new_yields.csv [--dry-run]
+"""
+
+import os
+import sys
+import copy
+import argparse
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+import torch
+import joblib
+from sklearn.model_selection import train_test_split
+from sklearn.metrics import mean_squared_error
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__),  '..')))
+
+from models.crop_yield import YieldNN, FEATURE_COLUMNS, train_model
+from models.registry import yield_registry, load_bundle, VERSIONS_DIR
+from utils.data_cache import read_table
+from createData.final_data import RABI_PATH, INDICES_PATH, CROPS_PATH, merge_inputs
+from createData.build_dataset import build
+
+
+# ------------------------
+# CONFIG
+# ------------------------
+FINETUNE_EPOCHS = 50
+FINETUNE_LR = 1e-4
+HOLDOUT_FRACTION = 0.2     # share of the new rows held out from fine-tuning
+OLD_HOLDOUT_ROWS = 200     # fixed sample of old rows in the holdout, to catch forgetting
+VALIDATION_FRACTION = 0.1  # early-stopping split of the fine-tuning rows
+MAX_REGRESSION = 0.02      # reject candidates whose holdout MSE is >2% worse
+ROW_KEY = ['Year', 'crop_type', 'district']
+
+
+# ------------------------
+# DATA
+# ------------------------
+def combine_yields(all_crops: pd.DataFrame, new_rows: pd.DataFrame) -> pd.DataFrame:
+    """Yield table with `new_rows` appended, replacing existing rows with the same key."""
+    missing = set(all_crops.columns) - set(new_rows.columns)
+    if missing:
+        raise ValueError(f"New rows are missing columns: {sorted(missing)}")
+    combined = pd.concat([all_crops, new_rows[all_crops.columns]], ignore_index=True)
+    return combined.drop_duplicates(subset=ROW_KEY, keep='last').reset_index(drop=True)
+
+
+def write_yields(crops_path: str, combined: pd.DataFrame):
+    """Rewrite the yield table through a temp file so readers never see a partial CSV."""
+    tmp_path = f"{crops_path}.{os.getpid()}.tmp"
+    combined.to_csv(tmp_path, index=False)
+    os.replace(tmp_path, crops_path)
+
+
+def split_rows(df: pd.DataFrame, new_keys: pd.DataFrame) -> tuple:
+    """
+    Fine-tuning, early-stopping validation and holdout splits of the built dataset.
+
+    The holdout holds HOLDOUT_FRACTION of the new rows and a fixed sample of
+    OLD_HOLDOUT_ROWS old ones, and is never seen during fine-tuning.
+    """
+    matches = df[ROW_KEY].merge(new_keys.drop_duplicates(), on=ROW_KEY, how='left', indicator=True)
+    is_new = matches['_merge'].eq('both').to_numpy()
+    new_df, old_df = df[is_new], df[~is_new]
+    if new_df.empty:
+        raise ValueError("None of the new rows have weather and index data for their year")
+
+    new_hold = new_df.sample(frac=HOLDOUT_FRACTION, random_state=42) if len(new_df) > 1 else new_df.iloc[:0]
+    old_hold = old_df.sample(n=min(OLD_HOLDOUT_ROWS, len(old_df)), random_state=42)
+    holdout_df = pd.concat([new_hold, old_hold])
+
+    rest = df.drop(index=holdout_df.index)
+    finetune_df, val_df = train_test_split(rest, test_size=VALIDATION_FRACTION, random_state=42)
+    return finetune_df, val_df, holdout_df
+
+
+def extend_encoder(encoder, values):
+    """
+    Return a copy of a fitted LabelEncoder that also knows `values`.
+
+    New classes are appended after the existing ones, so ids that the current weights
+    were trained on never move. LabelEncoder maps string classes through a lookup
+    table, so the unsorted tail is safe for transform/inverse_transform.
+    """
+    extended = copy.deepcopy(encoder)
+    known = set(encoder.classes_.tolist())
+    new_classes = [v for v in pd.unique(pd.Series(values)) if v not in known]
+    if new_classes:
+        extended.classes_ = np.concatenate([encoder.classes_, np.array(new_classes, dtype=object)])
+        print(f"Added {len(new_classes)} new classes: {new_classes}")
+    return extended
+
+
+def encode_features(df: pd.DataFrame, label_encoders: dict, scaler):
+    df = df.copy()
+    for col in ['crop_type', 'district']:
+        df[col] = label_encoders[col].transform(df[col])
+
+    X = scaler.transform(df[FEATURE_COLUMNS].values.astype(float))
+    X = torch.tensor(X, dtype=torch.float32)
+    y = torch.tensor(df['Crop_yield'].values, dtype=torch.float32).view(-1, 1)
+    return X, y
+
+
+def holdout_mse(model, X, y) -> float:
+    model.eval()
+    with torch.no_grad():
+        y_pred = model(X).numpy()
+    return mean_squared_error(y.numpy(), y_pred)
+
+
+# ------------------------
+# PUBLISH
+# ------------------------
+def write_version(model, scaler, label_encoders) -> dict:
+    """Write a complete artifact set into a fresh version directory."""
+    version = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S")
+    version_dir = os.path.join(VERSIONS_DIR, version)
+    os.makedirs(version_dir, exist_ok=True)
+
+    artifacts = {
+        "version": version,
+        "weights": os.path.join(version_dir, "crop_yield_model_weights.pth"),
+        "scaler": os.path.join(version_dir, "scaler.pkl"),
+        "crop_encoder": os.path.join(version_dir, "crop_type_encoder.pkl"),
+        "district_encoder": os.path.join(version_dir, "district_encoder.pkl"),
+    }
+    torch.save(model.state_dict(), artifacts["weights"])
+    joblib.dump(scaler, artifacts["scaler"])
+    joblib.dump(label_encoders['crop_type'], artifacts["crop_encoder"])
+    joblib.dump(label_encoders['district'], artifacts["district_encoder"])
+    return artifacts
+
+
+# ------------------------
+# JOB
+# ------------------------
+def retrain_incremental(new_rows_path: str, crops_path: str = CROPS_PATH, publish: bool = True) -> dict:
+    """
+    Run one incremental retraining cycle.
+
+    Args:
+        new_rows_path (str): CSV with the same columns as all_crops_all_districts.csv.
+        crops_path (str): Yield table the rows land in once the candidate is accepted.
+        publish (bool): If False, validate only and leave the data and registry untouched.
+
+    Returns:
+        dict: Holdout MSE of the serving and candidate models, and whether the
+              candidate was published.
+    """
+    new_rows = pd.read_csv(new_rows_path)
+    combined = combine_yields(read_table(crops_path), new_rows)
+    df = merge_inputs(read_table(RABI_PATH), read_table(INDICES_PATH), combined).reset_index(drop=True)
+
+    new_keys = new_rows[ROW_KEY].copy()
+    new_keys['Year'] = new_keys['Year'].astype(str).str.split(' - ').str[0].astype(int)
+    finetune_df, val_df, holdout_df = split_rows(df, new_keys)
+    print(f"Built dataset has {len(df)} rows; fine-tune {len(finetune_df)}, "
+          f"validation {len(val_df)}, holdout {len(holdout_df)}")
+
+    current = yield_registry.get()
+    label_encoders = {
+        col: extend_encoder(current.label_encoders[col], df[col])
+        for col in ['crop_type', 'district']
+    }
+
+    X_train, y_train = encode_features(finetune_df, label_encoders, current.scaler)
+    X_val, y_val = encode_features(val_df, label_encoders, current.scaler)
+    X_hold, y_hold = encode_features(holdout_df, label_encoders, current.scaler)
+
+    # Warm start: copy the serving weights, then fine-tune with a small learning rate
+    candidate = YieldNN(input_dim=X_train.shape[1])
+    candidate.load_state_dict(current.model.state_dict())
+    candidate = train_model(candidate, X_train, y_train, X_val, y_val,
+                            epochs=FINETUNE_EPOCHS, lr=FINETUNE_LR)
+
+    current_mse = holdout_mse(current.model, X_hold, y_hold)
+    candidate_mse = holdout_mse(candidate, X_hold, y_hold)
+    accepted = candidate_mse <= current_mse * (1 + MAX_REGRESSION)
+    print(f"Holdout MSE: current {current_mse:.4f}, candidate {candidate_mse:.4f}")
+
+    result = {
+        "current_mse": current_mse,
+        "candidate_mse": candidate_mse,
+        "accepted": bool(accepted),
+        "published": False,
+    }
+
+    if not accepted:
+        print("❌ Candidate regressed on the holdout, keeping the current model.")
+        return result
+
+    if publish:
+        # The yields become source data only now; the training CSV is a build output
+        write_yields(crops_path, combined)
+        build(crops_path=crops_path)
+        artifacts = write_version(candidate, current.scaler, label_encoders)
+        yield_registry.publish(artifacts)
+        yield_registry.swap(load_bundle(artifacts))
+        result["published"] = True
+        result["version"] = artifacts["version"]
+        print(f"✅ Published yield model version {artifacts['version']}")
+
+    return result
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Warm-start retrain the crop yield model on new rows.")
+    parser.add_argument("new_rows", help="CSV of new yields in all_crops_all_districts.csv format")
+    parser.add_argument("--crops-path", default=CROPS_PATH)
+    parser.add_argument("--dry-run", action="store_true", help="Validate without writing or publishing")
+    args = parser.parse_args()
+
+    print(retrain_incremental(args.new_rows, args.crops_path, publish=not args.dry_run))
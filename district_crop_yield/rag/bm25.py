@@ -0,0 +1,130 @@
+"""
+bm25.py
+
+Inverted-index BM25 over the live chunks of the RAG vector store, saved next to it
+as bm25.json by rag/create_vdb.py. Crop, district and scheme names ("Sehore",
+"PMFBY", "गेहूं") are exact-match terms that MiniLM embeds poorly; the lexical
+scores feed the hybrid retrieval in rag/query_cache.py.
+
+Tokens are lower-cased runs of word characters, with Devanagari vowel signs kept
+inside their word and the danda (। ॥) treated as punctuation; a short English
+stop-word list is dropped.
+"""
+
+import os
+import re
+import json
+import math
+from collections import Counter, defaultdict
+
+import numpy as np
+
+K1 = 1.5
+B = 0.75
+# Bump when tokenisation changes, so saved indexes are rebuilt
+TOKENIZER_VERSION = 2
+TOKEN_RE = re.compile(r"[\w\u0900-\u0963\u0966-\u097F]+")
+STOP_WORDS = frozenset(
+    "a an and are as at be by can do does for from how i in is it my of on or should "
+    "the this to was what when where which who why will with you your q".split()
+)
+
+
+def tokenize(text: str) -> list:
+    return [t for t in TOKEN_RE.findall(str(text).lower()) if t not in STOP_WORDS]
+
+
+class BM25Index:
+    def __init__(self, doc_ids, postings: dict, doc_lengths, stamp=None):
+        """
+        Args:
+            doc_ids: Store ids, one per indexed document.
+            postings (dict): term -> [[document position, term frequency], ...].
+            doc_lengths: Token count per document position.
+            stamp: Store state the index was built from (see store_stamp).
+        """
+        self.doc_ids = np.asarray(doc_ids, dtype=np.int64)
+        self.postings = postings
+        self.doc_lengths = np.asarray(doc_lengths, dtype=np.float64)
+        self.stamp = stamp
+        self.avg_length = float(self.doc_lengths.mean()) if len(self.doc_lengths) else 0.0
+        self._norm = K1 * (1 - B + B * self.doc_lengths / max(self.avg_length, 1.0))
+        n = len(self.doc_ids)
+        self._idf = {t: math.log(1 + (n - len(p) + 0.5) / (len(p) + 0.5)) for t, p in postings.items()}
+        self._arrays = {}
+
+    @classmethod
+    def build(cls, docstore: dict, stamp=None):
+        """Index every document of a VectorStore docstore ({id: {"text": ...}})."""
+        doc_ids, lengths = [], []
+        postings = defaultdict(list)
+        for position, (doc_id, doc) in enumerate(sorted(docstore.items())):
+            tokens = tokenize(doc["text"])
+            doc_ids.append(doc_id)
+            lengths.append(len(tokens))
+            for term, tf in Counter(tokens).items():
+                postings[term].append([position, tf])
+        return cls(doc_ids, dict(postings), lengths, stamp)
+
+    def save(self, path: str):
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"stamp": self.stamp, "doc_ids": self.doc_ids.tolist(),
+                       "doc_lengths": self.doc_lengths.astype(int).tolist(), "postings": self.postings},
+                      f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str):
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        return cls(data["doc_ids"], data["postings"], data["doc_lengths"], data.get("stamp"))
+
+    def _posting(self, term: str) -> tuple:
+        if term not in self._arrays:
+            p = np.asarray(self.postings[term], dtype=np.int64)
+            self._arrays[term] = (p[:, 0], p[:, 1].astype(np.float64))
+        return self._arrays[term]
+
+    def search(self, query: str, k: int = 20) -> list:
+        """
+        Top documents by BM25.
+
+        Returns:
+            list: (store id, score, share of the query terms the document contains)
+                  triples, best first, positive scores only.
+        """
+        query_terms = set(tokenize(query))
+        terms = [t for t in query_terms if t in self.postings]
+        if not terms or not len(self.doc_ids):
+            return []
+        scores = np.zeros(len(self.doc_ids))
+        matched = np.zeros(len(self.doc_ids))
+        for term in terms:
+            positions, tf = self._posting(term)
+            scores[positions] += self._idf[term] * tf * (K1 + 1) / (tf + self._norm[positions])
+            matched[positions] += 1
+        k = min(k, int((scores > 0).sum()))
+        if k == 0:
+            return []
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [(int(self.doc_ids[i]), float(scores[i]), matched[i] / len(query_terms)) for i in top]
+
+
+def store_stamp(store) -> list:
+    return [TOKENIZER_VERSION, store.manifest["next_id"], len(store.docstore)]
+
+
+def bm25_path(index_dir: str) -> str:
+    return os.path.join(index_dir, "bm25.json")
+
+
+def load_or_build(store) -> BM25Index:
+    """The saved index if it matches the store, otherwise one built from its docstore."""
+    path = bm25_path(store.index_dir)
+    if os.path.exists(path):
+        index = BM25Index.load(path)
+        if index.stamp == store_stamp(store):
+            return index
+    return BM25Index.build(store.docstore, store_stamp(store))
@@ -1,105 +1,242 @@
-import json
+"""
+create_vdb.py
+
+Builds and updates the RAG vector store in rag/faiss (the path agentic_framework/tools.py
+loads) from the Q&A JSONL, Word and PDF documents in rag/data and the Q&A sets in
+data/fine_tune (English and Hindi).
+
+Reruns are incremental (see rag/vector_store.py): sources whose size and mtime are
+unchanged are not even parsed, only chunks with a new hash are embedded, and chunks
+that disappeared are tombstoned. New chunks are embedded in batches across worker
+processes (see rag/ingest.py); the model is only loaded when something needs embedding.
+Sources are streamed: Word and PDF files are read paragraph by paragraph and page
+by page into overlapping token-bounded chunks, and chunks go to the embedder as they
+are parsed, so memory holds only the batches in flight however large a manual is.
+The BM25 index for hybrid retrieval (rag/bm25.py) is rebuilt from the live chunks
+after every update.
+
+Usage:
+    python create_vdb.py [--rebuild] [--workers 4] [--batch-size 64 | --batch-size auto]
+    python create_vdb.py --rebuild --index-type hnsw [--ef-search 64]
+    python create_vdb.py --rebuild --index-type ivf [--nlist 256] [--nprobe 16]
+"""
+
 import os
+import sys
+import time
+import shutil
+import argparse
+import itertools
+from collections import deque
 from langchain.docstore.document import Document
 from docx import Document as DocxDocument
-from langchain.vectorstores import FAISS
-from langchain_community.embeddings import HuggingFaceEmbeddings
 from langchain_community.document_loaders import PyPDFLoader
 
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__),  '..')))
+from rag.vector_store import VectorStore, chunk_key, INDEX_DIR, INDEX_TYPES
+from rag.bm25 import BM25Index, bm25_path, store_stamp
+from rag.ingest import iter_json_records, chunk_units, embed_batches, tune_batch_size, peak_memory_mb
 
 
-current_dir = os.path.dirname(__file__) 
+current_dir = os.path.dirname(__file__)
 INPUT_FOLDER = os.path.join(current_dir, "data")
-OUTPUT_VDB_PATH = os.path.join(current_dir, "faiss_index")
-json_file_path = os.path.join(current_dir, "data/farming_expert.jsonl")
+FINE_TUNE_FOLDER = os.path.join(current_dir, "../data/fine_tune")
+OUTPUT_VDB_PATH = INDEX_DIR
+EMBED_BATCH = 64
+TUNE_SAMPLE = 512
 
 def load_jsonl_as_qa(path):
-    qa_docs = []
-    with open(path, "r", encoding="utf-8") as f:
-        for line in f:
-            try:
-                record = json.loads(line.strip())
-                user_msg = None
-                assistant_msg = None
-                messages = record.get("messages", [])
-                if messages:
-                    for msg in messages:
-                        if isinstance(msg, dict):
-                            if msg.get("role") == "user":
-                                user_msg = msg.get("content")
-                            elif msg.get("role") == "assistant":
-                                assistant_msg = msg.get("content")
-
-                if user_msg and assistant_msg:
-                    text = f"Q: {user_msg}\nA: {assistant_msg}"
-                    qa_docs.append(Document(page_content=text))
-            except json.JSONDecodeError:
-                # Skip lines that are not valid JSON
-                continue
-            except Exception as e:
-                # Catch any other unexpected errors during processing
-                print(f"An error occurred while processing a line: {e}")
-                continue
-    return qa_docs
+    # Records may be pretty-printed over several lines; malformed ones are skipped
+    for record in iter_json_records(path):
+        try:
+            user_msg = None
+            assistant_msg = None
+            messages = record.get("messages", [])
+            if messages:
+                for msg in messages:
+                    if isinstance(msg, dict):
+                        if msg.get("role") == "user":
+                            user_msg = msg.get("content")
+                        elif msg.get("role") == "assistant":
+                            assistant_msg = msg.get("content")
+
+            if user_msg and assistant_msg:
+                text = f"Q: {user_msg}\nA: {assistant_msg}"
+                yield Document(page_content=text, metadata={"source": os.path.basename(path)})
+        except Exception as e:
+            # Catch any other unexpected errors during processing
+            print(f"An error occurred while processing a record: {e}")
+            continue
 
 def read_word_docs(path):
-    docs = []
-    docx_obj = DocxDocument(path)  
-    for i, para in enumerate(docx_obj.paragraphs):
-        text = para.text.strip()
-        if text:  # skip empty paragraphs
-            docs.append(Document(page_content=text, metadata={"source": "word", "paragraph": i}))
+    """Chunks of a .docx: the paragraphs packed by chunk_units, then each table by rows."""
+    docx_obj = DocxDocument(path)
+    name = os.path.basename(path)
+    paragraphs = ((para.text, {"source": "word", "file": name, "paragraph": i})
+                  for i, para in enumerate(docx_obj.paragraphs))
+    for text, metadata in chunk_units(paragraphs):
+        yield Document(page_content=text, metadata=metadata)
 
     for t_idx, table in enumerate(docx_obj.tables):
-        table_text = []
-        for row in table.rows:
-            row_text = [cell.text.strip() for cell in row.cells if cell.text.strip()]
-            if row_text:
-                table_text.append(" | ".join(row_text))
-        if table_text:
-            docs.append(Document(
-                page_content="\n".join(table_text),
-                metadata={"source": "word", "type": "table", "id": t_idx}
-            ))
-
-    return docs
+        rows = (" | ".join(cell.text.strip() for cell in row.cells if cell.text.strip()) for row in table.rows)
+        for text, metadata in chunk_units((row, {"source": "word", "file": name, "type": "table", "id": t_idx})
+                                          for row in rows):
+            yield Document(page_content=text, metadata=metadata)
 
 def read_word_folder(folder_path):
-    all_docs = []
-    for file in os.listdir(folder_path):
+    for file in sorted(os.listdir(folder_path)):
         if file.endswith(".docx"):
-            file_path = os.path.join(folder_path, file)
-            word_docs = read_word_docs(file_path)
-            all_docs.extend(word_docs)
-    return all_docs
+            yield from read_word_docs(os.path.join(folder_path, file))
 
 def read_pdf_docs(path):
-    docs = []
-    loader = PyPDFLoader(path)
-    pdf_docs = loader.load()
-    for i, d in enumerate(pdf_docs):
-        docs.append(Document(
-            page_content=d.page_content,
-            metadata={"source": os.path.basename(path), "type": "pdf", "page": i}
-        ))
-    return docs
+    """Chunks of a PDF, reading one page at a time; metadata has the page a chunk starts on."""
+    name = os.path.basename(path)
+    # extract_text keeps the layout's line breaks, which are not sentence ends
+    pages = ((" ".join(d.page_content.split()), {"source": name, "type": "pdf", "page": i})
+             for i, d in enumerate(PyPDFLoader(path).lazy_load()))
+    for text, metadata in chunk_units(pages):
+        yield Document(page_content=text, metadata=metadata)
 
 
 def read_pdf_folder(folder_path):
-    all_docs = []
-    for file in os.listdir(folder_path):
+    for file in sorted(os.listdir(folder_path)):
         if file.endswith(".pdf"):
-            file_path = os.path.join(folder_path, file)
-            all_docs.extend(read_pdf_docs(file_path))
-    return all_docs
-
-
-qa_docs = load_jsonl_as_qa(json_file_path)
-word_docs = read_word_folder(INPUT_FOLDER)
-pdf_docs = read_pdf_folder(INPUT_FOLDER)
-
-all_docs = qa_docs + word_docs + pdf_docs
+            yield from read_pdf_docs(os.path.join(folder_path, file))
+
+
+LOADERS = {
+    ".jsonl": load_jsonl_as_qa,
+    ".docx": read_word_docs,
+    ".pdf": read_pdf_docs,
+}
+
+
+def list_sources(folder_path=INPUT_FOLDER, extensions=tuple(LOADERS)):
+    return sorted(os.path.join(folder_path, f) for f in os.listdir(folder_path)
+                  if os.path.splitext(f)[1] in extensions)
+
+
+def default_sources():
+    return list_sources(INPUT_FOLDER) + list_sources(FINE_TUNE_FOLDER, (".jsonl",))
+
+
+def _stamp(path):
+    st = os.stat(path)
+    return [st.st_size, st.st_mtime_ns]
+
+
+def update_vector_store(paths, index_dir=OUTPUT_VDB_PATH, rebuild=False, batch_size=EMBED_BATCH, workers=None,
+                        index_type=None, index_params=None, search_params=None):
+    """
+    Bring the vector store in line with `paths`, embedding only new chunks.
+
+    Args:
+        paths (list): Source files; their extension picks the loader.
+        index_dir (str): Store directory.
+        rebuild (bool): Drop the existing store first.
+        batch_size: Chunks per embedding batch, or "auto" to time a few sizes first.
+        workers (int): Embedding processes (default: half the CPUs).
+        index_type (str): FAISS index type (see rag/vector_store.py); default: the
+                          existing store's type, or flat for a new store.
+        index_params (dict): nlist / m / pq_m for a new store.
+        search_params (dict): nprobe / efSearch recorded for a new store.
+
+    Returns:
+        dict: Counts of parsed sources and added, removed and live chunks.
+    """
+    if rebuild:
+        shutil.rmtree(index_dir, ignore_errors=True)
+    store = VectorStore(index_dir, index_type=index_type or "flat", index_params=index_params,
+                        search_params=search_params)
+    if index_type and store.manifest.get("index_type", "flat") != index_type:
+        raise ValueError(f"'{index_dir}' holds a {store.manifest.get('index_type', 'flat')} index; "
+                         f"pass --rebuild to switch to {index_type}")
+    sources = store.manifest["sources"]
+
+    removed = set()
+    current = set()
+    queued = set()
+    # (key, metadata) of the texts handed to the embedder, in order; bounded by the batches in flight
+    pending = deque()
+    counts = {"parsed": 0, "added": 0}
+
+    def new_chunks():
+        """Texts of chunks not yet in the store, recording each parsed source's keys on the way."""
+        for path in paths:
+            name = os.path.relpath(path, current_dir)
+            current.add(name)
+            stamp = _stamp(path)
+            if name in sources and sources[name]["stamp"] == stamp:
+                continue
 
-embeddings = HuggingFaceEmbeddings(model_name="sentence-transformers/all-MiniLM-L6-v2")
-vectorstore = FAISS.from_documents(all_docs, embeddings)
-vectorstore.save_local(OUTPUT_VDB_PATH)
+            counts["parsed"] += 1
+            keys = []
+            for doc in LOADERS[os.path.splitext(path)[1]](path):
+                key = chunk_key(doc.page_content, doc.metadata)
+                keys.append(key)
+                if key not in store.manifest["chunks"] and key not in queued:
+                    queued.add(key)
+                    pending.append((key, doc.metadata))
+                    yield doc.page_content
+            removed.update(set(sources.get(name, {}).get("keys", [])) - set(keys))
+            sources[name] = {"stamp": stamp, "keys": keys}
+
+    texts = new_chunks()
+    first = next(texts, None)
+    if first is not None:
+        texts = itertools.chain([first], texts)
+        if batch_size == "auto":
+            sample = list(itertools.islice(texts, TUNE_SAMPLE))
+            batch_size = tune_batch_size(sample)
+            print(f"Batch size {batch_size}")
+            texts = itertools.chain(sample, texts)
+        for batch, vectors in embed_batches(texts, workers, int(batch_size)):
+            chunk = [pending.popleft() for _ in batch]
+            store.add([key for key, _ in chunk], batch, [metadata for _, metadata in chunk], vectors)
+            counts["added"] += len(batch)
+
+    for name in [n for n in sources if n not in current]:
+        removed |= set(sources.pop(name)["keys"])
+    # A chunk that is identical in another source stays
+    live = set().union(*(s["keys"] for s in sources.values())) if sources else set()
+    store.tombstone(removed - live)
+
+    store.compact()
+    store.save()
+    BM25Index.build(store.docstore, store_stamp(store)).save(bm25_path(index_dir))
+    return {"parsed": counts["parsed"], "added": counts["added"], "removed": len(removed - live),
+            "live": len(store.docstore)}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build or incrementally update the RAG vector store.")
+    parser.add_argument("--input-dir", nargs="+", help="Folders to index (default: rag/data and data/fine_tune)")
+    parser.add_argument("--output", default=OUTPUT_VDB_PATH)
+    parser.add_argument("--rebuild", action="store_true", help="Re-embed everything from scratch")
+    parser.add_argument("--batch-size", default=str(EMBED_BATCH), help='Integer or "auto"')
+    parser.add_argument("--workers", type=int)
+    parser.add_argument("--index-type", choices=list(INDEX_TYPES),
+                        help="Index type (default: the existing store's, or flat for a new one)")
+    parser.add_argument("--nlist", type=int, help="IVF clusters")
+    parser.add_argument("--pq-m", type=int, help="IVF-PQ sub-quantisers")
+    parser.add_argument("--hnsw-m", type=int, help="HNSW neighbours per node")
+    parser.add_argument("--nprobe", type=int, help="IVF clusters searched per query")
+    parser.add_argument("--ef-search", type=int, help="HNSW candidates per query")
+    args = parser.parse_args()
+
+    index_params = {k: v for k, v in {"nlist": args.nlist, "pq_m": args.pq_m, "m": args.hnsw_m}.items() if v}
+    search_params = {k: v for k, v in {"nprobe": args.nprobe, "efSearch": args.ef_search}.items() if v}
+
+    paths = [p for folder in args.input_dir for p in list_sources(folder)] if args.input_dir else default_sources()
+    start = time.perf_counter()
+    stats = update_vector_store(paths, args.output, args.rebuild, args.batch_size, args.workers,
+                                args.index_type, index_params, search_params)
+    elapsed = time.perf_counter() - start
+    memory = peak_memory_mb()
+    print(f"✅ {stats['parsed']} sources parsed, {stats['added']} chunks embedded, "
+          f"{stats['removed']} tombstoned, {stats['live']} live in '{args.output}' ({elapsed:.1f} s)")
+    if stats['added']:
+        rate = f"   {stats['added'] / elapsed:.1f} docs/s"
+        if memory:
+            rate += f", peak memory {memory[0]:.0f} MB main, {memory[1]:.0f} MB per worker"
+        print(rate)
@@ -0,0 +1,275 @@
+"""
+ingest.py
+
+Streaming ingestion helpers for the RAG vector store:
+
+- iter_json_records reads JSONL files whose records may span several lines (the
+  pretty-printed files in data/fine_tune), one record at a time
+- embed_batches embeds a stream of texts in fixed-size batches across worker
+  processes, each holding its own copy of the sentence-transformers model and an
+  even share of the CPU threads, with a bounded number of batches in flight so
+  memory stays flat however large the corpus is; workers are spawned, not forked,
+  so they never inherit a model or an OpenMP pool started in the parent
+- tune_batch_size times a few batch sizes on a sample and returns the fastest
+- chunk_units packs a stream of paragraphs or pages into chunks of at most
+  CHUNK_TOKENS MiniLM word pieces (the model truncates at 256), with CHUNK_OVERLAP
+  tokens of trailing sentences repeated at the start of the next chunk
+
+Running the module checks that malformed records are skipped without losing the
+records around them.
+
+Vectors match HuggingFaceEmbeddings.embed_documents (newlines replaced by spaces,
+no normalisation), so stores built here are searched with the same query embedding.
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import tempfile
+import multiprocessing
+from collections import deque
+from functools import lru_cache
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__),  '..')))
+from rag.vector_store import EMBEDDING_MODEL
+
+BATCH_CANDIDATES = (16, 32, 64, 128, 256)
+MAX_RECORD_LINES = 500
+CHUNK_TOKENS = 224
+CHUNK_OVERLAP = 32
+SENTENCE_END_RE = re.compile(r"(?<=[.!?।])\s+")
+
+_model = None
+
+
+# ---------------------------
+# Reading
+# ---------------------------
+def _record_starts(buffer: list) -> list:
+    """Positions after the first of buffered lines that start an object at column 0."""
+    return [i for i, line in enumerate(buffer) if i and line.startswith("{")]
+
+
+def _parse_buffer(buffer: list) -> tuple:
+    """
+    Parse buffered lines as one record. If they do not form one, parse again from each
+    later line that starts an object at column 0, so a broken record does not swallow
+    the good ones after it.
+
+    Returns:
+        tuple: (record or None, lines to keep buffering).
+    """
+    keep = None
+    for start in [0] + _record_starts(buffer):
+        text = "".join(buffer[start:])
+        try:
+            return json.loads(text), []
+        except json.JSONDecodeError as e:
+            # An error before the end means broken, not unfinished, text
+            if keep is None and e.pos >= len(text.rstrip()) and len(buffer) - start <= MAX_RECORD_LINES:
+                keep = buffer[start:]
+    return None, keep or []
+
+
+def iter_json_records(path):
+    """
+    Yield every JSON object in a JSONL file, whether it sits on one line or is
+    pretty-printed over several. After malformed text, parsing restarts at the next
+    line that starts an object at column 0.
+    """
+    buffer = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            if not buffer and not line.lstrip().startswith("{"):
+                continue
+            buffer.append(line)
+            # Only try to parse once the accumulated text could be a whole object
+            if not line.rstrip().endswith("}"):
+                if len(buffer) > MAX_RECORD_LINES:
+                    starts = _record_starts(buffer)
+                    buffer = buffer[starts[0]:] if starts else []
+                continue
+            record, buffer = _parse_buffer(buffer)
+            if record is not None:
+                yield record
+
+
+# ---------------------------
+# Chunking
+# ---------------------------
+@lru_cache(maxsize=1)
+def get_tokenizer(model_name: str = EMBEDDING_MODEL):
+    from transformers import AutoTokenizer
+
+    return AutoTokenizer.from_pretrained(model_name)
+
+
+def count_tokens(text: str) -> int:
+    return len(get_tokenizer().encode(text, add_special_tokens=False, verbose=False))
+
+
+def _segments(text: str, max_tokens: int, count, overlap: int = 0):
+    """
+    Sentences of `text` with their token counts. Over-long sentences are cut into word
+    windows of about `max_tokens` that step by `max_tokens - overlap`, so consecutive
+    windows share about `overlap` tokens.
+    """
+    for sentence in SENTENCE_END_RE.split(text):
+        n = count(sentence)
+        if n <= max_tokens:
+            yield sentence, n
+            continue
+        words = sentence.split()
+        # Word pieces per word vary, so size the windows from this sentence's average
+        size = max(1, int(len(words) * max_tokens / n))
+        step = max(1, int(len(words) * (max_tokens - overlap) / n))
+        for start in range(0, len(words), step):
+            window = " ".join(words[start:start + size])
+            yield window, count(window)
+            if start + size >= len(words):
+                break
+
+
+def chunk_units(units, max_tokens: int = CHUNK_TOKENS, overlap: int = CHUNK_OVERLAP, count=count_tokens):
+    """
+    Pack a stream of text units (paragraphs, pages, table rows) into overlapping chunks.
+
+    Small units are merged until the token budget is reached and large ones are split
+    at sentence ends, so every chunk is embedded whole. Only the current chunk is held
+    in memory.
+
+    Args:
+        units: Iterable of (text, metadata) pairs.
+        max_tokens (int): Token budget per chunk.
+        overlap (int): Tokens of trailing sentences carried into the next chunk, and
+            shared by consecutive windows of an over-long sentence.
+        count: Token counter for a string.
+
+    Yields:
+        tuple: (chunk text, metadata of the unit the chunk starts in).
+    """
+    buffer = []  # [unit number, sentence, tokens, metadata]
+    total = 0
+
+    def text_of(parts):
+        out = parts[0][1]
+        for previous, part in zip(parts, parts[1:]):
+            out += (" " if part[0] == previous[0] else "\n") + part[1]
+        return out
+
+    for number, (text, metadata) in enumerate(units):
+        text = text.strip()
+        if not text:
+            continue
+        for sentence, n in _segments(text, max_tokens, count, overlap):
+            if buffer and total + n > max_tokens:
+                yield text_of(buffer), buffer[0][3]
+                # Keep the trailing sentences that fit in the overlap, and room for this one
+                kept = 0
+                while kept < len(buffer) and sum(p[2] for p in buffer[-kept - 1:]) <= overlap:
+                    kept += 1
+                buffer = buffer[len(buffer) - kept:]
+                total = sum(p[2] for p in buffer)
+                while buffer and total + n > max_tokens:
+                    total -= buffer.pop(0)[2]
+            buffer.append([number, sentence, n, metadata])
+            total += n
+    if buffer:
+        yield text_of(buffer), buffer[0][3]
+
+
+# ---------------------------
+# Embedding
+# ---------------------------
+def _init_worker(model_name: str, threads: int):
+    global _model
+    import torch
+    from sentence_transformers import SentenceTransformer
+
+    torch.set_num_threads(threads)
+    _model = SentenceTransformer(model_name)
+
+
+def _embed(texts, batch_size: int) -> np.ndarray:
+    texts = [t.replace("\n", " ") for t in texts]
+    return _model.encode(texts, batch_size=batch_size, convert_to_numpy=True).astype(np.float32)
+
+
+def embed_batches(texts, workers: int = None, batch_size: int = 64, model_name: str = EMBEDDING_MODEL):
+    """
+    Embed a stream of texts, yielding (texts, vectors) per batch in input order.
+
+    At most 2 × workers batches are queued at a time, so only those texts and
+    vectors are held in memory.
+    """
+    workers = workers or max(1, (os.cpu_count() or 2) // 2)
+    threads = max(1, (os.cpu_count() or 1) // workers)
+    # Forking after torch has started its OpenMP threads (tune_batch_size) can deadlock
+    # the children, so each worker starts a fresh interpreter and loads its own model
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(model_name, threads),
+                             mp_context=multiprocessing.get_context("spawn")) as pool:
+        in_flight = deque()
+        batch = []
+        for text in texts:
+            batch.append(text)
+            if len(batch) == batch_size:
+                in_flight.append((batch, pool.submit(_embed, batch, batch_size)))
+                batch = []
+                if len(in_flight) >= 2 * workers:
+                    done, future = in_flight.popleft()
+                    yield done, future.result()
+        if batch:
+            in_flight.append((batch, pool.submit(_embed, batch, batch_size)))
+        while in_flight:
+            done, future = in_flight.popleft()
+            yield done, future.result()
+
+
+def tune_batch_size(sample, candidates=BATCH_CANDIDATES, model_name: str = EMBEDDING_MODEL) -> int:
+    """Fastest batch size for one process on `sample` texts, after a warm-up pass."""
+    global _model
+    _init_worker(model_name, os.cpu_count() or 1)
+    _embed(sample[:candidates[0]], candidates[0])
+    best, best_rate = candidates[0], 0.0
+    for size in candidates:
+        start = time.perf_counter()
+        _embed(sample, size)
+        rate = len(sample) / (time.perf_counter() - start)
+        print(f"  batch {size:>4}: {rate:8.1f} docs/s")
+        if rate > best_rate:
+            best, best_rate = size, rate
+    # The workers load their own copy; drop the parent's before embed_batches starts them
+    _model = None
+    return best
+
+
+def peak_memory_mb():
+    """
+    Peak RSS of this process and of its largest finished child, in MB (Linux ru_maxrss
+    is KB), or None where the resource module does not exist (Windows).
+    """
+    try:
+        import resource
+    except ImportError:
+        return None
+    own = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    children = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / 1024
+    return own, children
+
+
+if __name__ == "__main__":
+    # Self-check: a truncated record must not swallow the records after it
+    sample = '{"a": 1}\n{"broken": \n{"d": "x}"}\n{\n  "e": 5\n}\n{"f": [1, 2,, 3]}\n{"g": {"h": 1}}\n'
+    with tempfile.NamedTemporaryFile("w", suffix=".jsonl", delete=False, encoding="utf-8") as f:
+        f.write(sample)
+    try:
+        records = list(iter_json_records(f.name))
+    finally:
+        os.remove(f.name)
+    assert records == [{"a": 1}, {"d": "x}"}, {"e": 5}, {"g": {"h": 1}}], records
+    print(f"✅ {len(records)} records recovered around the malformed ones")
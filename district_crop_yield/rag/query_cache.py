@@ -0,0 +1,212 @@
+"""
+query_cache.py
+
+Caches in front of the RAG vector store, for the planner's habit of issuing the same
+or near-identical RAG action across loop iterations and users:
+
+- an LRU cache of query embeddings keyed by normalised text, so a repeated question
+  skips the MiniLM forward pass
+- a short-TTL cache of search results keyed by (normalised text, k), so a repeated
+  question skips the search as well; the TTL bounds how long a result can outlive
+  an index update
+
+Queries are normalised by lower-casing, collapsing whitespace and dropping trailing
+punctuation, so "What is PMFBY?" and "what is pmfby" share entries.
+
+With a BM25 index (rag/bm25.py) the retriever is hybrid:
+1. BM25 ranks LEXICAL_CANDIDATES chunks. If it is confident (the top chunk holds
+   every query term and outscores the runner-up by LEXICAL_MARGIN), its ranking is
+   used as is and the query is never embedded.
+2. Otherwise the dense top candidates are fused with the lexical ones by reciprocal
+   rank fusion.
+3. MMR re-ranks the candidates into the final k, trading relevance against
+   similarity to chunks already picked (stored vectors, or shared terms where the
+   index type cannot reconstruct vectors).
+
+Sizes come from RAG_EMBED_CACHE_SIZE (default 2048), RAG_RESULT_CACHE_SIZE (512)
+and RAG_RESULT_TTL seconds (300).
+"""
+
+import os
+import time
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from rag.bm25 import tokenize
+
+EMBED_CACHE_SIZE = int(os.getenv("RAG_EMBED_CACHE_SIZE", "2048"))
+RESULT_CACHE_SIZE = int(os.getenv("RAG_RESULT_CACHE_SIZE", "512"))
+RESULT_TTL = float(os.getenv("RAG_RESULT_TTL", "300"))
+
+LEXICAL_CANDIDATES = 20
+LEXICAL_MARGIN = float(os.getenv("RAG_LEXICAL_MARGIN", "1.5"))
+RRF_K = 60
+MMR_LAMBDA = 0.7
+
+
+def normalize_query(text: str) -> str:
+    return " ".join(str(text).lower().split()).strip(" ?.!,;:।")
+
+
+class LRUCache:
+    def __init__(self, maxsize: int, ttl: float = None):
+        """
+        Args:
+            maxsize (int): Entries kept; the least recently used is evicted first.
+            ttl (float): Seconds an entry stays valid (default: forever).
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None and (self.ttl is None or time.monotonic() - entry[1] < self.ttl):
+                self._data.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+            if entry is not None:
+                del self._data[key]
+            self.misses += 1
+            return None
+
+    def put(self, key, value):
+        with self._lock:
+            self._data[key] = (value, time.monotonic())
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {"size": len(self._data), "hits": self.hits, "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0}
+
+
+def reciprocal_rank_fusion(rankings, k: int = RRF_K) -> dict:
+    """id -> Σ 1 / (k + rank) over the rankings (lists of ids, best first)."""
+    fused = {}
+    for ranking in rankings:
+        for rank, doc_id in enumerate(ranking):
+            fused[doc_id] = fused.get(doc_id, 0.0) + 1.0 / (k + rank + 1)
+    return fused
+
+
+def mmr(relevance: dict, k: int, similarity, lam: float = MMR_LAMBDA) -> list:
+    """
+    Maximal marginal relevance selection.
+
+    Args:
+        relevance (dict): Candidate id -> relevance in [0, 1].
+        k (int): Ids to pick.
+        similarity (np.ndarray): (n, n) pairwise similarity in the order of `relevance`.
+    """
+    ids = list(relevance)
+    rel = np.array([relevance[i] for i in ids])
+    chosen = []
+    redundancy = np.zeros(len(ids))
+    while len(chosen) < min(k, len(ids)):
+        score = lam * rel - (1 - lam) * redundancy
+        score[chosen] = -np.inf
+        best = int(np.argmax(score))
+        chosen.append(best)
+        redundancy = np.maximum(redundancy, similarity[best])
+    return [ids[i] for i in chosen]
+
+
+def _cosine(vectors: np.ndarray) -> np.ndarray:
+    unit = vectors / np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+    return unit @ unit.T
+
+
+def _jaccard(token_sets) -> np.ndarray:
+    n = len(token_sets)
+    out = np.eye(n)
+    for i in range(n):
+        for j in range(i + 1, n):
+            union = len(token_sets[i] | token_sets[j])
+            out[i, j] = out[j, i] = len(token_sets[i] & token_sets[j]) / union if union else 0.0
+    return out
+
+
+class CachedRetriever:
+    def __init__(self, vectorstore, embeddings, lexical=None, embed_cache_size: int = EMBED_CACHE_SIZE,
+                 result_cache_size: int = RESULT_CACHE_SIZE, result_ttl: float = RESULT_TTL):
+        """
+        Args:
+            vectorstore: rag.vector_store.VectorStore or a LangChain FAISS store
+                         (anything with similarity_search_by_vector).
+            embeddings: LangChain embeddings for the queries.
+            lexical (rag.bm25.BM25Index): Enables hybrid retrieval; needs a VectorStore.
+        """
+        self.vectorstore = vectorstore
+        self.embeddings = embeddings
+        self.lexical = lexical
+        self.embedding_cache = LRUCache(embed_cache_size)
+        self.result_cache = LRUCache(result_cache_size, result_ttl)
+        self.searches = 0
+        self.lexical_only = 0
+
+    def embed(self, query: str) -> list:
+        key = normalize_query(query)
+        vector = self.embedding_cache.get(key)
+        if vector is None:
+            vector = self.embeddings.embed_query(key)
+            self.embedding_cache.put(key, vector)
+        return vector
+
+    def search(self, query: str, k: int = 3) -> list:
+        """Documents for `query`, from the result cache when it was asked recently."""
+        key = (normalize_query(query), k)
+        docs = self.result_cache.get(key)
+        if docs is None:
+            self.searches += 1
+            if self.lexical is None:
+                docs = self.vectorstore.similarity_search_by_vector(self.embed(query), k=k)
+            else:
+                docs = [self.vectorstore.document(i) for i in self.hybrid_ids(query, k)]
+            self.result_cache.put(key, docs)
+        return docs
+
+    def hybrid_ids(self, query: str, k: int) -> list:
+        """Store ids of the hybrid top-k for `query`, uncached."""
+        lexical = self.lexical.search(query, LEXICAL_CANDIDATES)
+        confident = lexical and lexical[0][2] == 1.0 and \
+            (len(lexical) == 1 or lexical[0][1] >= LEXICAL_MARGIN * lexical[1][1])
+        if confident:
+            self.lexical_only += 1
+            relevance = {i: score / lexical[0][1] for i, score, _ in lexical}
+        else:
+            vector = np.array([self.embed(query)], dtype=np.float32)
+            dense = self.vectorstore.search_vectors(vector, LEXICAL_CANDIDATES)[0]
+            fused = reciprocal_rank_fusion([[i for i, _, _ in lexical], [i for i, _ in dense]])
+            top = max(fused.values(), default=1.0)
+            relevance = {i: score / top for i, score in sorted(fused.items(), key=lambda x: -x[1])}
+        if not relevance:
+            return []
+
+        ids = list(relevance)
+        vectors = self.vectorstore.vectors(ids)
+        if vectors is not None:
+            similarity = _cosine(vectors)
+        else:
+            similarity = _jaccard([set(tokenize(self.vectorstore.docstore[i]["text"])) for i in ids])
+        return mmr(relevance, k, similarity)
+
+    def invalidate(self):
+        """Drop cached results, e.g. after the store was rebuilt; embeddings stay valid."""
+        self.result_cache.clear()
+
+    def stats(self) -> dict:
+        return {"embeddings": self.embedding_cache.stats(), "results": self.result_cache.stats(),
+                "searches": self.searches, "lexical_only": self.lexical_only}
@@ -0,0 +1,266 @@
+"""
+vector_store.py
+
+FAISS vector store that can be updated in place, built by rag/create_vdb.py and
+searched by agentic_framework/tools.py.
+
+Files under INDEX_DIR (rag/faiss):
+    index.faiss     FAISS index wrapped in IDMap2, so every chunk keeps a stable int64 id
+    docstore.json   {id: {"text": ..., "metadata": {...}}}
+    manifest.json   chunk hash -> id, per-source stamps and chunk hashes, tombstones
+
+The index type is chosen when the store is first built (INDEX_TYPES) and recorded in
+the manifest along with its search parameters, which are applied again on load:
+    flat     exact L2 search (default)
+    ivf      IVF-Flat, searching `nprobe` of `nlist` clusters
+    hnsw     HNSW graph, `efSearch` candidates per query
+    ivfpq    IVF with product-quantised vectors, the smallest in memory
+Trained types buffer their first vectors until there are enough to train on.
+RAG_SEARCH_PARAMS (e.g. "nprobe=32,efSearch=128") overrides the stored parameters.
+
+A chunk is identified by the SHA-1 of its text and metadata. An update embeds only
+chunks whose hash is not yet in the manifest and appends them under new ids; chunks
+whose hash disappeared are tombstoned (dropped from the docstore and skipped at search
+time) and physically removed from the index by compact() where the index type
+supports it. Only flat stores are compacted: IDMap2.remove_ids renumbers its id map
+but IVF keeps the old internal ids in its inverted lists, so removing from an IVF or
+IVF-PQ store would map hits to the wrong chunks. IVF and HNSW stores keep their
+tombstones until the next full rebuild.
+"""
+
+import os
+import json
+import hashlib
+
+import numpy as np
+
+current_dir = os.path.dirname(__file__)
+INDEX_DIR = os.path.join(current_dir, "faiss")
+EMBEDDING_MODEL = "sentence-transformers/all-MiniLM-L6-v2"
+INDEX_TYPES = {
+    "flat": "Flat",
+    "ivf": "IVF{nlist},Flat",
+    "hnsw": "HNSW{m}",
+    "ivfpq": "IVF{nlist},PQ{pq_m}",
+}
+DEFAULT_INDEX_PARAMS = {"nlist": 256, "m": 32, "pq_m": 48}
+DEFAULT_SEARCH_PARAMS = {"nprobe": 16, "efSearch": 64}
+SEARCH_PARAMS_ENV = os.getenv("RAG_SEARCH_PARAMS", "")
+# faiss wants about this many training points per IVF cluster
+TRAIN_POINTS_PER_LIST = 39
+
+# Compact once tombstones exceed this share of the stored vectors
+COMPACT_FRACTION = 0.2
+
+
+def chunk_key(text: str, metadata: dict = None) -> str:
+    payload = json.dumps({"text": text, "metadata": metadata or {}}, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+
+def _write_json(path: str, obj):
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(obj, f, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+
+def is_vector_store(index_dir: str = INDEX_DIR) -> bool:
+    return os.path.exists(os.path.join(index_dir, "manifest.json"))
+
+
+def index_factory(index_type: str, **params) -> str:
+    if index_type not in INDEX_TYPES:
+        raise ValueError(f"Unknown index type '{index_type}', expected one of {list(INDEX_TYPES)}")
+    return INDEX_TYPES[index_type].format(**{**DEFAULT_INDEX_PARAMS, **params})
+
+
+def _parse_params(setting: str) -> dict:
+    params = {}
+    for item in filter(None, setting.split(",")):
+        name, value = item.split("=")
+        params[name.strip()] = int(value)
+    return params
+
+
+def apply_search_params(faiss, index, params: dict):
+    """Set nprobe / efSearch on the index under the IDMap2 wrapper, where it has them."""
+    inner = faiss.downcast_index(index.index) if hasattr(index, "id_map") else index
+    if "nprobe" in params:
+        try:
+            faiss.extract_index_ivf(inner).nprobe = params["nprobe"]
+        except RuntimeError:
+            pass
+    if "efSearch" in params and hasattr(inner, "hnsw"):
+        inner.hnsw.efSearch = params["efSearch"]
+
+
+class VectorStore:
+    def __init__(self, index_dir: str = INDEX_DIR, embeddings=None, index_type: str = "flat",
+                 index_params: dict = None, search_params: dict = None):
+        """
+        Args:
+            index_dir (str): Store directory; an empty store is created if it has no manifest.
+            embeddings: LangChain embeddings used by the text search methods.
+            index_type (str): Key of INDEX_TYPES for a new store; an existing store keeps its own.
+            index_params (dict): nlist / m / pq_m overrides for a new store.
+            search_params (dict): nprobe / efSearch to record for a new store.
+        """
+        import faiss
+
+        self.index_dir = index_dir
+        self.embeddings = embeddings
+        self.faiss = faiss
+        self.index = None
+        self.docstore = {}
+        self.manifest = {"index_type": index_type, "factory": index_factory(index_type, **(index_params or {})),
+                         "search": {**DEFAULT_SEARCH_PARAMS, **(search_params or {})},
+                         "dim": None, "next_id": 0, "chunks": {}, "sources": {}, "tombstones": []}
+        if is_vector_store(index_dir):
+            with open(os.path.join(index_dir, "manifest.json"), "r", encoding="utf-8") as f:
+                self.manifest = json.load(f)
+            with open(os.path.join(index_dir, "docstore.json"), "r", encoding="utf-8") as f:
+                self.docstore = {int(k): v for k, v in json.load(f).items()}
+            index_path = os.path.join(index_dir, "index.faiss")
+            if os.path.exists(index_path):
+                self.index = faiss.read_index(index_path)
+                apply_search_params(faiss, self.index,
+                                    {**self.manifest.get("search", {}), **_parse_params(SEARCH_PARAMS_ENV)})
+        self._tombstones = set(self.manifest["tombstones"])
+        self._untrained = []
+
+    # ---------------------------
+    # Updates
+    # ---------------------------
+    def _new_index(self, dim: int):
+        self.manifest["dim"] = dim
+        return self.faiss.index_factory(dim, f"IDMap2,{self.manifest['factory']}")
+
+    def _train_size(self) -> int:
+        factory = self.manifest["factory"]
+        if not factory.startswith("IVF"):
+            return 0
+        return TRAIN_POINTS_PER_LIST * int(factory[3:].split(",")[0])
+
+    def _flush_untrained(self, final: bool):
+        """Train on the buffered vectors once there are enough (or at the end), then add them."""
+        if not self._untrained:
+            return
+        n_buffered = sum(len(v) for v, _ in self._untrained)
+        if n_buffered < self._train_size() and not final:
+            return
+        vectors = np.concatenate([v for v, _ in self._untrained])
+        ids = np.concatenate([i for _, i in self._untrained])
+        try:
+            self.index.train(vectors)
+        except RuntimeError as e:
+            raise ValueError(f"{len(vectors)} vectors are too few to train '{self.manifest['factory']}'; "
+                             f"use a smaller nlist or the flat index") from e
+        apply_search_params(self.faiss, self.index, self.manifest.get("search", {}))
+        self.index.add_with_ids(vectors, ids)
+        self._untrained = []
+
+    def add(self, keys, texts, metadatas, vectors: np.ndarray) -> list:
+        """Append embedded chunks under fresh ids."""
+        vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+        if self.index is None:
+            self.index = self._new_index(vectors.shape[1])
+        start = self.manifest["next_id"]
+        ids = np.arange(start, start + len(keys), dtype=np.int64)
+        if self.index.is_trained:
+            self.index.add_with_ids(vectors, ids)
+        else:
+            self._untrained.append((vectors, ids))
+            self._flush_untrained(final=False)
+        for key, text, metadata, doc_id in zip(keys, texts, metadatas, ids.tolist()):
+            self.manifest["chunks"][key] = doc_id
+            self.docstore[doc_id] = {"text": text, "metadata": metadata}
+        self.manifest["next_id"] = start + len(keys)
+        return ids.tolist()
+
+    def tombstone(self, keys):
+        for key in keys:
+            doc_id = self.manifest["chunks"].pop(key, None)
+            if doc_id is not None:
+                self.docstore.pop(doc_id, None)
+                self._tombstones.add(doc_id)
+
+    def compact(self, force: bool = False) -> int:
+        """
+        Remove tombstoned vectors from the index if there are enough of them (or
+        `force`). Only flat indexes are compacted: HNSW has no remove_ids, and IVF's
+        inverted lists would no longer match the IDMap2 id map afterwards. Those keep
+        their tombstones until the next full rebuild.
+
+        Returns:
+            int: Number of vectors removed.
+        """
+        if not self._tombstones or self.index is None or self.manifest["factory"] != INDEX_TYPES["flat"]:
+            return 0
+        if not force and len(self._tombstones) < COMPACT_FRACTION * self.index.ntotal:
+            return 0
+        try:
+            removed = self.index.remove_ids(np.array(sorted(self._tombstones), dtype=np.int64))
+        except RuntimeError:
+            return 0
+        self._tombstones.clear()
+        return int(removed)
+
+    def save(self):
+        self._flush_untrained(final=True)
+        os.makedirs(self.index_dir, exist_ok=True)
+        if self.index is not None:
+            tmp_path = os.path.join(self.index_dir, "index.faiss.tmp")
+            self.faiss.write_index(self.index, tmp_path)
+            os.replace(tmp_path, os.path.join(self.index_dir, "index.faiss"))
+        self.manifest["tombstones"] = sorted(self._tombstones)
+        _write_json(os.path.join(self.index_dir, "docstore.json"), self.docstore)
+        # The manifest goes last: it is what marks the directory as a complete store
+        _write_json(os.path.join(self.index_dir, "manifest.json"), self.manifest)
+
+    # ---------------------------
+    # Search
+    # ---------------------------
+    def search_vectors(self, vectors: np.ndarray, k: int) -> list:
+        """
+        Nearest live chunks for each query vector.
+
+        Returns:
+            list: Per query, a list of (id, L2 distance) pairs, closest first.
+        """
+        if self.index is None or self.index.ntotal == 0:
+            return [[] for _ in range(len(vectors))]
+        vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+        # Over-fetch by the tombstone count so k live hits survive the filter
+        fetch = min(k + len(self._tombstones), self.index.ntotal)
+        distances, ids = self.index.search(vectors, fetch)
+        results = []
+        for row_d, row_i in zip(distances, ids):
+            hits = [(int(i), float(d)) for d, i in zip(row_d, row_i) if i != -1 and int(i) in self.docstore]
+            results.append(hits[:k])
+        return results
+
+    def vectors(self, doc_ids):
+        """Stored vectors of `doc_ids`, or None if the index type cannot reconstruct them."""
+        try:
+            return np.stack([self.index.reconstruct(int(i)) for i in doc_ids])
+        except RuntimeError:
+            return None
+
+    def document(self, doc_id: int):
+        from langchain.docstore.document import Document
+
+        doc = self.docstore[doc_id]
+        return Document(page_content=doc["text"], metadata=doc["metadata"])
+
+    # Same signatures as the LangChain FAISS store, so callers can use either
+    def similarity_search_by_vector(self, embedding, k: int = 4) -> list:
+        vector = np.array([embedding], dtype=np.float32)
+        return [self.document(i) for i, _ in self.search_vectors(vector, k)[0]]
+
+    def similarity_search_with_score(self, query: str, k: int = 4) -> list:
+        vector = np.array([self.embeddings.embed_query(query)], dtype=np.float32)
+        return [(self.document(i), d) for i, d in self.search_vectors(vector, k)[0]]
+
+    def similarity_search(self, query: str, k: int = 4) -> list:
+        return [doc for doc, _ in self.similarity_search_with_score(query, k)]
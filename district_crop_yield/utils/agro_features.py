@@ -0,0 +1,183 @@
+"""
+agro_features.py
+
+Agro-climatic season features computed from daily weather, for all districts at once.
+
+Every feature takes district × day arrays (one per weather variable) plus the day
+dates and returns one value per district, using whole-array NumPy operations only, so
+adding a feature to FEATURES costs one vectorised pass over the season, not a loop
+over rows. The same functions serve the single-district API path (calcWeather) and
+the all-district table built from the weather store (utils/weather_store.py).
+
+Features (Rabi defaults, wheat-oriented):
+    gdd                   growing degree days above BASE_TEMP from (T2M_MAX + T2M_MIN) / 2
+    heat_stress_days      days with T2M_MAX >= HEAT_STRESS_TMAX during grain filling
+    longest_dry_spell     longest run of days with PRECTOTCORR < DRY_DAY_MM
+    rain_<stage>          rainfall in each of CRITICAL_STAGES
+
+Missing days (NaN, or NASA POWER's -999 fill) add nothing to sums and counts and
+break dry spells.
+
+Usage:
+    python agro_features.py [--years 2018 2019 2020 2021 2022] [--output ../data/rabi_agro_features.csv]
+"""
+
+import os
+import sys
+import argparse
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__),  '..')))
+
+current_dir = os.path.dirname(__file__)
+OUTPUT_PATH = os.path.join(current_dir, "../data/rabi_agro_features.csv")
+
+BASE_TEMP = 5.0            # °C, base temperature of rabi crops
+HEAT_STRESS_TMAX = 32.0    # °C, terminal heat threshold for wheat grain filling
+DRY_DAY_MM = 1.0           # mm/day below which a day counts as dry
+POWER_FILL = -999.0
+
+# Calendar windows ((month, day) start, (month, day) end, inclusive) for a mid-November sowing
+CRITICAL_STAGES = {
+    "crown_root": ((12, 1), (12, 20)),
+    "tillering": ((12, 21), (1, 20)),
+    "flowering": ((1, 21), (2, 10)),
+    "grain_fill": ((2, 1), (2, 28)),
+}
+
+
+# ---------------------------
+# Date helpers
+# ---------------------------
+def _season_key(month, day):
+    # Orders Nov < Dec < Jan < Feb ... so Rabi windows crossing the new year compare simply
+    return ((np.asarray(month) - 11) % 12) * 100 + np.asarray(day)
+
+
+def stage_mask(dates: np.ndarray, stage) -> np.ndarray:
+    """Boolean mask over `dates` (datetime64[D]) for a ((m, d), (m, d)) window."""
+    months = dates.astype("datetime64[M]")
+    key = _season_key(months.astype(int) % 12 + 1, (dates - months).astype(int) + 1)
+    (m0, d0), (m1, d1) = stage
+    return (key >= _season_key(m0, d0)) & (key <= _season_key(m1, d1))
+
+
+# ---------------------------
+# Features
+# ---------------------------
+def growing_degree_days(tmax: np.ndarray, tmin: np.ndarray, base: float = BASE_TEMP) -> np.ndarray:
+    """Σ max(0, (tmax + tmin) / 2 - base) over days, per district."""
+    return np.nansum(np.maximum((tmax + tmin) / 2 - base, 0.0), axis=1)
+
+
+def heat_stress_days(tmax: np.ndarray, mask: np.ndarray = None, threshold: float = HEAT_STRESS_TMAX) -> np.ndarray:
+    """Days with tmax >= threshold, optionally only where `mask` (over days) is set."""
+    hot = tmax >= threshold
+    if mask is not None:
+        hot &= mask[None, :]
+    return hot.sum(axis=1).astype(np.float64)
+
+
+def longest_dry_spell(precip: np.ndarray, threshold: float = DRY_DAY_MM) -> np.ndarray:
+    """
+    Longest run of consecutive days with precip < threshold, per district.
+
+    Each day's run length is its index minus the index of the last non-dry day before
+    it, found with a running maximum along the day axis.
+    """
+    n_days = precip.shape[1]
+    if n_days == 0:
+        return np.zeros(precip.shape[0])
+    positions = np.arange(n_days)
+    breaks = np.where(precip < threshold, -1, positions)       # NaN is not dry
+    last_break = np.maximum.accumulate(breaks, axis=1)
+    return (positions - last_break).max(axis=1).astype(np.float64)
+
+
+def stage_rainfall(precip: np.ndarray, mask: np.ndarray) -> np.ndarray:
+    return np.nansum(np.where(mask[None, :], precip, np.nan), axis=1)
+
+
+def _stage_features():
+    return {
+        f"rain_{stage}": (lambda s, dates, window=window: stage_rainfall(s["PRECTOTCORR"], stage_mask(dates, window)))
+        for stage, window in CRITICAL_STAGES.items()
+    }
+
+
+# name -> fn(series: {variable: (districts, days)}, dates) -> (districts,)
+FEATURES = {
+    "gdd": lambda s, dates: growing_degree_days(s["T2M_MAX"], s["T2M_MIN"]),
+    "heat_stress_days": lambda s, dates: heat_stress_days(s["T2M_MAX"], stage_mask(dates, CRITICAL_STAGES["grain_fill"])),
+    "longest_dry_spell": lambda s, dates: longest_dry_spell(s["PRECTOTCORR"]),
+    **_stage_features(),
+}
+
+
+def compute_features(daily: np.ndarray, dates, variables, features=None) -> dict:
+    """
+    Season features for every district in one pass per feature.
+
+    Args:
+        daily (np.ndarray): (districts, days, variables) daily weather.
+        dates: The days, anything np.asarray(..., "datetime64[D]") accepts.
+        variables (list): Variable names along the last axis of `daily`.
+        features (list): Names from FEATURES (default: all).
+
+    Returns:
+        dict: feature name -> (districts,) float64 array.
+    """
+    daily = np.asarray(daily, dtype=np.float64)
+    daily = np.where(daily == POWER_FILL, np.nan, daily)
+    series = {v: daily[:, :, i] for i, v in enumerate(variables)}
+    dates = np.asarray(dates, dtype="datetime64[D]")
+    return {name: FEATURES[name](series, dates) for name in (features or FEATURES)}
+
+
+def features_from_frame(df: pd.DataFrame) -> dict:
+    """
+    Features of one district from a daily frame with a YYYYMMDD 'date' column, as
+    calcWeather builds from a POWER response.
+    """
+    variables = [c for c in df.columns if c != "date"]
+    dates = pd.to_datetime(df["date"].astype(str), format="%Y%m%d").values
+    out = compute_features(df[variables].to_numpy(dtype=np.float64)[None], dates, variables)
+    return {name: float(values[0]) for name, values in out.items()}
+
+
+def rabi_feature_table(store, years, districts=None) -> pd.DataFrame:
+    """
+    One row per (district, rabi_year) from a WeatherStore, laid out like
+    all_districts_rabi_aggregated.csv (rabi_year = the year the season ends).
+    """
+    from utils.weather_store import season_window
+
+    names = districts or store.districts
+    d_idx = store.indices(names, None)[0]
+    frames = []
+    for year in years:
+        start, end = season_window("rabi", year)
+        t0, t1 = store.day_offset(start), store.day_offset(end) + 1
+        if t0 < 0 or t1 > store.days:
+            print(f"❌ Season {year}-{year + 1} is outside the weather store, skipped.")
+            continue
+        out = compute_features(store.values[d_idx, t0:t1], store.start + np.arange(t0, t1), store.variables)
+        frames.append(pd.DataFrame({"district": names, "rabi_year": year + 1, **out}))
+    return pd.concat(frames, ignore_index=True)
+
+
+if __name__ == "__main__":
+    from utils.weather_store import get_weather_store, STORE_DIR
+
+    parser = argparse.ArgumentParser(description="Agro-climatic Rabi features for every district.")
+    parser.add_argument("--years", type=int, nargs="+", default=[2018, 2019, 2020, 2021, 2022],
+                        help="Season start years")
+    parser.add_argument("--store-dir", default=STORE_DIR)
+    parser.add_argument("--output", default=OUTPUT_PATH)
+    args = parser.parse_args()
+
+    table = rabi_feature_table(get_weather_store(args.store_dir), args.years)
+    table.to_csv(args.output, index=False)
+    print(f"✅ {len(table)} district seasons with {len(FEATURES)} features saved to '{args.output}'")
@@ -1,57 +1,87 @@
-import ee
+import os
+import sys
+import datetime
 
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__),  '..')))
+from utils.index_resolution import resolve_scale, auto_scale
+from utils.gazetteer import get_gazetteer
+from utils.replay import service_mode, replayable
 
-ee.Initialize(project='concise-complex-428704-s9')
+# "local" computes indices from Sentinel-2 tiles on disk (utils/raster_indices.py)
+INDEX_BACKEND = os.getenv("INDEX_BACKEND", "ee")
 
-# ---- Step 1: Load shapefile ----
-districts = ee.FeatureCollection("projects/concise-complex-428704-s9/assets/india_districts")
+if INDEX_BACKEND == "local":
+    from utils.raster_indices import calculate_indices_data_local, indices_between_local
+elif not (service_mode("ee") == service_mode("ee_window") == "replay"):
+    import ee
 
-def calculate_indices_data(year, district):
-    """
-    Fetch MODIS indices data for given district/year
-    and aggregate into a single yearly record for model prediction.
-    
-    Returns:
-        dict: aggregated features ( yearly averages / totals )
-    """
-    # Get lat/lon for district
+    ee.Initialize(project='concise-complex-428704-s9')
+
+    # ---- Step 1: Load shapefile ----
+    districts = ee.FeatureCollection("projects/concise-complex-428704-s9/assets/india_districts")
+
+# Cloud masking using QA60
+def mask_clouds(image):
+    cloud_prob = image.select('MSK_CLDPRB')
+    mask = cloud_prob.lt(20)  # keep pixels with <20% cloud probability
+    return image.updateMask(mask)
 
-    start_date = ee.Date.fromYMD(year, 11, 1)   # Nov 1
-    end_date = ee.Date.fromYMD(year + 1, 2, 28) # Feb 28
 
-    district = districts.filter(ee.Filter.eq("NAME_2", district))
+# Calculate indices
+def add_indices(image):
+    nir = image.select('B8')
+    red = image.select('B4')
+    green = image.select('B3')
+    swir = image.select('B11')
+    blue = image.select('B2')
 
-    # Load Sentinel-2 SR
+    ndvi = nir.subtract(red).divide(nir.add(red)).rename('NDVI')
+    evi = nir.subtract(red).multiply(2.5) \
+          .divide(nir.add(red.multiply(6)).subtract(blue.multiply(7.5)).add(1)) \
+          .rename('EVI')
+    ndwi = nir.subtract(swir).divide(nir.add(swir)).rename('NDWI')
+
+    return image.addBands([ndvi, evi, ndwi])
+
+
+def season_collection(district, start_date, end_date):
+    """Cloud-masked Sentinel-2 SR scenes over `district` with the three index bands added."""
     s2 = ee.ImageCollection("COPERNICUS/S2_SR") \
         .filterBounds(district) \
         .filterDate(start_date, end_date) \
         .filter(ee.Filter.lt('CLOUDY_PIXEL_PERCENTAGE', 20))
 
-    # Cloud masking using QA60
-    def mask_clouds(image):
-        cloud_prob = image.select('MSK_CLDPRB')
-        mask = cloud_prob.lt(20)  # keep pixels with <20% cloud probability
-        return image.updateMask(mask)
+    return s2.map(mask_clouds).map(add_indices)
 
-    s2_clean = s2.map(mask_clouds)
 
-    # Calculate indices
-    def add_indices(image):
-        nir = image.select('B8')
-        red = image.select('B4')
-        green = image.select('B3')
-        swir = image.select('B11')
-        blue = image.select('B2')
+@replayable("ee", lambda year, district, scale=None: {"year": year, "district": district, "scale": scale})
+def calculate_indices_data(year, district, scale=None):
+    """
+    Fetch MODIS indices data for given district/year
+    and aggregate into a single yearly record for model prediction.
+
+    Args:
+        scale: Reduction scale in metres, or "auto" to pick it from the district
+               area (default: the INDEX_SCALE setting, see utils/index_resolution.py).
+    
+    Returns:
+        dict: aggregated features ( yearly averages / totals )
+    """
+    if INDEX_BACKEND == "local":
+        return calculate_indices_data_local(year, district, scale)
+
+    # Get lat/lon for district
 
-        ndvi = nir.subtract(red).divide(nir.add(red)).rename('NDVI')
-        evi = nir.subtract(red).multiply(2.5) \
-              .divide(nir.add(red.multiply(6)).subtract(blue.multiply(7.5)).add(1)) \
-              .rename('EVI')
-        ndwi = nir.subtract(swir).divide(nir.add(swir)).rename('NDWI')
+    start_date = ee.Date.fromYMD(year, 11, 1)   # Nov 1
+    end_date = ee.Date.fromYMD(year + 1, 2, 28) # Feb 28
 
-        return image.addBands([ndvi, evi, ndwi])
+    district_name = district
+    district = districts.filter(ee.Filter.eq("NAME_2", get_gazetteer().ee_name(district)))
+    scale = resolve_scale(scale)
+    if scale == "auto":
+        scale = auto_scale(ee, district.geometry())
 
-    s2_indices = s2_clean.map(add_indices)
+    s2_indices = season_collection(district, start_date, end_date)
 
     # Mean over season
     mean_indices = s2_indices.select(['NDVI', 'EVI', 'NDWI']) \
@@ -59,14 +89,15 @@ def calculate_indices_data(year, district):
                               .reduceRegion(
                                   reducer=ee.Reducer.mean(),
                                   geometry=district.geometry(),
-                                  scale=10,
+                                  scale=scale,
                                   maxPixels=1e13
                               )
-    result =  ee.Dictionary(mean_indices).set('year', year)
+    result =  ee.Dictionary(mean_indices).set('year', year).set('scale', scale)
     result = result.getInfo()  # Convert to Python dict
     final_result = {
         "year": year,
-        "district": district,
+        "district": district_name,
+        "scale": result.get('scale'),
         "ndvi": result.get('NDVI'),
         "evi": result.get('EVI'),
         "ndwi": result.get('NDWI')
@@ -74,3 +105,54 @@ def calculate_indices_data(year, district):
 
     return final_result
 
+
+@replayable("ee_window", lambda district, start, end, scale=None: {
+    "district": district, "start": str(start), "end": str(end), "scale": scale})
+def calculate_indices_between(district, start, end, scale=None):
+    """
+    The season composite of calculate_indices_data (per-pixel means over the scenes,
+    then the district mean of those) over the scenes with start <= date < end only,
+    so utils/season_state.py serves the season so far with the training definition.
+
+    Args:
+        district (str): Any spelling of the district.
+        start, end (datetime.date): Window, end exclusive.
+        scale: Metres, or "auto" (default: INDEX_SCALE).
+
+    Returns:
+        dict: {"through": last scene date or None, "scenes": n, "scale": ..., "ndvi": ..., "evi": ..., "ndwi": ...}
+    """
+    if INDEX_BACKEND == "local":
+        return indices_between_local(district, start, end, scale)
+
+    district = districts.filter(ee.Filter.eq("NAME_2", get_gazetteer().ee_name(district)))
+    scale = resolve_scale(scale)
+    if scale == "auto":
+        scale = auto_scale(ee, district.geometry())
+
+    s2_indices = season_collection(district, ee.Date(str(start)), ee.Date(str(end)))
+    mean_indices = s2_indices.select(['NDVI', 'EVI', 'NDWI']) \
+                              .mean() \
+                              .reduceRegion(
+                                  reducer=ee.Reducer.mean(),
+                                  geometry=district.geometry(),
+                                  scale=scale,
+                                  maxPixels=1e13
+                              )
+    result = ee.Dictionary(mean_indices) \
+        .set('scale', scale) \
+        .set('scenes', s2_indices.size()) \
+        .set('time', s2_indices.aggregate_max('system:time_start')) \
+        .getInfo()
+
+    through = None
+    if result.get('scenes'):
+        through = datetime.datetime.utcfromtimestamp(result['time'] / 1000).date().isoformat()
+    return {
+        "through": through,
+        "scenes": result.get('scenes', 0),
+        "scale": result.get('scale'),
+        "ndvi": result.get('NDVI'),
+        "evi": result.get('EVI'),
+        "ndwi": result.get('NDWI')
+    }
@@ -1,9 +1,60 @@
 import requests
 import pandas as pd
 import os
+import sys
+from functools import lru_cache
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__),  '..')))
+from utils.gazetteer import get_gazetteer
+from utils.replay import replayable, service_mode
+from utils.agro_features import features_from_frame
+from utils.power_grid import get_power_grid
+
+# POWER_BASE_URL points the client at utils/standin_server.py for offline load tests
+POWER_BASE_URL = os.getenv("POWER_BASE_URL", "https://power.larc.nasa.gov")
+POWER_DAILY_URL = f"{POWER_BASE_URL}/api/temporal/daily/point"
+WEATHER_PARAMS = ["T2M_MAX", "T2M_MIN", "T2M", "PRECTOTCORR", "ALLSKY_SFC_SW_DWN"]
+
+
+def power_request(lat, lon, start, end) -> dict:
+    """Fixture key for one POWER request, shared with the HTTP stand-in."""
+    return {"lat": float(lat), "lon": float(lon), "start": str(start), "end": str(end)}
+
+
+@replayable("power", power_request)
+def _request_power(lat, lon, start, end):
+    url = (
+        f"{POWER_DAILY_URL}?"
+        f"parameters={','.join(WEATHER_PARAMS)}"
+        f"&community=AG"
+        f"&longitude={lon}&latitude={lat}"
+        f"&start={start}&end={end}"
+        f"&format=JSON"
+    )
+    response = requests.get(url, timeout=30)
+    response.raise_for_status()
+    return response.json()
+
+
+_cached_power = lru_cache(maxsize=512)(_request_power)
+
+
+def fetch_power_point(lat, lon, start, end):
+    """
+    One NASA POWER request per (cell pair, date range). The point is moved to the
+    shared point of its meteorology/solar cell pair (utils/power_grid.py), the first
+    district centroid in it, so districts in the same cells share one response with
+    identical values. Repeated requests share the cached response; failed requests
+    raise and are not cached. Callers must not mutate the returned dict.
+
+    Replayed requests skip the cache, so every call pays REPLAY_LATENCY as a load
+    test expects.
+    """
+    lat, lon = get_power_grid().shared_point(lat, lon)
+    if service_mode("power") == "replay":
+        return _request_power(lat, lon, start, end)
+    return _cached_power(lat, lon, start, end)
 
-current_dir = os.path.dirname(__file__)   # The folder this script is in
-target_path = os.path.join(current_dir, "../data/district_wise_centroids.csv")
 
 def calculate_weather_data(year, district):
     """
@@ -13,33 +64,17 @@ def calculate_weather_data(year, district):
     Returns:
         dict: aggregated features ( yearly averages / totals )
     """
-    # Load district coordinates
-    coord_df = pd.read_csv(target_path)
-    coord_df_mp = coord_df[coord_df['State'] == "Madhya Pradesh"]
-
-    # Get lat/lon for district
-    lat = coord_df_mp.loc[coord_df_mp['District'] == district, "Latitude"].values[0]
-    lon = coord_df_mp.loc[coord_df_mp['District'] == district, "Longitude"].values[0]
+    # Get lat/lon for district from the in-memory gazetteer (any spelling resolves)
+    try:
+        lat, lon = get_gazetteer().coordinates(district)
+    except KeyError as e:
+        print(f"❌ {e}")
+        return None
 
     print(lat, lon)
 
-    params = [
-        "T2M_MAX", "T2M_MIN", "T2M", "PRECTOTCORR", "ALLSKY_SFC_SW_DWN"
-    ]
-
-    url = (
-        "https://power.larc.nasa.gov/api/temporal/daily/point?"
-        f"parameters={','.join(params)}"
-        f"&community=AG"
-        f"&longitude={lon}&latitude={lat}"
-        f"&start={year}1101&end={year+1}0228"
-        f"&format=JSON"
-    )
-
     try:
-        response = requests.get(url, timeout=30)
-        response.raise_for_status()
-        data = response.json()
+        data = fetch_power_point(lat, lon, f"{year}1101", f"{year+1}0228")
 
         if 'properties' in data and 'parameter' in data['properties']:
             df = pd.DataFrame(data['properties']['parameter'])
@@ -56,6 +91,8 @@ def calculate_weather_data(year, district):
                 "total_rainfall": df["PRECTOTCORR"].sum(),
                 "avg_solar_radiation": df["ALLSKY_SFC_SW_DWN"].mean()
             }
+            # GDD, heat stress, dry spell and stage rainfall from the daily max/min and rain
+            aggregated.update(features_from_frame(df))
 
             return aggregated
         else:
@@ -0,0 +1,150 @@
+import os
+import json
+import hashlib
+import threading
+
+import pandas as pd
+
+current_dir = os.path.dirname(__file__)
+CACHE_DIR = os.path.join(current_dir, "../data/.cache")
+
+try:
+    import pyarrow as pa
+    from pyarrow import feather
+except ImportError:  # cache disabled, every read goes to the source file
+    pa = None
+    feather = None
+
+READERS = {
+    ".csv": pd.read_csv,
+    ".xlsx": pd.read_excel,
+    ".xls": pd.read_excel,
+}
+
+
+def _sha1_file(path: str, chunk_size: int = 1 << 20) -> str:
+    h = hashlib.sha1()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _cache_paths(path: str, read_kwargs: dict) -> tuple:
+    key = json.dumps([os.path.abspath(path), read_kwargs], sort_keys=True, default=str)
+    digest = hashlib.sha1(key.encode()).hexdigest()[:16]
+    stem = os.path.splitext(os.path.basename(path))[0].replace(" ", "_")
+    base = os.path.join(CACHE_DIR, f"{stem}-{digest}")
+    return f"{base}.feather", f"{base}.json"
+
+
+def _read_meta(meta_path: str):
+    try:
+        with open(meta_path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return None
+
+
+def _write_atomic(path: str, write):
+    # Unique per process and thread, so concurrent workers never share a temp file
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    write(tmp_path)
+    os.replace(tmp_path, path)
+
+
+def _write_json(path: str, obj: dict):
+    def write(tmp_path):
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(obj, f)
+    _write_atomic(path, write)
+
+
+def _is_fresh(meta, source_path: str, meta_path: str) -> bool:
+    """Cheap mtime/size check first; only re-hash the source when those changed."""
+    if meta is None:
+        return False
+    st = os.stat(source_path)
+    if meta["mtime_ns"] == st.st_mtime_ns and meta["size"] == st.st_size:
+        return True
+    if meta["size"] == st.st_size and meta["sha1"] == _sha1_file(source_path):
+        # Touched but unchanged (e.g. re-checkout): refresh the stored mtime
+        meta["mtime_ns"] = st.st_mtime_ns
+        _write_json(meta_path, meta)
+        return True
+    return False
+
+
+def _write_cache(df: pd.DataFrame, source_path: str, data_path: str, meta_path: str):
+    index_columns = []
+    if not isinstance(df.index, pd.RangeIndex):
+        index_columns = [n if n is not None else f"__index_level_{i}__"
+                         for i, n in enumerate(df.index.names)]
+        df = df.rename_axis(index_columns).reset_index()
+
+    # Feather needs string column names; remember the original labels (e.g. header=None ints)
+    labels = [[c, type(c).__name__] for c in df.columns]
+    stored = df.copy(deep=False)
+    stored.columns = [str(c) for c in df.columns]
+
+    _write_atomic(data_path, lambda p: feather.write_feather(stored, p, compression="uncompressed"))
+
+    st = os.stat(source_path)
+    meta = {
+        "source": os.path.abspath(source_path),
+        "mtime_ns": st.st_mtime_ns,
+        "size": st.st_size,
+        "sha1": _sha1_file(source_path),
+        "columns": labels,
+        "index_columns": index_columns,
+    }
+    _write_json(meta_path, meta)
+
+
+def _load_cache(data_path: str, meta: dict) -> pd.DataFrame:
+    table = feather.read_table(data_path, memory_map=True)
+    df = table.to_pandas()
+    df.columns = [int(label) if kind == "int" else label for label, kind in meta["columns"]]
+    if meta["index_columns"]:
+        df = df.set_index(meta["index_columns"])
+        df.index.names = [None if n.startswith("__index_level_") else n for n in df.index.names]
+    return df
+
+
+def read_table(path: str, **read_kwargs) -> pd.DataFrame:
+    """
+    Read a CSV or Excel source through a columnar Feather cache.
+
+    The first read parses the source with pandas and stores an uncompressed Feather
+    copy under data/.cache, keyed by the source path and reader arguments. Later reads
+    memory-map that copy as long as the source's mtime/size (or, failing that, its
+    SHA-1) still match. Frames Arrow cannot store, such as mixed-type object columns,
+    are returned uncached.
+
+    Args:
+        path (str): Source file (.csv, .xlsx or .xls).
+        **read_kwargs: Passed to pd.read_csv / pd.read_excel.
+
+    Returns:
+        pd.DataFrame: Same frame the pandas reader would return.
+    """
+    ext = os.path.splitext(path)[1].lower()
+    if ext not in READERS:
+        raise ValueError(f"Unsupported data file type: {path}")
+    reader = READERS[ext]
+
+    if feather is None:
+        return reader(path, **read_kwargs)
+
+    data_path, meta_path = _cache_paths(path, read_kwargs)
+    meta = _read_meta(meta_path)
+    if os.path.exists(data_path) and _is_fresh(meta, path, meta_path):
+        return _load_cache(data_path, meta)
+
+    df = reader(path, **read_kwargs)
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        _write_cache(df, path, data_path, meta_path)
+    except (pa.ArrowInvalid, pa.ArrowTypeError, pa.ArrowNotImplementedError) as e:
+        print(f"Not caching {os.path.basename(path)}: {e}")
+    return df
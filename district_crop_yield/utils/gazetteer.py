@@ -0,0 +1,170 @@
+"""
+gazetteer.py
+
+One in-memory table of districts, loaded once per process and indexed by normalised
+name, so every source's spelling of a district resolves to the same record:
+
+- district_wise_centroids.csv   "East Nimar"   (canonical names and coordinates)
+- all_crops_all_districts.csv   "Khandwa", "Agar malwa"
+- Earth Engine NAME_2            "EastNimar"    (as queried in mp_all_district_indicies.csv)
+- the yield model's LabelEncoder classes
+
+Names are normalised by lower-casing and dropping everything but letters and digits.
+The alias table is built up front from every source plus the known renames in
+ALIASES; a name that still misses is matched with difflib once and the result is
+added to the table, so every later lookup is a dict hit.
+"""
+
+import os
+import re
+import sys
+import difflib
+from dataclasses import dataclass
+from functools import lru_cache
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__),  '..')))
+from utils.data_cache import read_table
+
+current_dir = os.path.dirname(__file__)
+CENTROIDS_PATH = os.path.join(current_dir, "../data/district_wise_centroids.csv")
+AREA_PATH = os.path.join(current_dir, "../data/all_crops_all_districts.csv")
+EE_NAMES_PATH = os.path.join(current_dir, "../data/mp_all_district_indicies.csv")
+
+FUZZY_CUTOFF = 0.8
+
+# Renamed districts and alternative names: normalised alias -> canonical name
+ALIASES = {
+    "khandwa": "East Nimar",
+    "khargone": "West Nimar",
+    "narmadapuram": "Hoshangabad",
+    "narsimhapur": "Narsinghpur",
+    "agar": "Agar Malwa",
+}
+
+# Districts formed after the centroid file was made borrow their parent's coordinates
+PARENT_DISTRICTS = {
+    "Agar Malwa": "Shajapur",
+    "Alirajpur": "Jhabua",
+    "Niwari": "Tikamgarh",
+    "Singrauli": "Sidhi",
+}
+
+
+def normalize_name(name) -> str:
+    """'Agar malwa', 'Agar-Malwa' and 'AgarMalwa' all become 'agarmalwa'."""
+    return re.sub(r"[^a-z0-9]", "", str(name).lower())
+
+
+@dataclass
+class DistrictRecord:
+    name: str
+    state: str
+    latitude: float
+    longitude: float
+    coords_from: str = None     # parent district whose centroid is used, if any
+    area_name: str = None       # spelling in all_crops_all_districts.csv
+    ee_name: str = None         # Earth Engine NAME_2
+
+
+class Gazetteer:
+    def __init__(self, coord_df, area_names=(), ee_names=()):
+        """
+        Args:
+            coord_df (pd.DataFrame): Centroids with State, District, Latitude, Longitude.
+            area_names: District spellings used by the area/yield table.
+            ee_names: District NAME_2 values used by Earth Engine.
+        """
+        self.records = {}
+        for row in coord_df.itertuples(index=False):
+            self.records[row.District] = DistrictRecord(row.District, row.State, row.Latitude, row.Longitude)
+        for child, parent in PARENT_DISTRICTS.items():
+            if parent in self.records and child not in self.records:
+                p = self.records[parent]
+                self.records[child] = DistrictRecord(child, p.state, p.latitude, p.longitude, coords_from=parent)
+
+        self.aliases = {normalize_name(name): name for name in self.records}
+        for alias, name in ALIASES.items():
+            if name in self.records:
+                self.aliases.setdefault(alias, name)
+
+        for area_name in area_names:
+            canonical = self.match(area_name)
+            if canonical:
+                self.records[canonical].area_name = area_name
+        for ee_name in ee_names:
+            canonical = self.match(ee_name)
+            if canonical:
+                self.records[canonical].ee_name = ee_name
+
+        self._encoder_tables = {}
+
+    def match(self, name) -> str:
+        """Canonical name for any spelling of a district, or None."""
+        key = normalize_name(name)
+        canonical = self.aliases.get(key)
+        if canonical is None and key:
+            close = difflib.get_close_matches(key, list(self.aliases), n=1, cutoff=FUZZY_CUTOFF)
+            if close:
+                canonical = self.aliases[key] = self.aliases[close[0]]
+        return canonical
+
+    def resolve(self, name) -> DistrictRecord:
+        canonical = self.match(name)
+        if canonical is None:
+            raise KeyError(f"Unknown district '{name}'")
+        return self.records[canonical]
+
+    def coordinates(self, name) -> tuple:
+        record = self.resolve(name)
+        return record.latitude, record.longitude
+
+    def ee_name(self, name) -> str:
+        record = self.resolve(name)
+        return record.ee_name or record.name
+
+    def area_name(self, name) -> str:
+        record = self.resolve(name)
+        return record.area_name or record.name
+
+    def _encoder_table(self, encoder) -> dict:
+        # Keyed on the encoder object and its class count, so a retrained
+        # (extended) encoder from the model registry gets a fresh table
+        key = (id(encoder), len(encoder.classes_))
+        if key not in self._encoder_tables:
+            table = {}
+            for idx, cls in enumerate(encoder.classes_):
+                canonical = self.match(cls)
+                if canonical:
+                    table.setdefault(canonical, idx)
+            self._encoder_tables = {key: table}
+        return self._encoder_tables[key]
+
+    def encoder_id(self, name, encoder) -> int:
+        """Integer the fitted LabelEncoder assigns to this district."""
+        canonical = self.resolve(name).name
+        table = self._encoder_table(encoder)
+        if canonical not in table:
+            raise KeyError(f"District '{name}' is not among the model's encoder classes")
+        return table[canonical]
+
+    def encoder_class(self, name, encoder) -> str:
+        """The district's spelling among the encoder classes, for LabelEncoder.transform."""
+        return encoder.classes_[self.encoder_id(name, encoder)]
+
+
+@lru_cache(maxsize=None)
+def get_gazetteer(state: str = "Madhya Pradesh") -> Gazetteer:
+    """Gazetteer for one state, built once per process."""
+    coord_df = read_table(CENTROIDS_PATH)
+    coord_df = coord_df[coord_df['State'] == state]
+    area_names = read_table(AREA_PATH)['district'].dropna().unique()
+    ee_names = read_table(EE_NAMES_PATH)['district'].dropna().unique()
+    return Gazetteer(coord_df, area_names, ee_names)
+
+
+if __name__ == "__main__":
+    gazetteer = get_gazetteer()
+    for record in sorted(gazetteer.records.values(), key=lambda r: r.name):
+        print(f"{record.name:<14} {record.latitude:8.4f} {record.longitude:8.4f}  "
+              f"area={record.area_name!s:<12} ee={record.ee_name!s:<12}"
+              + (f" (coordinates of {record.coords_from})" if record.coords_from else ""))
@@ -0,0 +1,60 @@
+"""
+index_resolution.py
+
+Resolution pyramid for district-mean vegetation indices.
+
+A district-wide NDVI/EVI/NDWI mean barely changes between 10 m and 100–250 m, but the
+cost of reduceRegion grows with the pixel count, so the scale is chosen per district:
+the finest pyramid level at which the district fits inside PIXEL_BUDGET pixels. With
+the default budget of 1e6 pixels that means 10 m up to 100 km², 30 m up to 900 km²,
+100 m up to 10,000 km² and 250 m beyond (most MP districts land on 100 m).
+
+The scale comes from the INDEX_SCALE environment variable ("auto" or metres) or per
+call. It defaults to 10 m, the resolution the yield model's training indices were
+computed at. "auto" is opt-in until the drift it introduces has been measured:
+benchmarks/bench_index_resolution.py (which needs Earth Engine credentials) reports
+the error and runtime of each level against the 10 m reference outputs in
+data/mp_indicies_data.
+"""
+
+import os
+
+RESOLUTION_PYRAMID = (10, 30, 100, 250)
+PIXEL_BUDGET = 1e6
+INDEX_SCALE = os.getenv("INDEX_SCALE", "10")
+
+
+def choose_scale(area_km2: float, pixel_budget: float = PIXEL_BUDGET, pyramid=RESOLUTION_PYRAMID) -> int:
+    """Finest pyramid scale (m) at which `area_km2` is covered by at most `pixel_budget` pixels."""
+    for scale in pyramid:
+        if area_km2 * 1e6 / scale ** 2 <= pixel_budget:
+            return scale
+    return pyramid[-1]
+
+
+def auto_scale(ee, geometry, pixel_budget: float = PIXEL_BUDGET, pyramid=RESOLUTION_PYRAMID):
+    """
+    choose_scale evaluated on the Earth Engine side, so picking the scale costs no
+    extra round trip.
+
+    Returns:
+        ee.Number: The scale to pass to reduceRegion.
+    """
+    needed = geometry.area(1000).divide(pixel_budget).sqrt()
+    return ee.List(list(pyramid)).filter(ee.Filter.gte('item', needed)).add(pyramid[-1]).get(0)
+
+
+def resolve_scale(scale=None):
+    """
+    Normalise a scale setting.
+
+    Args:
+        scale: None (use INDEX_SCALE), "auto", or a scale in metres.
+
+    Returns:
+        "auto" or an int number of metres.
+    """
+    scale = INDEX_SCALE if scale is None else scale
+    if str(scale).lower() == "auto":
+        return "auto"
+    return int(scale)
@@ -0,0 +1,98 @@
+"""
+power_grid.py
+
+NASA POWER serves daily meteorology from the MERRA-2 grid (0.5° latitude × 0.625°
+longitude) and solar radiation (ALLSKY_SFC_SW_DWN) from the 1° CERES grid, so every
+point that shares both cells gets identical values. Districts whose centroids fall in
+the same pair of cells therefore need only one request.
+
+PowerGrid groups district centroids by that pair and requests each group at its
+first district's centroid, so every district gets exactly what a request at its own
+centroid would return. The bulk downloader (createData/power_downloader.py) plans its
+requests from the groups, and live lookups (calcWeather.fetch_power_point) move each
+point to its group's shared point, so both paths make one request per cell pair.
+"""
+
+import os
+import sys
+from functools import lru_cache
+
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__),  '..')))
+from utils.data_cache import read_table
+
+current_dir = os.path.dirname(__file__)
+CENTROIDS_PATH = os.path.join(current_dir, "../data/district_wise_centroids.csv")
+
+LAT_STEP = 0.5
+LON_STEP = 0.625
+SOLAR_STEP = 1.0
+
+
+def snap_to_cell(lat: float, lon: float) -> tuple:
+    """Centre of the MERRA-2 meteorology cell containing (lat, lon), rounded for use as a key."""
+    cell_lat = -90 + LAT_STEP * np.round((lat + 90) / LAT_STEP)
+    cell_lon = -180 + LON_STEP * np.round((lon + 180) / LON_STEP)
+    return round(float(cell_lat), 4), round(float(cell_lon), 4)
+
+
+def solar_cell(lat: float, lon: float) -> tuple:
+    """Centre of the 1° solar grid cell containing (lat, lon)."""
+    cell_lat = SOLAR_STEP * np.floor(lat / SOLAR_STEP) + SOLAR_STEP / 2
+    cell_lon = SOLAR_STEP * np.floor(lon / SOLAR_STEP) + SOLAR_STEP / 2
+    return round(float(cell_lat), 4), round(float(cell_lon), 4)
+
+
+def cell_key(lat: float, lon: float) -> tuple:
+    """(meteorology cell, solar cell) of a point; points with equal keys get equal data."""
+    return snap_to_cell(lat, lon), solar_cell(lat, lon)
+
+
+class PowerGrid:
+    def __init__(self, coord_df):
+        """
+        Args:
+            coord_df (pd.DataFrame): Centroids with State, District, Latitude, Longitude.
+        """
+        self.district_cell = {}
+        self.cell_districts = {}
+        # Point each shared request is made at: the first district's own centroid
+        self.cell_point = {}
+        for row in coord_df.itertuples(index=False):
+            cell = cell_key(row.Latitude, row.Longitude)
+            self.district_cell[(row.State, row.District)] = cell
+            self.cell_districts.setdefault(cell, []).append((row.State, row.District))
+            self.cell_point.setdefault(cell, (float(row.Latitude), float(row.Longitude)))
+
+    def cell_for_district(self, district: str, state: str = "Madhya Pradesh") -> tuple:
+        return self.district_cell[(state, district)]
+
+    def shared_point(self, lat: float, lon: float) -> tuple:
+        """The point requests for (lat, lon)'s cell pair are made at, or (lat, lon) if no district is in it."""
+        return self.cell_point.get(cell_key(lat, lon), (float(lat), float(lon)))
+
+    def dedup_report(self) -> dict:
+        n_districts = len(self.district_cell)
+        n_cells = len(self.cell_districts)
+        return {
+            "districts": n_districts,
+            "cells": n_cells,
+            "calls_removed": n_districts - n_cells,
+            "shared_cells": {"{},{}".format(*self.cell_point[cell]): [d for _, d in ds]
+                             for cell, ds in self.cell_districts.items() if len(ds) > 1},
+        }
+
+
+@lru_cache(maxsize=None)
+def get_power_grid() -> PowerGrid:
+    """PowerGrid over every district centroid, built once per process."""
+    return PowerGrid(read_table(CENTROIDS_PATH))
+
+
+if __name__ == "__main__":
+    coord_df = read_table(CENTROIDS_PATH)
+    for state in ("Madhya Pradesh", None):
+        report = PowerGrid(coord_df[coord_df['State'] == state] if state else coord_df).dedup_report()
+        print(f"{state or 'All states'}: {report['districts']} districts in {report['cells']} cells, "
+              f"{report['calls_removed']} requests removed per date range")
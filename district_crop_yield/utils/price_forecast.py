@@ -0,0 +1,166 @@
+import os
+import json
+import hashlib
+import threading
+
+import pandas as pd
+
+from utils.data_cache import read_table
+from models.forest_store import load_price_model
+from models.April_Pre_Season_Prediction import APRIL_MODEL_PATH, load_april_schema, encode_features
+
+current_dir = os.path.dirname(__file__)
+FORECAST_CACHE_DIR = os.path.join(current_dir, "../models/.forecast_cache")
+
+ALL = "*"
+
+
+def _file_signature(path: str) -> str:
+    st = os.stat(path)
+    return f"{os.path.basename(path)}:{st.st_size}:{st.st_mtime_ns}"
+
+
+def load_midseason_frame(path: str):
+    """
+    Read preprocessed_all_combined_novtofeb.xlsx.
+
+    Returns:
+        tuple: (features, keys) where features has the integer column labels the
+               mid-season forest was fitted with and keys holds Market/Season per row.
+    """
+    df = read_table(path)
+    features = df.iloc[:, 1:]
+    features.columns = range(1, features.shape[1] + 1)
+    keys = pd.DataFrame({'Market': df.iloc[:, 0], 'Season': ALL})
+    return features, keys
+
+
+def load_april_frame(path: str):
+    """
+    Read X_test_April_2025.xlsx (Year, Day and one-hot Market_* columns).
+
+    Rows of the dropped baseline market have no Market_* flag set and only count
+    towards the all-market aggregates.
+    """
+    df = read_table(path)
+    dummies = df.filter(like='Market_')
+    market = dummies.idxmax(axis=1).str.replace('Market_', '', regex=False)
+    market = market.where(dummies.to_numpy().any(axis=1), None)
+    keys = pd.DataFrame({'Market': market, 'Season': df['Year'].astype(str)})
+    return df, keys
+
+
+def load_april_frame_encoded(path: str, model_path: str = APRIL_MODEL_PATH):
+    """
+    Read X_test_April_2025.xlsx and encode it with the column schema saved next to the
+    April model (see models/April_Pre_Season_Prediction.py), instead of feeding the
+    pre-built dummies to the forest.
+
+    Rows without a Market_* flag belong to the dummies' dropped baseline, the first
+    market in sorted order, which is also the schema's first market.
+    """
+    df, keys = load_april_frame(path)
+    schema = load_april_schema(model_path)
+    raw = pd.DataFrame({'Market': keys['Market'].fillna(schema['markets'][0]),
+                        'Year': df['Year'], 'Day': df['Day']})
+    return encode_features(raw, schema), keys
+
+
+class PriceForecastService:
+    """
+    Computes price forecasts once per model/data version and serves them from a dict.
+
+    Forecasts are averaged per (crop, market, season) plus all-market and all-season
+    aggregates, persisted next to the models, and recomputed only when the model file
+    or the input file changes on disk.
+    """
+
+    def __init__(self, name, model_path, data_path, load_frame, crop="Wheat",
+                 load_model=load_price_model, cache_dir=FORECAST_CACHE_DIR):
+        self.name = name
+        self.model_path = model_path
+        self.data_path = data_path
+        self.load_frame = load_frame
+        self.load_model = load_model
+        self.crop = crop
+        self.cache_path = os.path.join(cache_dir, f"{name}.json")
+        self._lock = threading.Lock()
+        self._version = None
+        self._forecasts = {}
+
+    def _current_version(self) -> str:
+        signature = "|".join(_file_signature(p) for p in (self.model_path, self.data_path))
+        return hashlib.sha1(signature.encode()).hexdigest()
+
+    def _compute(self) -> dict:
+        print(f"Computing {self.name} price forecasts")
+        model = self.load_model(self.model_path)
+        features, keys = self.load_frame(self.data_path)
+        preds = pd.Series(model.predict(features), index=keys.index)
+        markets = keys['Market'].map(lambda m: m.strip().title() if isinstance(m, str) else None)
+
+        forecasts = {(self.crop, ALL, ALL): float(preds.mean())}
+        for season, group in preds.groupby(keys['Season']):
+            forecasts[(self.crop, ALL, season)] = float(group.mean())
+        for market, group in preds.groupby(markets):
+            forecasts[(self.crop, market, ALL)] = float(group.mean())
+        for (market, season), group in preds.groupby([markets, keys['Season']]):
+            forecasts[(self.crop, market, season)] = float(group.mean())
+        return forecasts
+
+    def _load_persisted(self, version: str):
+        if not os.path.exists(self.cache_path):
+            return None
+        try:
+            with open(self.cache_path, "r", encoding="utf-8") as f:
+                cached = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return None
+        if cached.get("version") != version:
+            return None
+        return {tuple(k.split("|")): v for k, v in cached["forecasts"].items()}
+
+    def _persist(self, version: str, forecasts: dict):
+        os.makedirs(os.path.dirname(self.cache_path), exist_ok=True)
+        # Unique per worker process and thread: several workers may compute the same version
+        tmp_path = f"{self.cache_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"version": version,
+                       "forecasts": {"|".join(k): v for k, v in forecasts.items()}}, f)
+        os.replace(tmp_path, self.cache_path)
+
+    def _ensure_fresh(self):
+        version = self._current_version()
+        if version == self._version:
+            return
+        with self._lock:
+            if version == self._version:
+                return
+            forecasts = self._load_persisted(version)
+            if forecasts is None:
+                forecasts = self._compute()
+                self._persist(version, forecasts)
+            self._forecasts = forecasts
+            self._version = version
+
+    def lookup(self, region=ALL, season=ALL, crop=None) -> float:
+        """
+        Forecast price for a market (or district with a mandi of the same name) and season.
+
+        Falls back to the all-market forecast for the season, then to the overall
+        forecast, which is the mean over every row of the input frame.
+        """
+        self._ensure_fresh()
+        crop = crop or self.crop
+        region = str(region).strip().title() if region not in (None, ALL) else ALL
+        season = str(season) if season is not None else ALL
+
+        for key in ((crop, region, season), (crop, region, ALL), (crop, ALL, season), (crop, ALL, ALL)):
+            if key in self._forecasts:
+                return self._forecasts[key]
+        return self._forecasts[(self.crop, ALL, ALL)]
+
+    def forecasts(self) -> dict:
+        """All forecasts keyed by (crop, market, season)."""
+        self._ensure_fresh()
+        return dict(self._forecasts)
@@ -0,0 +1,298 @@
+"""
+raster_indices.py
+
+Offline NDVI/EVI/NDWI from local Sentinel-2 L2A tiles, mirroring utils/calIndx.py
+without Earth Engine.
+
+Tiles live under LOCAL_TILES_DIR (S2_TILES_DIR env var), all on one pixel grid:
+
+    s2_tiles/
+        districts.npy | districts.tif    int label raster, 0 = outside every district
+        districts.json                   {"1": "Anuppur", "2": "Ashoknagar", ...}
+        grid.json                        optional {"scale": 10}
+        scenes/<YYYYMMDD>[_suffix]/
+            B2, B4, B8, B11, MSK_CLDPRB  .npy (memory-mapped) or .tif (windowed reads)
+            metadata.json                optional {"CLOUDY_PIXEL_PERCENTAGE": 12.3}
+
+Each Rabi season follows calIndx: scenes from Nov 1 up to (not including) Feb 28,
+scenes with CLOUDY_PIXEL_PERCENTAGE >= 20 skipped, pixels with MSK_CLDPRB >= 20
+masked, the add_indices formulas on the raw reflectances, a per-pixel mean over the
+season and then a per-district mean of those pixels. Pixels where an index is not
+finite (e.g. a zero denominator) are treated as masked. B3 is selected but unused by
+add_indices, so it is not read.
+
+Only the bounding window of the requested district is read, and all districts of a
+window are reduced together with one bincount per index.
+"""
+
+import os
+import sys
+import json
+import datetime
+from functools import lru_cache
+
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__),  '..')))
+from utils.index_resolution import choose_scale, resolve_scale
+
+current_dir = os.path.dirname(__file__)
+LOCAL_TILES_DIR = os.getenv("S2_TILES_DIR", os.path.join(current_dir, "../data/s2_tiles"))
+
+SCENE_BANDS = ['B2', 'B4', 'B8', 'B11']
+CLOUD_BAND = 'MSK_CLDPRB'
+CLOUD_PROB_MAX = 20
+SCENE_CLOUD_MAX = 20
+INDEX_BANDS = ['NDVI', 'EVI', 'NDWI']
+
+
+# ---------------------------
+# Band reading
+# ---------------------------
+def _band_path(folder: str, name: str) -> str:
+    for ext in (".npy", ".tif", ".tiff"):
+        path = os.path.join(folder, name + ext)
+        if os.path.exists(path):
+            return path
+    raise FileNotFoundError(f"No {name}.npy or {name}.tif in '{folder}'")
+
+
+def read_band(path: str, window=None) -> np.ndarray:
+    """
+    Read one band, or only `window` = (row_slice, col_slice) of it.
+
+    .npy files are memory-mapped so a window only touches its own pages; GeoTIFFs are
+    read with a rasterio window, and their nodata pixels come back as NaN.
+    """
+    if path.endswith(".npy"):
+        band = np.load(path, mmap_mode="r")
+        return band if window is None else band[window]
+
+    import rasterio
+    from rasterio.windows import Window
+    with rasterio.open(path) as src:
+        if window is None:
+            band = src.read(1)
+        else:
+            band = src.read(1, window=Window.from_slices(*window))
+        if src.nodata is not None:
+            band = np.where(band == src.nodata, np.nan, band.astype(np.float64))
+        return band
+
+
+class TileStore:
+    def __init__(self, root: str = LOCAL_TILES_DIR):
+        self.root = root
+        self.labels = read_band(_band_path(root, "districts"))
+        if not np.issubdtype(self.labels.dtype, np.integer):
+            self.labels = np.nan_to_num(self.labels).astype(np.int32)
+        with open(os.path.join(root, "districts.json"), "r", encoding="utf-8") as f:
+            self.names = {int(k): v for k, v in json.load(f).items()}
+        self.ids = {name: k for k, name in self.names.items()}
+
+        grid_path = os.path.join(root, "grid.json")
+        self.native_scale = 10
+        if os.path.exists(grid_path):
+            with open(grid_path, "r", encoding="utf-8") as f:
+                self.native_scale = json.load(f).get("scale", 10)
+
+        self.scenes = []
+        scenes_dir = os.path.join(root, "scenes")
+        for name in sorted(os.listdir(scenes_dir)):
+            folder = os.path.join(scenes_dir, name)
+            if os.path.isdir(folder):
+                self.scenes.append((datetime.datetime.strptime(name[:8], "%Y%m%d").date(), folder))
+        self._windows = {}
+
+    def scenes_between(self, start: datetime.date, end: datetime.date) -> list:
+        """(date, folder) of scenes with start <= date < end, as calIndx filters them."""
+        selected = []
+        for date, folder in self.scenes:
+            if not start <= date < end:
+                continue
+            meta_path = os.path.join(folder, "metadata.json")
+            if os.path.exists(meta_path):
+                with open(meta_path, "r", encoding="utf-8") as f:
+                    if json.load(f).get("CLOUDY_PIXEL_PERCENTAGE", 0) >= SCENE_CLOUD_MAX:
+                        continue
+            selected.append((date, folder))
+        return selected
+
+    def season_scenes(self, year: int) -> list:
+        """Scene folders for the Rabi season starting in `year`."""
+        return [folder for _, folder in self.scenes_between(datetime.date(year, 11, 1), datetime.date(year + 1, 2, 28))]
+
+    def district_window(self, district: str) -> tuple:
+        """(row_slice, col_slice) bounding the district's pixels, computed once."""
+        if district not in self._windows:
+            if district not in self.ids:
+                raise KeyError(f"District '{district}' is not in {self.root}/districts.json")
+            inside = self.labels == self.ids[district]
+            rows = np.flatnonzero(inside.any(axis=1))
+            cols = np.flatnonzero(inside.any(axis=0))
+            if not len(rows):
+                raise KeyError(f"District '{district}' has no pixels in the label raster")
+            self._windows[district] = (slice(rows[0], rows[-1] + 1), slice(cols[0], cols[-1] + 1))
+        return self._windows[district]
+
+    def district_area_km2(self, district: str) -> float:
+        window = self.district_window(district)
+        return float((self.labels[window] == self.ids[district]).sum()) * self.native_scale ** 2 / 1e6
+
+
+@lru_cache(maxsize=4)
+def get_tile_store(root: str = LOCAL_TILES_DIR) -> TileStore:
+    return TileStore(root)
+
+
+# ---------------------------
+# Index computation
+# ---------------------------
+def add_indices(b2, b4, b8, b11) -> np.ndarray:
+    """NDVI, EVI, NDWI stacked on axis 0, with the operation order of calIndx.add_indices."""
+    with np.errstate(divide='ignore', invalid='ignore'):
+        ndvi = (b8 - b4) / (b8 + b4)
+        evi = (b8 - b4) * 2.5 / (b8 + b4 * 6 - b2 * 7.5 + 1)
+        ndwi = (b8 - b11) / (b8 + b11)
+    return np.stack([ndvi, evi, ndwi])
+
+
+def seasonal_pixel_means(scene_folders, window) -> np.ndarray:
+    """
+    Per-pixel season means of the three indices over `window`, NaN where a pixel was
+    never clear.
+
+    Returns:
+        np.ndarray: (3, rows, cols) float64.
+    """
+    sums = counts = None
+    for folder in scene_folders:
+        clear = read_band(_band_path(folder, CLOUD_BAND), window) < CLOUD_PROB_MAX
+        bands = [np.asarray(read_band(_band_path(folder, b), window), dtype=np.float64) for b in SCENE_BANDS]
+        indices = add_indices(*bands)
+        valid = clear & np.isfinite(indices)
+        if sums is None:
+            sums = np.zeros(indices.shape)
+            counts = np.zeros(indices.shape, dtype=np.int32)
+        sums += np.where(valid, indices, 0.0)
+        counts += valid
+
+    if sums is None:
+        raise ValueError("No scenes in the requested season")
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(counts > 0, sums / counts, np.nan)
+
+
+def _coarsen(means: np.ndarray, labels: np.ndarray, factor: int) -> tuple:
+    """Block-average pixel means to `factor`× the native pixel, labelling each block by its centre."""
+    h, w = labels.shape[0] // factor * factor, labels.shape[1] // factor * factor
+    blocks = means[:, :h, :w].reshape(means.shape[0], h // factor, factor, w // factor, factor)
+    valid = np.isfinite(blocks)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        coarse = np.where(valid, blocks, 0.0).sum(axis=(2, 4)) / valid.sum(axis=(2, 4))
+    return coarse, labels[factor // 2:h:factor, factor // 2:w:factor]
+
+
+def district_means(pixel_means: np.ndarray, labels: np.ndarray, n_labels: int) -> np.ndarray:
+    """
+    Mean of each index over every label in one pass.
+
+    Returns:
+        np.ndarray: (3, n_labels) float64, NaN for labels without a valid pixel.
+    """
+    out = np.full((pixel_means.shape[0], n_labels), np.nan)
+    for k, band in enumerate(pixel_means):
+        valid = np.isfinite(band) & (labels > 0)
+        ids = labels[valid]
+        counts = np.bincount(ids, minlength=n_labels)[:n_labels]
+        sums = np.bincount(ids, weights=band[valid], minlength=n_labels)[:n_labels]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            out[k] = np.where(counts > 0, sums / counts, np.nan)
+    return out
+
+
+def _index_means(store: TileStore, scene_folders, window, scale: int) -> tuple:
+    labels = np.asarray(store.labels[window])
+    means = seasonal_pixel_means(scene_folders, window)
+    factor = max(1, int(round(scale / store.native_scale)))
+    if factor > 1:
+        means, labels = _coarsen(means, labels, factor)
+    return district_means(means, labels, max(store.names) + 1), factor * store.native_scale
+
+
+def _as_float(value):
+    return None if np.isnan(value) else float(value)
+
+
+def calculate_indices_data_local(year, district, scale=None, tiles_dir: str = LOCAL_TILES_DIR) -> dict:
+    """
+    Local counterpart of calIndx.calculate_indices_data, with the same record shape.
+
+    Args:
+        year (int): Season start year (Nov `year` – Feb `year + 1`).
+        district (str): District name as in districts.json.
+        scale: Metres, or "auto" to choose from the district area (default: INDEX_SCALE).
+        tiles_dir (str): Tile store root.
+
+    Returns:
+        dict: year, district, scale, ndvi, evi, ndwi (None where no clear pixel).
+    """
+    store = get_tile_store(tiles_dir)
+    window = store.district_window(district)
+    scale = resolve_scale(scale)
+    if scale == "auto":
+        scale = choose_scale(store.district_area_km2(district))
+
+    means, used_scale = _index_means(store, store.season_scenes(year), window, scale)
+    ndvi, evi, ndwi = means[:, store.ids[district]]
+    return {
+        "year": year,
+        "district": district,
+        "scale": used_scale,
+        "ndvi": _as_float(ndvi),
+        "evi": _as_float(evi),
+        "ndwi": _as_float(ndwi),
+    }
+
+
+def all_district_indices(years, scale: int = 10, tiles_dir: str = LOCAL_TILES_DIR):
+    """
+    Every district and season from full-extent reads, in the layout of
+    mp_all_district_indicies.csv (year, NDVI, EVI, NDWI, district).
+    """
+    import pandas as pd
+
+    store = get_tile_store(tiles_dir)
+    full = (slice(None), slice(None))
+    rows = []
+    for year in years:
+        means, _ = _index_means(store, store.season_scenes(year), full, scale)
+        for label, name in store.names.items():
+            rows.append({"year": year, **dict(zip(INDEX_BANDS, means[:, label])), "district": name})
+    return pd.DataFrame(rows)
+
+
+def indices_between_local(district, start: datetime.date, end: datetime.date, scale=None,
+                          tiles_dir: str = LOCAL_TILES_DIR) -> dict:
+    """
+    The season composite of calculate_indices_data_local over the scenes with
+    start <= date < end only, which utils/season_state.py uses for the season so far.
+
+    Returns:
+        dict: through (last scene date or None), scenes, scale, ndvi, evi, ndwi
+              (None where no clear pixel).
+    """
+    store = get_tile_store(tiles_dir)
+    window = store.district_window(district)
+    scale = resolve_scale(scale)
+    if scale == "auto":
+        scale = choose_scale(store.district_area_km2(district))
+
+    scenes = store.scenes_between(start, end)
+    result = {"through": scenes[-1][0].isoformat() if scenes else None, "scenes": len(scenes),
+              "scale": None, "ndvi": None, "evi": None, "ndwi": None}
+    if scenes:
+        means, result["scale"] = _index_means(store, [folder for _, folder in scenes], window, scale)
+        ndvi, evi, ndwi = means[:, store.ids[district]]
+        result.update(ndvi=_as_float(ndvi), evi=_as_float(evi), ndwi=_as_float(ndwi))
+    return result
@@ -1,16 +1,31 @@
-import pandas as pd
 import os
-import joblib
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__),  '..')))
+from utils.data_cache import read_table
+from utils.price_forecast import PriceForecastService, load_april_frame, load_april_frame_encoded
+from models.April_Pre_Season_Prediction import APRIL_MODEL_PATH, LEGACY_APRIL_MODEL_PATH, has_april_model
 
 current_dir = os.path.dirname(__file__) 
 all_crops_all_districts_path = os.path.join(current_dir, "../data/all_crops_all_districts.csv")
-df = pd.read_csv(all_crops_all_districts_path)
+df = read_table(all_crops_all_districts_path)
 
-price_path = os.path.join(current_dir, "../models/rf_april.pkl")
 price_df_path = os.path.join(current_dir, "../data/X_test_April_2025.xlsx")
 
-price_model = joblib.load(price_path)
-price_df = pd.read_excel(price_df_path)
+# rf_april_fast.pkl and its schema come from april_forecast_pipeline_fast(model_path=...).
+# Until they exist, serve the legacy rf_april.pkl on the file's own get_dummies columns.
+if has_april_model(APRIL_MODEL_PATH):
+    april_model_path, april_load_frame = APRIL_MODEL_PATH, load_april_frame_encoded
+else:
+    print(f"❌ {os.path.basename(APRIL_MODEL_PATH)} or its schema is missing, serving {os.path.basename(LEGACY_APRIL_MODEL_PATH)}")
+    april_model_path, april_load_frame = LEGACY_APRIL_MODEL_PATH, load_april_frame
+
+april_prices = PriceForecastService(
+    "april",
+    model_path=april_model_path,
+    data_path=price_df_path,
+    load_frame=april_load_frame,
+)
 
 df['Year'] = df['Year'].str.split('-').str[0].astype(int)
 def revenueProjection_early(area, pred_Yield, pred_price):        
@@ -91,7 +106,8 @@ def preSeasonCalc(**kwargs):
         return {"error": "Yield prediction not available for the given parameters hello."}
 
     # pred_price = 2000  # Placeholder for predicted price per unit of yield
-    pred_price = price_model.predict(price_df)
+    # April harvest price of the season sown in November of `year`
+    pred_price = april_prices.lookup(region=district, season=year + 1)
 
     return pred_Yield, pred_price
 
@@ -0,0 +1,196 @@
+"""
+replay.py
+
+Record/replay layer for the external services (NASA POWER, Earth Engine, Serper,
+Gemini, Google Translate), so the app can be load-tested and benchmarked offline.
+
+SERVICE_MODE selects the behaviour of every wrapped call:
+    live     call the service (default)
+    record   call the service and save request, response and elapsed time as a
+             fixture under SERVICE_FIXTURES_DIR/<service>/<request hash>.json
+    replay   return the saved response without touching the network, after an
+             injected delay
+
+SERVICE_MODES overrides it per service, e.g. "power=live,gemini=record". When
+POWER_BASE_URL is set (pointing POWER at utils/standin_server.py) and SERVICE_MODES
+does not name power, power stays live under SERVICE_MODE=replay, so its requests
+really go over HTTP to the stand-in.
+
+REPLAY_LATENCY controls the delay: "recorded" (default) sleeps for the elapsed time
+stored with each fixture, "none" disables it, and "power=800,gemini=1500" sets fixed
+milliseconds per service (others stay recorded).
+
+REPLAY_MISS decides what an unrecorded request gets in replay mode: "strict" (default)
+raises ReplayMiss; "any" serves a recorded response of the same service, picked
+deterministically from the request hash, which keeps load tests with varied inputs
+(or growing chat history in LLM prompts) running.
+
+utils/standin_server.py serves the same fixtures over HTTP for clients that should
+exercise a real network stack.
+"""
+
+import os
+import json
+import time
+import hashlib
+import threading
+from functools import wraps
+
+current_dir = os.path.dirname(__file__)
+SERVICE_MODE = os.getenv("SERVICE_MODE", "live").lower()
+FIXTURES_DIR = os.getenv("SERVICE_FIXTURES_DIR", os.path.join(current_dir, "../data/fixtures"))
+REPLAY_LATENCY = os.getenv("REPLAY_LATENCY", "recorded")
+REPLAY_MISS = os.getenv("REPLAY_MISS", "strict")
+MODES = ("live", "record", "replay")
+
+
+class ReplayMiss(KeyError):
+    """No fixture is recorded for a request in replay mode."""
+
+    def __init__(self, service: str, request):
+        super().__init__(service, request)
+        self.service = service
+        self.request = request
+
+    def __str__(self):
+        return f"No {self.service} fixture recorded for {json.dumps(self.request, default=str)[:200]}"
+
+
+def _parse_latency(setting: str) -> dict:
+    if setting in ("recorded", "none"):
+        return {}
+    latency = {}
+    for item in filter(None, setting.split(",")):
+        service, ms = item.split("=")
+        latency[service.strip()] = float(ms) / 1000
+    return latency
+
+
+class FixtureStore:
+    def __init__(self, root: str = FIXTURES_DIR):
+        self.root = root
+        self._cache = {}
+        self._listing = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(request) -> str:
+        return hashlib.sha1(json.dumps(request, sort_keys=True, default=str).encode()).hexdigest()[:20]
+
+    def path(self, service: str, key: str) -> str:
+        return os.path.join(self.root, service, f"{key}.json")
+
+    def save(self, service: str, request, response, elapsed_s: float):
+        path = self.path(service, self.key(request))
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fixture = {"service": service, "request": request, "response": response, "elapsed_s": elapsed_s}
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(fixture, f, ensure_ascii=False, default=str)
+        os.replace(tmp_path, path)
+        with self._lock:
+            self._cache[path] = fixture
+            self._listing.pop(service, None)
+
+    def _read(self, path: str):
+        if path not in self._cache:
+            if not os.path.exists(path):
+                return None
+            with open(path, "r", encoding="utf-8") as f:
+                fixture = json.load(f)
+            with self._lock:
+                self._cache[path] = fixture
+        return self._cache[path]
+
+    def load(self, service: str, request):
+        return self._read(self.path(service, self.key(request)))
+
+    def any_for(self, service: str, request):
+        """A deterministic stand-in fixture of `service` for an unrecorded request."""
+        if service not in self._listing:
+            folder = os.path.join(self.root, service)
+            names = sorted(f for f in os.listdir(folder) if f.endswith(".json")) if os.path.isdir(folder) else []
+            self._listing[service] = names
+        names = self._listing[service]
+        if not names:
+            return None
+        return self._read(os.path.join(self.root, service, names[int(self.key(request), 16) % len(names)]))
+
+
+def _parse_modes(setting: str) -> dict:
+    modes = {}
+    for item in filter(None, setting.split(",")):
+        service, mode = item.split("=")
+        mode = mode.strip().lower()
+        if mode not in MODES:
+            raise ValueError(f"Unknown mode '{mode}' for {service.strip()}; expected one of {MODES}")
+        modes[service.strip()] = mode
+    return modes
+
+
+store = FixtureStore()
+_fixed_latency = _parse_latency(REPLAY_LATENCY)
+_service_modes = _parse_modes(os.getenv("SERVICE_MODES", ""))
+if os.getenv("POWER_BASE_URL") and SERVICE_MODE == "replay":
+    _service_modes.setdefault("power", "live")
+
+
+def service_mode(service: str) -> str:
+    return _service_modes.get(service, SERVICE_MODE)
+
+
+def replay_latency(service: str, fixture: dict) -> float:
+    if REPLAY_LATENCY == "none":
+        return 0.0
+    return _fixed_latency.get(service, fixture.get("elapsed_s", 0.0))
+
+
+def lookup(service: str, request):
+    """Fixture for `request` under the REPLAY_MISS policy; raises ReplayMiss if none."""
+    fixture = store.load(service, request)
+    if fixture is None and REPLAY_MISS == "any":
+        fixture = store.any_for(service, request)
+    if fixture is None:
+        raise ReplayMiss(service, request)
+    return fixture
+
+
+def call(service: str, request, live_fn):
+    """
+    Run one external call under SERVICE_MODE.
+
+    Args:
+        service (str): Fixture namespace, e.g. "power" or "gemini".
+        request: JSON-serialisable description of the call; its hash is the fixture key.
+        live_fn: Zero-argument function making the real call; its result must be JSON-serialisable.
+    """
+    mode = service_mode(service)
+    if mode == "live":
+        return live_fn()
+    if mode == "record":
+        start = time.perf_counter()
+        response = live_fn()
+        store.save(service, request, response, time.perf_counter() - start)
+        return response
+
+    fixture = lookup(service, request)
+    time.sleep(replay_latency(service, fixture))
+    return fixture["response"]
+
+
+def replayable(service: str, request_fn=None):
+    """
+    Decorator routing a function through call().
+
+    Args:
+        service (str): Fixture namespace.
+        request_fn: Builds the request description from the call's arguments
+                    (default: the positional and keyword arguments themselves).
+    """
+    def decorator(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            request = request_fn(*args, **kwargs) if request_fn else {"args": args, "kwargs": kwargs}
+            return call(service, request, lambda: fn(*args, **kwargs))
+        return wrapper
+    return decorator
@@ -0,0 +1,306 @@
+"""
+season_state.py
+
+To-date Rabi season features for mid-season predictions.
+
+Instead of downloading and re-aggregating the whole Nov 1 – Feb 28 window on every
+request, each (district, season) keeps a small accumulator state:
+
+    weather   running sums and valid-day counts of every POWER variable, through the
+              last day POWER has published for all variables
+    indices   the NDVI/EVI/NDWI season composite of every scene from Nov 1 up to
+              INDEX_LAG_DAYS ago
+
+A weather refresh only fetches the days after the stored `through` date and folds
+them in. The index composite averages per-pixel means, which do not add up across
+windows, so it is recomputed over the whole window so far, server-side in one Earth
+Engine request, whenever the window grows. Once a day's refresh has run, a
+prediction is a dict lookup. States are kept in
+memory and persisted as JSON under SEASON_STATE_DIR; a state is refreshed at most
+once per calendar day, and a finished season is never fetched again.
+
+The weather features equal calcWeather's full-window aggregates once the season is
+complete, and the index features use calIndx's composite definition, the one the
+training data was built with.
+
+Early in the season a state can hold no POWER day or no scene yet; until every
+variable has at least one observation, to_date_features falls back to the
+full-window calcWeather / calIndx aggregates instead of returning empty means.
+
+If POWER or Earth Engine fails during a refresh, the last saved state keeps being
+served and the refresh is retried on the next request.
+
+Usage:
+    python season_state.py refresh [--year 2025] [--districts Bhopal Sehore]
+"""
+
+import os
+import sys
+import json
+import argparse
+import datetime
+import threading
+
+import requests
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__),  '..')))
+from utils.gazetteer import get_gazetteer, normalize_name
+from utils.replay import ReplayMiss
+from utils.calcWeather import fetch_power_point, calculate_weather_data, WEATHER_PARAMS
+from utils.calIndx import calculate_indices_between, calculate_indices_data
+
+current_dir = os.path.dirname(__file__)
+SEASON_STATE_DIR = os.getenv("SEASON_STATE_DIR", os.path.join(current_dir, "../data/.season_state"))
+
+POWER_FILL = -999.0      # NASA POWER's value for days not yet published
+INDEX_LAG_DAYS = 5       # scenes can reach the archive a few days after acquisition
+INDEX_BANDS = ['NDVI', 'EVI', 'NDWI']
+
+_states = {}
+_locks = {}
+_locks_guard = threading.Lock()
+
+
+def season_bounds(year: int) -> tuple:
+    """First and last day of the Rabi season starting in `year` (Nov 1 – Feb 28)."""
+    return datetime.date(year, 11, 1), datetime.date(year + 1, 2, 28)
+
+
+def is_in_progress(year: int, today: datetime.date = None) -> bool:
+    start, end = season_bounds(year)
+    return start <= (today or datetime.date.today()) <= end
+
+
+def _empty_state(district: str, year: int) -> dict:
+    return {
+        "district": district,
+        "year": year,
+        "refreshed": None,
+        "weather": {"through": None, "sums": {p: 0.0 for p in WEATHER_PARAMS}, "counts": {p: 0 for p in WEATHER_PARAMS}},
+        "indices": {"through": None, "last_scene": None, "scenes": 0, "means": {b: None for b in INDEX_BANDS}},
+    }
+
+
+def _state_path(district: str, year: int) -> str:
+    return os.path.join(SEASON_STATE_DIR, f"{normalize_name(district)}_{year}.json")
+
+
+def load_state(district: str, year: int) -> dict:
+    key = (district, year)
+    if key not in _states:
+        path = _state_path(district, year)
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                _states[key] = json.load(f)
+            if "means" not in _states[key]["indices"]:
+                # Saved by the pixel-observation version; recompute the composite
+                _states[key]["indices"] = _empty_state(district, year)["indices"]
+        else:
+            _states[key] = _empty_state(district, year)
+    return _states[key]
+
+
+def save_state(state: dict):
+    os.makedirs(SEASON_STATE_DIR, exist_ok=True)
+    path = _state_path(state["district"], state["year"])
+    tmp_path = f"{path}.{threading.get_ident()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(state, f, indent=1)
+    os.replace(tmp_path, path)
+
+
+def _next_day(through, default: datetime.date) -> datetime.date:
+    return datetime.date.fromisoformat(through) + datetime.timedelta(days=1) if through else default
+
+
+# ---------------------------
+# Folding new days
+# ---------------------------
+def fold_weather(acc: dict, parameters: dict) -> bool:
+    """
+    Fold a POWER 'parameter' block ({variable: {YYYYMMDD: value}}) into `acc`.
+
+    Only days up to the last one published for every variable are folded; later
+    days are left for the next refresh to fetch again.
+
+    Returns:
+        bool: Whether `through` advanced.
+    """
+    days = sorted(set.intersection(*(set(parameters.get(p, {})) for p in WEATHER_PARAMS)))
+    complete = [d for d in days if all(parameters[p][d] != POWER_FILL for p in WEATHER_PARAMS)]
+    if not complete:
+        return False
+    last = complete[-1]
+    for p in WEATHER_PARAMS:
+        for d in days:
+            value = parameters[p][d]
+            if d <= last and value != POWER_FILL:
+                acc["sums"][p] += value
+                acc["counts"][p] += 1
+    acc["through"] = datetime.datetime.strptime(last, "%Y%m%d").date().isoformat()
+    return True
+
+
+def set_indices(acc: dict, composite: dict, until: datetime.date) -> bool:
+    """Replace `acc` with the composite of the scenes before `until`."""
+    acc["means"] = {b: composite[b.lower()] for b in INDEX_BANDS}
+    acc["scenes"] = composite["scenes"]
+    acc["last_scene"] = composite["through"]
+    acc["through"] = (until - datetime.timedelta(days=1)).isoformat()
+    return True
+
+
+def refresh(district: str, year: int, today: datetime.date = None) -> dict:
+    """
+    Bring the season state of `district` up to `today`, fetching only the days after
+    what it already holds. A failed POWER or Earth Engine request leaves that half as
+    it was, and the state is not marked refreshed so the next call tries again.
+
+    Returns:
+        dict: The refreshed state.
+    """
+    today = today or datetime.date.today()
+    season_start, season_end = season_bounds(year)
+    with _locks_guard:
+        lock = _locks.setdefault((district, year), threading.Lock())
+    with lock:
+        state = load_state(district, year)
+        if state["refreshed"] == today.isoformat():
+            return state
+
+        changed = failed = False
+        weather = state["weather"]
+        start = _next_day(weather["through"], season_start)
+        end = min(today, season_end)
+        if start <= end:
+            lat, lon = get_gazetteer().coordinates(district)
+            try:
+                data = fetch_power_point(lat, lon, start.strftime("%Y%m%d"), end.strftime("%Y%m%d"))
+                changed |= fold_weather(weather, data["properties"]["parameter"])
+            except ReplayMiss:
+                raise
+            except (requests.exceptions.RequestException, KeyError) as e:
+                print(f"❌ POWER refresh failed for {district} {year}, serving the saved weather: {e}")
+                failed = True
+
+        indices = state["indices"]
+        # calIndx's season window ends before Feb 28
+        until = min(today - datetime.timedelta(days=INDEX_LAG_DAYS - 1), season_end)
+        if _next_day(indices["through"], season_start) < until:
+            try:
+                composite = calculate_indices_between(district, season_start, until)
+                changed |= set_indices(indices, composite, until)
+            except ReplayMiss:
+                raise
+            except Exception as e:
+                # ee.EEException, or HTTP errors underneath it; ee is not always imported
+                print(f"❌ Earth Engine refresh failed for {district} {year}, serving the saved indices: {e}")
+                failed = True
+
+        if not failed:
+            state["refreshed"] = today.isoformat()
+        if changed:
+            save_state(state)
+        return state
+
+
+# ---------------------------
+# Features
+# ---------------------------
+def _mean(acc: dict, name: str):
+    return acc["sums"][name] / acc["counts"][name] if acc["counts"][name] else None
+
+
+def weather_features(state: dict) -> dict:
+    """The to-date counterpart of calcWeather.calculate_weather_data."""
+    weather = state["weather"]
+    return {
+        "year": state["year"],
+        "district": state["district"],
+        "through": weather["through"],
+        "avg_temp": _mean(weather, "T2M"),
+        "avg_max_temp": _mean(weather, "T2M_MAX"),
+        "avg_min_temp": _mean(weather, "T2M_MIN"),
+        "total_rainfall": weather["sums"]["PRECTOTCORR"],
+        "avg_solar_radiation": _mean(weather, "ALLSKY_SFC_SW_DWN")
+    }
+
+
+def index_features(state: dict) -> dict:
+    """The to-date counterpart of calIndx.calculate_indices_data."""
+    indices = state["indices"]
+    return {
+        "year": state["year"],
+        "district": state["district"],
+        "through": indices["through"],
+        "ndvi": indices["means"]["NDVI"],
+        "evi": indices["means"]["EVI"],
+        "ndwi": indices["means"]["NDWI"]
+    }
+
+
+def has_observations(acc: dict) -> bool:
+    """Whether every variable of the weather or indices state has a value yet."""
+    if "counts" in acc:
+        return all(acc["counts"].values())
+    return all(v is not None for v in acc["means"].values())
+
+
+def to_date_features(year: int, district: str, today: datetime.date = None) -> tuple:
+    """
+    Weather and index features of the season so far.
+
+    A half with no observation yet for some variable (no POWER day published, or no
+    scene older than INDEX_LAG_DAYS) comes from calculate_weather_data or
+    calculate_indices_data instead, so no feature is left empty.
+
+    Returns:
+        tuple: (weather dict, indices dict), shaped like calculate_weather_data and
+               calculate_indices_data, or (None, None) if the district is unknown.
+               Either dict is None if its fallback fails too.
+    """
+    try:
+        canonical = get_gazetteer().resolve(district).name
+    except KeyError as e:
+        print(f"❌ {e}")
+        return None, None
+    state = refresh(canonical, year, today)
+
+    if has_observations(state["weather"]):
+        weather = weather_features(state)
+    else:
+        print(f"❌ No POWER days yet for {canonical} {year}, using the full-window weather.")
+        weather = calculate_weather_data(year, canonical)
+
+    if has_observations(state["indices"]):
+        indices = index_features(state)
+    else:
+        print(f"❌ No scenes yet for {canonical} {year}, using the full-window indices.")
+        try:
+            indices = calculate_indices_data(year, canonical)
+        except ReplayMiss:
+            raise
+        except Exception as e:
+            print(f"❌ Failed to fetch indices for {canonical}: {e}")
+            indices = None
+    return weather, indices
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Fold the latest days into the to-date season states.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    refresh_p = sub.add_parser("refresh")
+    refresh_p.add_argument("--year", type=int, help="Season start year (default: the current season)")
+    refresh_p.add_argument("--districts", nargs="+")
+    args = parser.parse_args()
+
+    today = datetime.date.today()
+    year = args.year or (today.year if today.month >= 11 else today.year - 1)
+    names = args.districts or sorted(get_gazetteer().records)
+    for name in names:
+        try:
+            state = refresh(get_gazetteer().resolve(name).name, year, today)
+            print(f"✅ {state['district']}: weather through {state['weather']['through']}, "
+                  f"indices through {state['indices']['through']}")
+        except Exception as e:
+            print(f"❌ {name}: {e}")
@@ -0,0 +1,105 @@
+"""
+standin_server.py
+
+Local HTTP stand-in serving recorded fixtures (see utils/replay.py), for load tests
+that should go through a real HTTP client and connection pool rather than the
+in-process replay.
+
+Routes:
+    GET  /api/temporal/daily/point?latitude=..&longitude=..&start=..&end=..
+         NASA POWER daily point API; point POWER_BASE_URL at this server
+    POST /replay/<service>     body: the JSON request description of any fixture
+    GET  /health
+
+Responses are delayed per REPLAY_LATENCY and unrecorded requests follow REPLAY_MISS,
+exactly as in-process replay.
+
+Usage:
+    python standin_server.py [--port 8765] [--fixtures ../data/fixtures]
+    cd ../app && SERVICE_MODE=replay POWER_BASE_URL=http://127.0.0.1:8765 gunicorn -c gunicorn.conf.py
+
+With POWER_BASE_URL set, replay mode keeps POWER live (see SERVICE_MODES in
+utils/replay.py), so the app's POWER requests reach this server over HTTP while the
+other services replay in-process.
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+from urllib.parse import urlparse, parse_qs
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__),  '..')))
+from utils import replay
+from utils.calcWeather import power_request
+
+POWER_PATH = "/api/temporal/daily/point"
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def _send_json(self, status: int, body):
+        payload = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _replay(self, service: str, request):
+        try:
+            fixture = replay.lookup(service, request)
+        except replay.ReplayMiss as e:
+            self._send_json(404, {"error": str(e)})
+            return
+        time.sleep(replay.replay_latency(service, fixture))
+        self._send_json(200, fixture["response"])
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        if url.path == "/health":
+            self._send_json(200, {"status": "ok"})
+        elif url.path == POWER_PATH:
+            query = {k: v[0] for k, v in parse_qs(url.query).items()}
+            try:
+                request = power_request(query["latitude"], query["longitude"], query["start"], query["end"])
+            except KeyError as e:
+                self._send_json(400, {"error": f"missing parameter {e}"})
+                return
+            self._replay("power", request)
+        else:
+            self._send_json(404, {"error": f"unknown path {url.path}"})
+
+    def do_POST(self):
+        url = urlparse(self.path)
+        if not url.path.startswith("/replay/"):
+            self._send_json(404, {"error": f"unknown path {url.path}"})
+            return
+        length = int(self.headers.get("Content-Length", 0))
+        request = json.loads(self.rfile.read(length) or b"null")
+        self._replay(url.path[len("/replay/"):], request)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def serve(host: str = "127.0.0.1", port: int = 8765) -> ThreadingHTTPServer:
+    server = ThreadingHTTPServer((host, port), StandInHandler)
+    server.daemon_threads = True
+    return server
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve recorded service fixtures over HTTP.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--fixtures", default=replay.FIXTURES_DIR)
+    args = parser.parse_args()
+
+    replay.store = replay.FixtureStore(args.fixtures)
+    server = serve(args.host, args.port)
+    print(f"✅ Stand-in serving '{args.fixtures}' on http://{args.host}:{args.port}")
+    server.serve_forever()
@@ -1,10 +1,8 @@
 import numpy as np
-import pandas as pd
 import sys
 import os 
 import torch
 import json
-import joblib
 from huggingface_hub import login
 from deep_translator import GoogleTranslator
 from dotenv import load_dotenv
@@ -12,10 +10,13 @@ from datetime import datetime, date
 from sklearn.preprocessing import StandardScaler, LabelEncoder
 
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__),  '..')))
-from models.crop_yield import YieldNN
+from models.registry import yield_registry
 from utils.calcWeather import calculate_weather_data
 from utils.calIndx import calculate_indices_data
-from models.Mid_season_price_prediction import evaluate_model
+from utils.data_cache import read_table
+from utils.gazetteer import get_gazetteer
+from utils.replay import replayable
+from utils.price_forecast import PriceForecastService, load_midseason_frame
 
 
 env_path = os.path.abspath(os.path.join(os.path.dirname(__file__), "../../.env"))
@@ -25,30 +26,23 @@ load_dotenv(dotenv_path=env_path)
 
 current_dir = os.path.dirname(__file__) 
 district_area_path = os.path.join(current_dir, "../data/all_crops_all_districts.csv")
-scaler_path = os.path.join(current_dir, "../models/scaler.pkl")
-crop_en_path = os.path.join(current_dir, "../models/crop_type_encoder.pkl")
-dist_en_path = os.path.join(current_dir, "../models/district_encoder.pkl")
-weights_path = os.path.join(current_dir, "../models/crop_yield_model_weights.pth")
 price_weight_path = os.path.join(current_dir, "../models/midseason_predictor.pkl")
 price_pred_file_path = os.path.join(current_dir, "../data/preprocessed_all_combined_novtofeb.xlsx")
 
-area_df = pd.read_csv(district_area_path)
 
-scaler = joblib.load(scaler_path)
-crop_le = joblib.load(crop_en_path)
-district_le = joblib.load(dist_en_path)
+area_df = read_table(district_area_path)
 
-label_encoders = {'crop_type': crop_le, 'district': district_le}
+# Yield model, scaler and encoders come from the registry so retrained versions
+# are picked up without restarting the app
+yield_registry.get()
 
-price_model = joblib.load(price_weight_path)
-area_df = pd.read_csv(district_area_path)
-model = YieldNN(input_dim=9)
-model.load_state_dict(torch.load(weights_path))
-model.eval()
-
-price_df = pd.read_excel(price_pred_file_path, header=None)
-price_df = price_df.iloc[1:]
-price_df.drop(price_df.columns[0], axis=1, inplace=True)
+# Mid-season forecasts are computed once per model/data version, not per request
+midseason_prices = PriceForecastService(
+    "midseason",
+    model_path=price_weight_path,
+    data_path=price_pred_file_path,
+    load_frame=load_midseason_frame,
+)
 
 def preprocess_single_sample(input_dict, label_encoders, scaler):
     """
@@ -123,6 +117,11 @@ def calulateArea(district, crop, year):
     Returns:
         float: Area of the farm in the specified district and crop.
     """
+    try:
+        district = get_gazetteer().area_name(district)
+    except KeyError:
+        return None
+
     filtered = area_df[
         (area_df['district'] == district) &
         (area_df['crop_type'] == crop) &
@@ -149,6 +148,7 @@ def calculateYieldPred(weather_df, indices_df, area_district, crop, district):
     Returns:
         float: Predicted yield for the specified crop and district.
     """
+    bundle = yield_registry.get()
     input_data = {
         'T2M': weather_df['avg_temp'],               # Example key names
         'PRECTOTCORR': weather_df['total_rainfall'],
@@ -158,35 +158,31 @@ def calculateYieldPred(weather_df, indices_df, area_district, crop, district):
         'NDWI': indices_df['ndwi'],
         'Area': area_district,
         'crop_type': crop,
-        'district': district
+        'district': get_gazetteer().encoder_class(district, bundle.label_encoders['district'])
     }
 
     print(input_data)
     # Preprocess the single sample using pre-fitted scaler and label encoders
-    # Assume these are loaded globally or elsewhere
-
     preprocessed_sample = preprocess_single_sample(
         input_data, 
-        label_encoders=label_encoders, 
-        scaler=scaler
+        label_encoders=bundle.label_encoders, 
+        scaler=bundle.scaler
     )
 
     # Convert to torch tensor for model prediction
     X_tensor = torch.tensor(preprocessed_sample, dtype=torch.float32).unsqueeze(0)  # shape [1, num_features]
     # Predict crop yield
-    model.eval()
     with torch.no_grad():
-        predicted_yield = model(X_tensor).item()
+        predicted_yield = bundle.model(X_tensor).item()
 
-    # Get the year from the input data
-    predicted_price = evaluate_model(price_model, price_df)
+    predicted_price = midseason_prices.lookup(region=district)
     print(f"Predicted price: {predicted_price} and Predicted yield: {predicted_yield}")
     return predicted_yield, predicted_price
 
 
 def calculatePricePredTool(text: str) -> float:
     print(text)
-    return evaluate_model(price_model, price_df)
+    return midseason_prices.lookup()
 
 
 
@@ -197,6 +193,7 @@ def calculateYieldPred_Tool_structured(year, district, crop, area) -> float:
     weather_df = calculate_weather_data(year, district)
     indices_df = calculate_indices_data(year, district)
 
+    bundle = yield_registry.get()
     input_data = {
         'T2M': weather_df['avg_temp'],
         'PRECTOTCORR': weather_df['total_rainfall'],
@@ -206,21 +203,20 @@ def calculateYieldPred_Tool_structured(year, district, crop, area) -> float:
         'NDWI': indices_df['ndwi'],
         'Area': area,
         'crop_type': crop,
-        'district': district
+        'district': get_gazetteer().encoder_class(district, bundle.label_encoders['district'])
     }
 
     preprocessed_sample = preprocess_single_sample(
         input_data, 
-        label_encoders=label_encoders, 
-        scaler=scaler
+        label_encoders=bundle.label_encoders, 
+        scaler=bundle.scaler
     )
 
     # Convert to torch tensor
     X_tensor = torch.tensor(preprocessed_sample, dtype=torch.float32).unsqueeze(0)
     
-    model.eval()
     with torch.no_grad():
-        predicted_yield = model(X_tensor).item()
+        predicted_yield = bundle.model(X_tensor).item()
 
     print(f"Predicted yield: {predicted_yield}")
     return predicted_yield
@@ -247,6 +243,7 @@ def huggingFaceAuth():
 
 
 
+@replayable("translate", lambda text: {"source": "hi", "target": "en", "text": text})
 def translate_hi_to_en(text: str) -> str:
     """
     Translates Hindi text into English using Google Translator (deep-translator).
@@ -260,6 +257,7 @@ def translate_hi_to_en(text: str) -> str:
     return GoogleTranslator(source="hi", target="en").translate(text)
 
 
+@replayable("translate", lambda text: {"source": "en", "target": "hi", "text": text})
 def translate_en_to_hi(text: str) -> str:
     """
     Translates English text into Hindi using Google Translator (deep-translator).
@@ -0,0 +1,226 @@
+"""
+weather_store.py
+
+Daily weather for every district in one memory-mapped float32 array laid out as
+district × day × variable, so any season window can be aggregated without a new
+NASA POWER download.
+
+Files under STORE_DIR:
+    values.f32   (districts, days, variables) float32, NaN for missing days
+    csum.f64     (districts, days + 1, variables) float64 prefix sums, NaN as 0
+    ccount.i32   (districts, days + 1, variables) int32 prefix counts of valid days
+    meta.json    districts, variables, start date and shape
+
+Sums, means and counts over any window are two prefix-array lookups per district and
+variable; min and max reduce the sliced window. Values are stored as float32, so
+aggregates match the float64 CSV pipeline to about 1e-6 relative.
+
+Usage:
+    python weather_store.py build [--input-dir ../data/mp_weather_data]
+    python weather_store.py query --start 2022-11-01 --end 2023-01-15 --reducer sum --variables PRECTOTCORR
+"""
+
+import os
+import sys
+import json
+import shutil
+import argparse
+import datetime
+import warnings
+from functools import lru_cache
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__),  '..')))
+from createData.rabi_aggregate import read_wide_file, list_weather_files
+from utils.gazetteer import normalize_name
+
+current_dir = os.path.dirname(__file__)
+STORE_DIR = os.path.join(current_dir, "../data/weather_store")
+INPUT_DIR = os.path.join(current_dir, "../data/mp_weather_data")
+
+REDUCERS = ("sum", "mean", "count", "min", "max")
+
+
+def season_window(season: str, year: int) -> tuple:
+    """
+    Inclusive (start, end) dates of a named season.
+
+    'rabi' is Nov `year` – Feb `year + 1` (the months of the Rabi aggregates), 'kharif'
+    is Jun – Oct `year`.
+    """
+    if season == "rabi":
+        return datetime.date(year, 11, 1), datetime.date(year + 1, 3, 1) - datetime.timedelta(days=1)
+    if season == "kharif":
+        return datetime.date(year, 6, 1), datetime.date(year, 10, 31)
+    raise ValueError(f"Unknown season '{season}'")
+
+
+# ---------------------------
+# Build
+# ---------------------------
+def _header_dates(header) -> np.ndarray:
+    return pd.to_datetime(pd.Index(header).astype(float).astype(int).astype(str), format="%Y%m%d").values
+
+
+def build_store(files, store_dir: str = STORE_DIR, workers: int = None) -> dict:
+    """
+    Pack per-district wide weather CSVs into the memory-mapped store.
+
+    Returns:
+        dict: The store's metadata.
+    """
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        parsed = list(pool.map(read_wide_file, files, chunksize=4))
+
+    variables = list(parsed[0][2])
+    dates = {header: _header_dates(header) for _, header, _, _ in parsed}
+    first = min(d.min() for d in dates.values()).astype("datetime64[D]")
+    last = max(d.max() for d in dates.values()).astype("datetime64[D]")
+    n_days = int((last - first).astype(int)) + 1
+
+    districts = [district for district, _, _, _ in parsed]
+    values = np.full((len(districts), n_days, len(variables)), np.nan, dtype=np.float32)
+    for i, (_, header, file_vars, data) in enumerate(parsed):
+        offsets = (dates[header].astype("datetime64[D]") - first).astype(int)
+        rows = [file_vars.index(v) for v in variables]
+        values[i, offsets, :] = data[rows].T
+
+    valid = ~np.isnan(values)
+    csum = np.zeros((len(districts), n_days + 1, len(variables)), dtype=np.float64)
+    np.cumsum(np.where(valid, values, 0), axis=1, dtype=np.float64, out=csum[:, 1:])
+    ccount = np.zeros(csum.shape, dtype=np.int32)
+    np.cumsum(valid, axis=1, dtype=np.int32, out=ccount[:, 1:])
+
+    tmp_dir = f"{store_dir}.tmp"
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    os.makedirs(tmp_dir)
+    values.tofile(os.path.join(tmp_dir, "values.f32"))
+    csum.tofile(os.path.join(tmp_dir, "csum.f64"))
+    ccount.tofile(os.path.join(tmp_dir, "ccount.i32"))
+    meta = {"districts": districts, "variables": variables, "start": str(first),
+            "days": n_days, "shape": list(values.shape)}
+    with open(os.path.join(tmp_dir, "meta.json"), "w", encoding="utf-8") as f:
+        json.dump(meta, f, indent=1)
+
+    shutil.rmtree(store_dir, ignore_errors=True)
+    os.replace(tmp_dir, store_dir)
+    return meta
+
+
+# ---------------------------
+# Query
+# ---------------------------
+class WeatherStore:
+    def __init__(self, store_dir: str = STORE_DIR):
+        with open(os.path.join(store_dir, "meta.json"), "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        shape = tuple(meta["shape"])
+        prefix_shape = (shape[0], shape[1] + 1, shape[2])
+        self.values = np.memmap(os.path.join(store_dir, "values.f32"), dtype=np.float32, mode="r", shape=shape)
+        self.csum = np.memmap(os.path.join(store_dir, "csum.f64"), dtype=np.float64, mode="r", shape=prefix_shape)
+        self.ccount = np.memmap(os.path.join(store_dir, "ccount.i32"), dtype=np.int32, mode="r", shape=prefix_shape)
+
+        self.districts = meta["districts"]
+        self.variables = meta["variables"]
+        self.start = np.datetime64(meta["start"], "D")
+        self.days = meta["days"]
+        self._district_idx = {normalize_name(d): i for i, d in enumerate(self.districts)}
+        self._variable_idx = {v: i for i, v in enumerate(self.variables)}
+
+    def day_offset(self, date) -> int:
+        return int((np.datetime64(date, "D") - self.start).astype(int))
+
+    def indices(self, districts, variables) -> tuple:
+        d_idx = np.arange(len(self.districts)) if districts is None else \
+            np.array([self._district_idx[normalize_name(d)] for d in districts], dtype=int)
+        v_idx = np.arange(len(self.variables)) if variables is None else \
+            np.array([self._variable_idx[v] for v in variables], dtype=int)
+        return d_idx, v_idx
+
+    def aggregate(self, start, end, reducer: str = "mean", districts=None, variables=None) -> np.ndarray:
+        """
+        Reduce every (district, variable) over the inclusive date window [start, end].
+
+        Returns:
+            np.ndarray: (districts, variables) float64; NaN where a window has no data.
+        """
+        if reducer not in REDUCERS:
+            raise ValueError(f"reducer must be one of {REDUCERS}")
+        d_idx, v_idx = self.indices(districts, variables)
+        t0 = max(self.day_offset(start), 0)
+        t1 = min(self.day_offset(end) + 1, self.days)
+        if t1 <= t0:
+            return np.full((len(d_idx), len(v_idx)), np.nan)
+
+        if reducer in ("min", "max"):
+            window = self.values[d_idx, t0:t1][..., v_idx]
+            with warnings.catch_warnings():
+                # all-NaN windows come out as NaN, which is the answer we want
+                warnings.simplefilter("ignore", RuntimeWarning)
+                out = np.nanmin(window, axis=1) if reducer == "min" else np.nanmax(window, axis=1)
+            return out.astype(np.float64)
+
+        sums = self.csum[d_idx, t1][:, v_idx] - self.csum[d_idx, t0][:, v_idx]
+        counts = self.ccount[d_idx, t1][:, v_idx] - self.ccount[d_idx, t0][:, v_idx]
+        if reducer == "count":
+            return counts.astype(np.float64)
+        if reducer == "sum":
+            return np.where(counts > 0, sums, np.nan)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return np.where(counts > 0, sums / counts, np.nan)
+
+    def query(self, start, end, reducer: str = "mean", districts=None, variables=None) -> pd.DataFrame:
+        """aggregate() as a DataFrame indexed by district with one column per variable."""
+        out = self.aggregate(start, end, reducer, districts, variables)
+        return pd.DataFrame(out, index=districts or self.districts, columns=variables or self.variables)
+
+    def season(self, season: str, year: int, reducers: dict, districts=None) -> pd.DataFrame:
+        """
+        One row per district for a named season, e.g.
+        reducers={'T2M': 'mean', 'PRECTOTCORR': 'sum'}.
+        """
+        start, end = season_window(season, year)
+        out = pd.DataFrame(index=districts or self.districts)
+        for variable, reducer in reducers.items():
+            out[variable] = self.aggregate(start, end, reducer, districts, [variable])[:, 0]
+        return out
+
+    def daily(self, district: str, start, end, variables=None) -> pd.DataFrame:
+        """The stored daily rows of one district over [start, end]."""
+        d, v_idx = self._district_idx[normalize_name(district)], self.indices(None, variables)[1]
+        t0, t1 = max(self.day_offset(start), 0), min(self.day_offset(end) + 1, self.days)
+        dates = self.start + np.arange(t0, t1)
+        return pd.DataFrame(self.values[d, t0:t1][:, v_idx], index=pd.DatetimeIndex(dates, name="date"),
+                            columns=variables or self.variables)
+
+
+@lru_cache(maxsize=4)
+def get_weather_store(store_dir: str = STORE_DIR) -> WeatherStore:
+    return WeatherStore(store_dir)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build or query the memory-mapped daily weather store.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    build_p = sub.add_parser("build")
+    build_p.add_argument("--input-dir", default=INPUT_DIR)
+    build_p.add_argument("--store-dir", default=STORE_DIR)
+    query_p = sub.add_parser("query")
+    query_p.add_argument("--start", required=True)
+    query_p.add_argument("--end", required=True)
+    query_p.add_argument("--reducer", choices=REDUCERS, default="mean")
+    query_p.add_argument("--districts", nargs="+")
+    query_p.add_argument("--variables", nargs="+")
+    query_p.add_argument("--store-dir", default=STORE_DIR)
+    args = parser.parse_args()
+
+    if args.command == "build":
+        meta = build_store(list_weather_files(args.input_dir), args.store_dir)
+        print(f"✅ {len(meta['districts'])} districts × {meta['days']} days × {len(meta['variables'])} "
+              f"variables from {meta['start']} in '{args.store_dir}'")
+    else:
+        store = WeatherStore(args.store_dir)
+        print(store.query(args.start, args.end, args.reducer, args.districts, args.variables).to_string())